@@ -0,0 +1,256 @@
+'''
+Lecturer and department citation metrics computed from our own `journal`
+collection, vectorized with NumPy.
+
+The `journal` documents linked to lecturers (`dosen_ids`, from
+resolve-authors.py) are read once into flat arrays, one (lecturer,
+publication) pair per element. Every metric is then a sort or a bincount
+over those arrays, with no Python loop per lecturer:
+
+- h-index: pairs sorted by (lecturer, citation desc); the rank within a
+  lecturer's run is compared with the citation, and the hits are counted
+  per lecturer with np.bincount.
+- i10, publications, citations: bincount with a mask or weights.
+- citations per year: bincount over lecturer * years + year.
+
+Metrics are computed per source family (scopus, gscholar, garuda) and over
+all sources; copies of one paper from several sources (same cluster_id,
+dedup-journals.py) count once in `all`, with the highest citation count.
+The scopus and gscholar figures are compared with the citation_* and
+hindex_* values scraped from the SINTA profile in `crosscheck`.
+'''
+
+import numpy as np
+
+from . import metrics
+
+FAMILIES = ('scopus', 'gscholar', 'garuda')
+SCRAPED = ('scopus', 'gscholar')
+SOURCE_FAMILY = {
+    'sinta-scopus': 'scopus',
+    'scholar': 'gscholar',
+    'scholar-profile': 'gscholar',
+    'scholar-selenium': 'gscholar',
+    'sinta-googlescholar': 'gscholar',
+    'sinta-garuda': 'garuda',
+}
+PERCENTILES = (25, 50, 75, 90)
+
+
+def source_family(doc):
+    source = doc.get('source') or ''
+    if source in SOURCE_FAMILY:
+        return SOURCE_FAMILY[source]
+    # The Scopus API job (scopus_api/run.js) writes no source, only an eid
+    return 'scopus' if not source and doc.get('eid') else None
+
+
+def _citation(value):
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _year(value):
+    try:
+        year = int(str(value).strip()[:4])
+    except (TypeError, ValueError):
+        return 0
+    return year if 1900 <= year <= 2100 else 0
+
+
+class Links(object):
+    '''
+    Flat (lecturer, publication) arrays. `lecturers` maps a code back to the
+    SINTA ID; pair arrays are aligned: dosen[i] wrote a publication with
+    citation[i], year[i], family[i] and paper[i] (cluster code).
+    '''
+
+    def __init__(self, lecturers, dosen, paper, citation, year, family):
+        self.lecturers = lecturers
+        self.dosen = dosen
+        self.paper = paper
+        self.citation = citation
+        self.year = year
+        self.family = family
+
+    def __len__(self):
+        return len(self.dosen)
+
+    def select(self, mask):
+        return Links(self.lecturers, self.dosen[mask], self.paper[mask], self.citation[mask],
+                     self.year[mask], self.family[mask])
+
+
+def load_links(col_journals, batch_size=5000):
+    '''Read the journal documents linked to a lecturer into a Links.'''
+    codes = {}
+    papers = {}
+    dosen, paper, citation, year, family = [], [], [], [], []
+    projection = {'dosen_ids': 1, 'citation': 1, 'publicationYear': 1, 'source': 1, 'eid': 1, 'cluster_id': 1}
+    query = {'dosen_ids.0': {'$exists': True}}
+    with metrics.timer('crawler_analytics_seconds', stage='load'):
+        for doc in col_journals.find(query, projection).batch_size(batch_size):
+            fam = source_family(doc)
+            fam = FAMILIES.index(fam) if fam else -1
+            cit = _citation(doc.get('citation'))
+            yr = _year(doc.get('publicationYear'))
+            pid = papers.setdefault(str(doc.get('cluster_id') or doc['_id']), len(papers))
+            for sinta_id in set(doc.get('dosen_ids') or []):
+                if not sinta_id:
+                    continue
+                dosen.append(codes.setdefault(sinta_id, len(codes)))
+                paper.append(pid)
+                citation.append(cit)
+                year.append(yr)
+                family.append(fam)
+    lecturers = np.empty(len(codes), dtype=object)
+    for sinta_id, code in codes.items():
+        lecturers[code] = sinta_id
+    return Links(lecturers, np.asarray(dosen, dtype=np.int64), np.asarray(paper, dtype=np.int64),
+                 np.asarray(citation, dtype=np.int64), np.asarray(year, dtype=np.int32),
+                 np.asarray(family, dtype=np.int8))
+
+
+def unique_papers(links):
+    '''One pair per (lecturer, paper), keeping the highest citation.'''
+    if not len(links):
+        return links
+    order = np.lexsort((-links.citation, links.paper, links.dosen))
+    dosen, paper = links.dosen[order], links.paper[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = (dosen[1:] != dosen[:-1]) | (paper[1:] != paper[:-1])
+    return links.select(order[first])
+
+
+def h_index(dosen, citation, size):
+    '''h-index per lecturer code (0..size-1) from aligned pair arrays.'''
+    if not len(dosen):
+        return np.zeros(size, dtype=np.int64)
+    order = np.lexsort((-citation, dosen))
+    dosen, citation = dosen[order], citation[order]
+    # Position of each pair within its lecturer's run, 1-based
+    starts = np.flatnonzero(np.r_[True, dosen[1:] != dosen[:-1]])
+    rank = np.arange(1, len(dosen) + 1) - np.repeat(starts, np.diff(np.r_[starts, len(dosen)]))
+    return np.bincount(dosen[citation >= rank], minlength=size)
+
+
+def lecturer_metrics(links):
+    '''
+    {'publications', 'citations', 'hindex', 'i10'} arrays indexed by lecturer
+    code, plus 'per_year' (lecturers x years citation matrix) and 'years'.
+    '''
+    size = len(links.lecturers)
+    result = {
+        'publications': np.bincount(links.dosen, minlength=size),
+        'citations': np.bincount(links.dosen, weights=links.citation, minlength=size).astype(np.int64),
+        'hindex': h_index(links.dosen, links.citation, size),
+        'i10': np.bincount(links.dosen[links.citation >= 10], minlength=size),
+    }
+    known = links.year > 0
+    years, year_code = np.unique(links.year[known], return_inverse=True)
+    flat = links.dosen[known] * len(years) + year_code
+    result['years'] = years
+    result['per_year'] = np.bincount(flat, weights=links.citation[known],
+                                     minlength=size * len(years)).astype(np.int64).reshape(size, len(years))
+    return result
+
+
+def compute(links):
+    '''Metrics per family and over all sources: {'all': {...}, 'scopus': {...}, ...}.'''
+    with metrics.timer('crawler_analytics_seconds', stage='compute'):
+        result = {'all': lecturer_metrics(unique_papers(links))}
+        for code, family in enumerate(FAMILIES):
+            result[family] = lecturer_metrics(unique_papers(links.select(links.family == code)))
+    return result
+
+
+def department_distribution(values, departments):
+    '''
+    Per department: lecturers, mean, max and PERCENTILES of `values`
+    (one value per lecturer, aligned with `departments`).
+    '''
+    departments = np.asarray(departments, dtype=object)
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+        return {}
+    names, code = np.unique(departments, return_inverse=True)
+    order = np.lexsort((values, code))
+    values, code = values[order], code[order]
+    counts = np.bincount(code, minlength=len(names))
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+    sums = np.bincount(code, weights=values, minlength=len(names))
+    # Linear-interpolated percentiles from each department's sorted slice, all departments at once
+    stats = {}
+    for p in PERCENTILES:
+        pos = starts + (counts - 1) * (p / 100.0)
+        low = np.floor(pos).astype(np.int64)
+        high = np.minimum(low + 1, starts + counts - 1)
+        stats[f'p{p}'] = values[low] + (values[high] - values[low]) * (pos - low)
+    maxima = values[starts + counts - 1]
+    result = {}
+    for i, name in enumerate(names):
+        result[name] = dict(lecturers=int(counts[i]), mean=round(float(sums[i] / counts[i]), 3), max=float(maxima[i]),
+                            **{k: round(float(v[i]), 3) for k, v in stats.items()})
+    return result
+
+
+def department_metrics(computed, lecturers, department_of):
+    '''hindex and citations distributions per department, over all sources.'''
+    departments = np.array([department_of.get(s) or '' for s in lecturers], dtype=object)
+    known = departments != ''
+    all_metrics = computed['all']
+    return {
+        'hindex': department_distribution(all_metrics['hindex'][known], departments[known]),
+        'citations': department_distribution(all_metrics['citations'][known], departments[known]),
+    }
+
+
+def crosscheck(computed, lecturers, scraped, tolerance=0.2):
+    '''
+    Compare computed and scraped SINTA values per SCRAPED family. Returns
+    (summary, rows): rows holds lecturers whose hindex or citations differ
+    by more than `tolerance` (relative, at least 1); summary has per-metric
+    counts, mean absolute error and correlation.
+    '''
+    summary = {}
+    rows = []
+    codes = np.array([i for i, s in enumerate(lecturers) if s in scraped], dtype=np.int64)
+    for family in SCRAPED:
+        for metric, scraped_name in (('hindex', 'hindex'), ('citations', 'citation')):
+            field = f'{scraped_name}_{family}'
+            ours = computed[family][metric][codes].astype(np.float64)
+            theirs = np.array([_citation(scraped[lecturers[c]].get(field)) for c in codes], dtype=np.float64)
+            diff = ours - theirs
+            off = np.abs(diff) > np.maximum(tolerance * theirs, 1)
+            corr = np.corrcoef(ours, theirs)[0, 1] if len(codes) > 1 and ours.std() and theirs.std() else None
+            summary[field] = {
+                'lecturers': int(len(codes)),
+                'mismatched': int(off.sum()),
+                'mean_abs_error': round(float(np.abs(diff).mean()), 3) if len(codes) else 0,
+                'mean_diff': round(float(diff.mean()), 3) if len(codes) else 0,
+                'correlation': round(float(corr), 4) if corr is not None else None,
+            }
+            for i in np.flatnonzero(off):
+                rows.append({'sinta_id': lecturers[codes[i]], 'field': field,
+                             'computed': int(ours[i]), 'scraped': int(theirs[i]), 'diff': int(diff[i])})
+    return summary, rows
+
+
+def metric_documents(computed, lecturers, now):
+    '''One `dosen_metrics` document per lecturer: {_id: sinta_id, all: {...}, scopus: {...}, ...}.'''
+    docs = []
+    for code, sinta_id in enumerate(lecturers):
+        doc = {'_id': sinta_id, 'computed_at': now}
+        for family, values in computed.items():
+            row = values['per_year'][code]
+            doc[family] = {
+                'publications': int(values['publications'][code]),
+                'citations': int(values['citations'][code]),
+                'hindex': int(values['hindex'][code]),
+                'i10': int(values['i10'][code]),
+                'citations_per_year': {str(y): int(c) for y, c in zip(values['years'], row) if c},
+            }
+        docs.append(doc)
+    return docs
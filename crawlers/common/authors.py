@@ -0,0 +1,224 @@
+'''
+Author-name normalization and identity resolution against the `dosen`
+collection.
+
+Publication sources spell the same lecturer differently: "Lubis, Muharman"
+(garuda), "M Lubis" / "MN Ismail" (Scholar .gs_a), "Lubis M." (scopus view)
+and "Muharman Lubis, S.T., M.T." in profiles. AuthorIndex keeps, for every
+dosen, the exact set of name tokens and (surname, initials) keys, so a
+publication author resolves with a couple of dict lookups instead of a
+regex query per name.
+'''
+
+import re
+import unicodedata
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from . import metrics
+
+# Comma-separated part that is an academic degree: "S.T.", "M.Kom", "Ph.D"
+DEGREE_RE = re.compile(r'^(?:[A-Za-z]{1,4}\.)+[A-Za-z]{0,4}\.?$')
+DEGREES = {'st', 'mt', 'msc', 'bsc', 'mba', 'phd', 'mkom', 'skom', 'se', 'mm', 'ssi', 'msi', 'mpd', 'spd', 'ma'}
+HONORIFICS = {'prof', 'dr', 'ir', 'drs', 'dra', 'hj'}
+TOKEN_RE = re.compile(r"[A-Za-z]+\.?")
+
+
+def _ascii(text):
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+
+
+def _is_degree(part):
+    words = part.split()
+    if not words:
+        return False
+    for word in words:
+        letters = re.sub(r'[^A-Za-z]', '', word)
+        if letters.lower() in DEGREES:
+            continue
+        if DEGREE_RE.match(word) and len(letters) >= 2:
+            continue
+        return False
+    return True
+
+
+def parse_name(raw):
+    '''
+    Ordered [(token, is_initial)] of a raw author name, lower-case ASCII,
+    without degrees and honorifics; "Last, First" is put back in order.
+    '''
+    raw = _ascii(raw or '').strip()
+    parts = [p.strip() for p in raw.split(',') if p.strip() and not _is_degree(p.strip())]
+    if len(parts) == 2:
+        raw = f"{parts[1]} {parts[0]}"
+    else:
+        raw = ' '.join(parts)
+    shouting = raw.isupper()
+    tokens = []
+    for match in TOKEN_RE.finditer(raw):
+        word = match.group(0)
+        dotted = word.endswith('.')
+        word = word.rstrip('.')
+        lower = word.lower()
+        if lower in HONORIFICS:
+            continue
+        # "M", "M.", and Scholar's run-together initials "MN"
+        if len(word) == 1 or (dotted and len(word) <= 2) or (not shouting and word.isupper() and len(word) <= 3):
+            tokens.extend((c, True) for c in lower)
+        else:
+            tokens.append((lower, False))
+    return tokens
+
+
+def normalize_name(raw):
+    '''Canonical "first last" string, e.g. for display or exact grouping.'''
+    return ' '.join(t for t, _ in parse_name(raw))
+
+
+def _surname_keys(tokens):
+    # (surname candidate, initials of every other token in order), then first initial only
+    keys = []
+    for i, (token, initial) in enumerate(tokens):
+        if initial:
+            continue
+        others = ''.join(t[0] for j, (t, _) in enumerate(tokens) if j != i)
+        if others:
+            keys.append((token, others))
+            keys.append((token, others[0]))
+    return keys
+
+
+class AuthorIndex(object):
+
+    def __init__(self):
+        self.exact = {}
+        self.initials = {}
+        self.docs = {}
+        self._keys = {}
+        # Newest profile_crawled_at seen, for incremental linking
+        self.updated_at = None
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, doc):
+        '''Index (or re-index) one dosen document; needs sinta_id and nama.'''
+        sinta_id = doc.get('sinta_id')
+        if not sinta_id or not doc.get('nama'):
+            return
+        self.remove(sinta_id)
+        tokens = parse_name(doc['nama'])
+        keys = []
+        full = frozenset(t for t, initial in tokens if not initial)
+        if full and not any(initial for _, initial in tokens):
+            self.exact.setdefault(full, set()).add(sinta_id)
+            keys.append(('exact', full))
+        for key in _surname_keys(tokens):
+            self.initials.setdefault(key, set()).add(sinta_id)
+            keys.append(('initials', key))
+        self._keys[sinta_id] = keys
+        self.docs[sinta_id] = {'nama': doc['nama'], 'affiliation': (doc.get('affiliation') or '').lower()}
+        crawled_at = doc.get('profile_crawled_at')
+        if crawled_at is not None and (self.updated_at is None or crawled_at > self.updated_at):
+            self.updated_at = crawled_at
+
+    def remove(self, sinta_id):
+        for kind, key in self._keys.pop(sinta_id, ()):
+            table = self.exact if kind == 'exact' else self.initials
+            ids = table.get(key)
+            if ids is not None:
+                ids.discard(sinta_id)
+                if not ids:
+                    del table[key]
+        self.docs.pop(sinta_id, None)
+
+    def candidates(self, raw):
+        tokens = parse_name(raw)
+        full = frozenset(t for t, initial in tokens if not initial)
+        if full and not any(initial for _, initial in tokens):
+            ids = self.exact.get(full)
+            if ids:
+                return ids
+        for key in _surname_keys(tokens):
+            ids = self.initials.get(key)
+            if ids:
+                return ids
+        return set()
+
+    def resolve(self, raw, affiliations=()):
+        '''SINTA ID of the one dosen `raw` can be, or None (unknown or ambiguous).'''
+        ids = self.candidates(raw)
+        if len(ids) == 1:
+            return next(iter(ids))
+        if len(ids) > 1 and affiliations:
+            wanted = {a.lower() for a in affiliations if a}
+            ids = [i for i in ids if self.docs[i]['affiliation'] in wanted]
+            if len(ids) == 1:
+                return ids[0]
+        return None
+
+
+def load_index(col_dosen):
+    '''
+    Build an AuthorIndex from every `dosen` document. Always the whole
+    collection: resolving against only the recently crawled lecturers would
+    miss the namesakes that make a name ambiguous.
+    '''
+    index = AuthorIndex()
+    query = {'sinta_id': {'$nin': [None, '']}}
+    projection = {'_id': 0, 'sinta_id': 1, 'nama': 1, 'affiliation': 1, 'profile_crawled_at': 1}
+    for doc in col_dosen.find(query, projection).batch_size(5000):
+        index.add(doc)
+    return index
+
+
+def publication_authors(journal):
+    '''Author names of a journal document whatever source wrote it.'''
+    authors = journal.get('authors')
+    if isinstance(authors, list) and all(isinstance(a, str) for a in authors):
+        return authors
+    detailed = journal.get('authorsDetailed') or journal.get('authorDetailed') or []
+    return [a.get('name') or '' for a in detailed if isinstance(a, dict)]
+
+
+def link_publications(col_journals, index, incremental=True, batch_size=1000):
+    '''
+    Write author_sinta_ids (aligned with the author list, None where
+    unresolved), dosen_ids and authors_resolved_at on journal documents, in
+    bulk_write batches. Incremental runs only touch journals never resolved,
+    plus those with unresolved authors when dosen changed since.
+    Returns (journals updated, authors resolved).
+    '''
+    query = {}
+    if incremental:
+        query = {'$or': [{'authors_resolved_at': {'$exists': False}}]}
+        if index.updated_at is not None:
+            query['$or'].append({'authors_resolved_at': {'$lt': index.updated_at},
+                                 'author_sinta_ids': None})
+    projection = {'authors': 1, 'authorsDetailed': 1, 'authorDetailed': 1, 'affiliations': 1}
+    now = datetime.utcnow()
+    ops = []
+    updated = resolved = 0
+    for journal in col_journals.find(query, projection).batch_size(batch_size):
+        affiliations = journal.get('affiliations') or []
+        affiliations = [a if isinstance(a, str) else (a or {}).get('name', '') for a in affiliations]
+        ids = [index.resolve(name, affiliations) for name in publication_authors(journal)]
+        resolved += sum(1 for i in ids if i)
+        # Unsetting stats_at hands the new dosen links to the next stats rollup (common/rollups.py)
+        ops.append(UpdateOne({'_id': journal['_id']}, {'$set': {
+            'author_sinta_ids': ids,
+            'dosen_ids': sorted({i for i in ids if i}),
+            'authors_resolved_at': now,
+            'updated_at': now,
+        }, '$unset': {'stats_at': ''}}))
+        if len(ops) >= batch_size:
+            with metrics.timer('crawler_mongo_write_seconds', collection=col_journals.name, op='bulk_update'):
+                col_journals.bulk_write(ops, ordered=False)
+            updated += len(ops)
+            ops = []
+    if ops:
+        with metrics.timer('crawler_mongo_write_seconds', collection=col_journals.name, op='bulk_update'):
+            col_journals.bulk_write(ops, ordered=False)
+        updated += len(ops)
+    return updated, resolved
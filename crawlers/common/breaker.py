@@ -0,0 +1,211 @@
+'''
+Per-host circuit breaker for the shared HTTP session (common/session.py).
+
+Every request through session.get() passes the breaker of its host:
+
+- closed: requests go through; the outcome of the last WINDOW requests is
+  kept, and once at least MIN_REQUESTS of them failed at ERROR_RATE or
+  more (timeouts, connection errors, 5xx, 429) the breaker opens.
+- open: requests wait (up to BREAKER_MAX_WAIT seconds, then CircuitOpen is
+  raised) instead of hitting a host that is down. After the cooldown the
+  breaker is half-open.
+- half-open: one probe request goes through. Success closes the breaker;
+  failure opens it again with twice the cooldown (up to MAX_COOLDOWN).
+
+A 429/503 with Retry-After holds the host for that long whatever the
+error rate. Breakers are per process, shared by all threads (fetchers,
+discovery, pipeline workers) of that process.
+
+    BREAKER_COOLDOWN   first cooldown in seconds (default 30)
+    BREAKER_MAX_WAIT   longest a request waits for an open breaker (default 900)
+'''
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+import requests
+
+from . import log, metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+WINDOW = 20
+MIN_REQUESTS = 5
+ERROR_RATE = 0.5
+COOLDOWN = float(os.environ.get('BREAKER_COOLDOWN', 30))
+MAX_COOLDOWN = 600.0
+MAX_WAIT = float(os.environ.get('BREAKER_MAX_WAIT', 900))
+FAILURE_STATUSES = (429, 500, 502, 503, 504)
+
+
+class CircuitOpen(requests.exceptions.ConnectionError):
+    '''The host's breaker stayed open longer than the caller may wait.'''
+
+    def __init__(self, host, wait):
+        super(CircuitOpen, self).__init__(f"circuit open for {host}, retry in {wait:.0f}s")
+        self.host = host
+        self.wait = wait
+
+
+def retry_after_seconds(response):
+    '''Seconds asked by a Retry-After header (delta or HTTP date), or None.'''
+    value = (getattr(response, 'headers', None) or {}).get('Retry-After')
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class CircuitBreaker(object):
+
+    def __init__(self, host, window=WINDOW, min_requests=MIN_REQUESTS, error_rate=ERROR_RATE,
+                 cooldown=COOLDOWN, max_cooldown=MAX_COOLDOWN):
+        self.host = host
+        self.min_requests = min_requests
+        self.error_rate = error_rate
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.open_until = 0.0
+        self.outcomes = deque(maxlen=window)
+        self.probing = False
+        self.counts = {'opened': 0, 'rejected': 0, 'retry_after': 0, 'waited_seconds': 0.0}
+        self._cond = threading.Condition()
+
+    def _set_state(self, state):
+        if state != self.state:
+            self.state = state
+            metrics.inc('crawler_breaker_transitions_total', host=self.host, state=state)
+            metrics.set_gauge('crawler_breaker_state', STATE_VALUES[state], host=self.host)
+            log.event(logger, logging.WARNING if state == OPEN else logging.INFO, "Circuit breaker " + state,
+                      host=self.host, cooldown_seconds=self.cooldown,
+                      open_for=round(max(self.open_until - time.monotonic(), 0), 1))
+
+    def _open(self, seconds):
+        self.open_until = max(self.open_until, time.monotonic() + seconds)
+        self.outcomes.clear()
+        self.counts['opened'] += 1
+        self._set_state(OPEN)
+
+    def acquire(self, max_wait=MAX_WAIT):
+        '''
+        Block until a request may go out. Returns True when this request is
+        the half-open probe; raises CircuitOpen when that takes longer than
+        `max_wait` seconds.
+        '''
+        deadline = time.monotonic() + max_wait
+        started = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self.state == OPEN and now >= self.open_until:
+                    self._set_state(HALF_OPEN)
+                if self.state == CLOSED:
+                    probe = False
+                    break
+                if self.state == HALF_OPEN and not self.probing:
+                    self.probing = True
+                    probe = True
+                    break
+                # Open, or half-open with the probe still out
+                wake_at = self.open_until if self.state == OPEN else now + 1.0
+                if wake_at > deadline:
+                    self.counts['rejected'] += 1
+                    metrics.inc('crawler_breaker_rejected_total', host=self.host)
+                    raise CircuitOpen(self.host, wake_at - now)
+                self._cond.wait(max(wake_at - now, 0.01))
+            waited = time.monotonic() - started
+        if waited > 0.01:
+            self.counts['waited_seconds'] += waited
+            metrics.observe('crawler_breaker_wait_seconds', waited, host=self.host)
+        return probe
+
+    def record(self, ok, probe=False, retry_after=None):
+        with self._cond:
+            if probe:
+                self.probing = False
+            if retry_after:
+                self.counts['retry_after'] += 1
+                metrics.inc('crawler_retry_after_total', host=self.host)
+                self._open(min(retry_after, self.max_cooldown))
+            elif probe:
+                if ok:
+                    self.cooldown = self.base_cooldown
+                    self.outcomes.clear()
+                    self._set_state(CLOSED)
+                else:
+                    self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                    self._open(self.cooldown)
+            elif self.state == CLOSED:
+                self.outcomes.append(ok)
+                failures = self.outcomes.count(False)
+                if len(self.outcomes) >= self.min_requests and failures >= self.error_rate * len(self.outcomes):
+                    self._open(self.cooldown)
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return dict(self.counts, state=self.state, waited_seconds=round(self.counts['waited_seconds'], 3))
+
+
+_breakers = {}
+_lock = threading.Lock()
+
+
+def breaker_for(url):
+    '''The breaker of the host of `url` in this process.'''
+    key = (os.getpid(), urlparse(url).netloc.lower())
+    breaker = _breakers.get(key)
+    if breaker is None:
+        with _lock:
+            breaker = _breakers.get(key)
+            if breaker is None:
+                breaker = _breakers[key] = CircuitBreaker(key[1])
+    return breaker
+
+
+def guarded(url, send):
+    '''Run send() -> response under the breaker of `url`'s host.'''
+    breaker = breaker_for(url)
+    probe = breaker.acquire()
+    try:
+        response = send()
+    except Exception:
+        breaker.record(False, probe)
+        raise
+    status = getattr(response, 'status_code', 200)
+    retry_after = retry_after_seconds(response) if status in (429, 503) else None
+    breaker.record(status not in FAILURE_STATUSES, probe, retry_after)
+    return response
+
+
+def breaker_stats():
+    '''Per-host breaker counters of this process.'''
+    pid = os.getpid()
+    return {host: b.stats() for (p, host), b in list(_breakers.items()) if p == pid}
+
+
+def reset_breakers():
+    '''Forget every host's breaker, e.g. between load-test scenarios.'''
+    with _lock:
+        _breakers.clear()
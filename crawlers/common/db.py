@@ -0,0 +1,159 @@
+'''
+Shared MongoDB client for every Python crawler (SINTA scripts, Scholar
+selenium runner, mongo_helper).
+
+One MongoClient (and therefore one connection pool) is created per process
+and per connection target, configured from the environment:
+
+    MONGO_URI             connection string (default mongodb://localhost:27017/);
+                          mongomock://[/db] keeps everything in memory (pip
+                          install mongomock, load-test.py)
+    MONGO_DB              database to use; takes precedence over the one
+                          named in the URI (default: the URI's, else
+                          journal_crawling)
+    MONGO_MAX_POOL_SIZE   max pooled connections (default 50)
+    MONGO_MIN_POOL_SIZE   connections kept warm (default 0)
+    MONGO_W               write concern for normal writes (default 1)
+    MONGO_BULK_W          write concern for bulk loads (default 1, use 0 for
+                          unacknowledged fire-and-forget ingestion)
+    MONGO_COMPRESSORS     wire compression, e.g. "zstd,snappy,zlib" (default off)
+    MONGO_RETRY_WRITES    "true"/"false" (default true)
+'''
+
+import os
+import threading
+
+from pymongo import MongoClient
+from pymongo.errors import DuplicateKeyError
+from pymongo.write_concern import WriteConcern
+
+
+DEFAULT_URI = 'mongodb://localhost:27017/'
+DEFAULT_DB = 'journal_crawling'
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _write_concern(name, default):
+    value = os.environ.get(name, default)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        # e.g. "majority"
+        return value
+
+
+def client_options():
+    options = {
+        'maxPoolSize': _env_int('MONGO_MAX_POOL_SIZE', 50),
+        'minPoolSize': _env_int('MONGO_MIN_POOL_SIZE', 0),
+        'retryWrites': _env_bool('MONGO_RETRY_WRITES', True),
+        'w': _write_concern('MONGO_W', 1),
+    }
+    compressors = os.environ.get('MONGO_COMPRESSORS', '').strip()
+    if compressors:
+        options['compressors'] = compressors
+    return options
+
+
+def get_client(uri=None, **kwargs):
+    '''
+    Return the process-wide client for `uri` (MONGO_URI by default).
+
+    Extra kwargs (username/password for the legacy config.py scripts) are
+    part of the cache key. Clients are never shared across a fork: a child
+    process gets its own pool.
+    '''
+    uri = uri or os.environ.get('MONGO_URI') or DEFAULT_URI
+    key = (os.getpid(), uri, tuple(sorted(kwargs.items())))
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                if uri.startswith('mongomock://'):
+                    # In-memory, so only visible to this process
+                    import mongomock
+                    rest = uri[len('mongomock://'):]
+                    client = mongomock.MongoClient('mongodb://' + (rest if rest[:1] not in ('', '/') else 'localhost' + rest))
+                else:
+                    options = client_options()
+                    options.update(kwargs)
+                    client = MongoClient(uri, **options)
+                _clients[key] = client
+    return client
+
+
+def get_db(name=None, client=None):
+    '''
+    Database `name`, else MONGO_DB, else the database named in the URI,
+    else journal_crawling.
+    '''
+    client = client or get_client()
+    name = name or os.environ.get('MONGO_DB')
+    if name:
+        return client[name]
+    return client.get_default_database(DEFAULT_DB)
+
+
+def get_collection(name, db=None, bulk=False):
+    '''
+    Collection handle; with bulk=True it uses MONGO_BULK_W so large loads can
+    run with w=1 (or unacknowledged w=0) independently of normal writes.
+    '''
+    db = db if db is not None else get_db()
+    collection = db[name]
+    if bulk:
+        collection = collection.with_options(
+            write_concern=WriteConcern(w=_write_concern('MONGO_BULK_W', 1)))
+    return collection
+
+
+def ensure_unique_index(collection, key):
+    '''
+    Unique index on `key`. Duplicates left by older insert_one loaders are
+    removed first, keeping the oldest document (smallest _id) of each value.
+    Returns the number of documents deleted.
+
+    Runs acknowledged (w=1) even on a bulk collection configured with
+    MONGO_BULK_W=0: the delete counts and the index build must be known.
+    '''
+    collection = collection.with_options(write_concern=WriteConcern(w=1))
+    try:
+        collection.create_index(key, unique=True)
+        return 0
+    except DuplicateKeyError:
+        pass
+    deleted = 0
+    pipeline = [
+        {'$sort': {'_id': 1}},
+        {'$group': {'_id': f'${key}', 'ids': {'$push': '$_id'}, 'count': {'$sum': 1}}},
+        {'$match': {'count': {'$gt': 1}}},
+    ]
+    for group in collection.aggregate(pipeline, allowDiskUse=True):
+        deleted += collection.delete_many({'_id': {'$in': group['ids'][1:]}}).deleted_count
+    collection.create_index(key, unique=True)
+    return deleted
+
+
+def close_clients():
+    with _lock:
+        for key, client in list(_clients.items()):
+            if key[0] == os.getpid():
+                client.close()
+            del _clients[key]
@@ -0,0 +1,178 @@
+'''
+Near-duplicate publication titles across sources with MinHash + LSH.
+
+The same paper arrives from Scopus, Scholar and SINTA garuda with small
+title differences (case, punctuation, truncation with "..."), so exact
+{title, doi, authors} matching misses it. Every title becomes a set of
+character shingles and a MinHash signature (NumPy, a batch of titles at a
+time); signatures are cut into bands and only titles sharing a band bucket
+are compared. Candidates whose estimated Jaccard similarity passes the
+threshold, or that share a DOI, end up in one cluster.
+
+Cost is roughly linear in the number of titles; memory is
+num_perm * 4 bytes per title for the signatures.
+'''
+
+import re
+import unicodedata
+
+import numpy as np
+
+_EMPTY = np.iinfo(np.uint32).max
+_SPACE_RE = re.compile(r'\s+')
+_NON_WORD_RE = re.compile(r'[^a-z0-9 ]')
+
+
+def normalize_title(title):
+    title = unicodedata.normalize('NFKD', title or '').encode('ascii', 'ignore').decode('ascii').lower()
+    title = title.replace('...', ' ').replace('…', ' ')
+    return _SPACE_RE.sub(' ', _NON_WORD_RE.sub(' ', title)).strip()
+
+
+def _fmix32(h):
+    # MurmurHash3 finalizer, so the permutations below see well-mixed bits
+    h ^= h >> np.uint32(16)
+    h *= np.uint32(0x85ebca6b)
+    h ^= h >> np.uint32(13)
+    h *= np.uint32(0xc2b2ae35)
+    h ^= h >> np.uint32(16)
+    return h
+
+
+def shingles(title):
+    '''
+    Distinct character 4-shingles of a normalized title, hashed to uint32.
+    Four ASCII bytes pack into one 32-bit integer exactly before mixing.
+    '''
+    text = normalize_title(title).encode('ascii')
+    if not text:
+        return np.empty(0, dtype=np.uint32)
+    data = np.frombuffer(text.ljust(4), dtype=np.uint8).astype(np.uint32)
+    grams = (data[:-3] << np.uint32(24)) | (data[1:-2] << np.uint32(16)) | (data[2:-1] << np.uint32(8)) | data[3:]
+    return _fmix32(np.unique(grams))
+
+
+class MinHasher(object):
+
+    def __init__(self, num_perm=128, bands=16, seed=1):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        # a * x + b mod 2^32 with odd a is a permutation of the uint32 space;
+        # 32-bit arithmetic is ~3x faster than 64-bit here
+        self.a = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64).astype(np.uint32) | np.uint32(1)
+        self.b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64).astype(np.uint32)
+        # Random multipliers that fold the rows of a band into one bucket key
+        self.band_mix = rng.randint(1, 1 << 62, size=self.rows, dtype=np.int64).astype(np.uint64) | np.uint64(1)
+
+    def signatures(self, shingle_sets):
+        '''(len(shingle_sets), num_perm) uint32 signatures; empty sets get all-max rows.'''
+        out = np.full((len(shingle_sets), self.num_perm), _EMPTY, dtype=np.uint32)
+        present = [i for i, s in enumerate(shingle_sets) if len(s)]
+        if not present:
+            return out
+        sizes = np.array([len(shingle_sets[i]) for i in present])
+        values = np.concatenate([shingle_sets[i] for i in present])
+        # One (num_perm, total shingles) matrix for the whole batch, then a
+        # per-title min over its own slice of columns
+        hashed = np.multiply.outer(self.a, values)
+        hashed += self.b[:, None]
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        out[present] = np.minimum.reduceat(hashed, starts, axis=1).T
+        return out
+
+    def band_keys(self, signatures):
+        '''(n, bands) uint64 bucket keys; equal key in a band = LSH candidate.'''
+        n = signatures.shape[0]
+        banded = signatures.astype(np.uint64).reshape(n, self.bands, self.rows)
+        with np.errstate(over='ignore'):
+            return (banded * self.band_mix).sum(axis=2, dtype=np.uint64)
+
+
+class _UnionFind(object):
+
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, i):
+        parent = self.parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    def union(self, i, j):
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            # Smaller index wins so cluster roots are stable across runs
+            if ri < rj:
+                self.parent[rj] = ri
+            else:
+                self.parent[ri] = rj
+
+
+def candidate_pairs(keys):
+    '''
+    (i, j) pairs sharing a bucket in any band, each pair only linked to the
+    first member of its bucket, which keeps the count linear.
+    '''
+    firsts = []
+    others = []
+    for band in range(keys.shape[1]):
+        column = keys[:, band]
+        order = np.argsort(column, kind='stable')
+        sorted_keys = column[order]
+        new_group = np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1]))
+        group_first = order[np.maximum.accumulate(np.where(new_group, np.arange(len(order)), 0))]
+        mask = ~new_group
+        firsts.append(group_first[mask])
+        others.append(order[mask])
+    if not firsts:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.stack([np.concatenate(firsts), np.concatenate(others)], axis=1)
+    return np.unique(pairs, axis=0) if len(pairs) else pairs
+
+
+def cluster_titles(titles, dois=None, threshold=0.8, num_perm=128, bands=16, batch_size=1000, seed=1):
+    '''
+    Cluster root index for every title: titles[i] and titles[j] share a root
+    when they are near duplicates (estimated Jaccard >= threshold) or share
+    a non-empty DOI, directly or through other members.
+    '''
+    hasher = MinHasher(num_perm, bands, seed)
+    n = len(titles)
+    signatures = np.empty((n, num_perm), dtype=np.uint32)
+    for start in range(0, n, batch_size):
+        batch = [shingles(t) for t in titles[start:start + batch_size]]
+        signatures[start:start + len(batch)] = hasher.signatures(batch)
+
+    uf = _UnionFind(n)
+    has_shingles = (signatures != _EMPTY).any(axis=1)
+    pairs = candidate_pairs(hasher.band_keys(signatures))
+    if len(pairs):
+        pairs = pairs[has_shingles[pairs[:, 0]] & has_shingles[pairs[:, 1]]]
+        # Verify with the full signature: fraction of equal MinHash values
+        similarity = np.empty(len(pairs))
+        for start in range(0, len(pairs), batch_size):
+            chunk = pairs[start:start + batch_size]
+            similarity[start:start + len(chunk)] = (signatures[chunk[:, 0]] == signatures[chunk[:, 1]]).mean(axis=1)
+        for i, j in pairs[similarity >= threshold]:
+            uf.union(int(i), int(j))
+
+    if dois is not None:
+        first_by_doi = {}
+        for i, doi in enumerate(dois):
+            doi = (doi or '').strip().lower()
+            if not doi:
+                continue
+            if doi in first_by_doi:
+                uf.union(first_by_doi[doi], i)
+            else:
+                first_by_doi[doi] = i
+
+    return np.array([uf.find(i) for i in range(n)])
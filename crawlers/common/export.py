@@ -0,0 +1,178 @@
+'''
+Parquet snapshots of `journal` and `dosen` for offline analysis.
+
+Both collections are streamed with a projection and batched cursors,
+normalized through common.records, and written as hive-partitioned
+Parquet (journal by publicationYear, dosen by affiliation) that DuckDB,
+pandas or Spark read directly:
+
+    <out>/journal/publicationYear=2021/part-<run>-<n>-0.parquet
+    <out>/dosen/affiliation=Telkom%20University/part-<run>-<n>-0.parquet
+    <out>/_state.json     high-water marks of the last export
+
+Runs after the first one only append documents changed since the
+high-water mark (journal.updated_at, dosen.profile_crawled_at), so a
+document changed twice appears in two files: readers keep the row with
+the newest `updated_at` / `profile_crawled_at` per `_id`.
+
+Crawlers stamp those fields in Python before the write commits, so a
+document stamped just before an export may only become visible after the
+cursor passed it. The mark saved is therefore never later than the export
+start minus SAFETY_LAG; the next run re-exports that window.
+'''
+
+import os
+import json
+from datetime import datetime, timedelta
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from . import metrics
+from .records import Lecturer, Publication
+
+STATE_FILE = '_state.json'
+SAFETY_LAG = timedelta(minutes=10)
+UNKNOWN = 'Unknown'
+
+AUTHOR_TYPE = pa.struct([('name', pa.string()), ('authid', pa.string()),
+                         ('hIndex', pa.int64()), ('fullName', pa.string())])
+
+JOURNAL_SCHEMA = pa.schema([
+    ('_id', pa.string()),
+    ('title', pa.string()),
+    ('authors', pa.list_(pa.string())),
+    ('authorsDetailed', pa.list_(AUTHOR_TYPE)),
+    ('affiliations', pa.list_(pa.string())),
+    ('doi', pa.string()),
+    ('eid', pa.string()),
+    ('publicationName', pa.string()),
+    ('publicationYear', pa.string()),
+    ('coverDate', pa.string()),
+    ('citation', pa.int64()),
+    ('url', pa.string()),
+    ('source', pa.string()),
+    ('dosen_ids', pa.list_(pa.string())),
+    ('cluster_id', pa.string()),
+    ('updated_at', pa.timestamp('ms')),
+])
+
+DOSEN_SCHEMA = pa.schema(
+    [('_id', pa.string())] +
+    [(name, pa.int64() if Lecturer.__dataclass_fields__[name].type is int else pa.string())
+     for name in Lecturer.FIELDS] +
+    [('profile_crawled_at', pa.timestamp('ms'))])
+
+JOURNAL_PROJECTION = dict.fromkeys([f.name for f in JOURNAL_SCHEMA] + ['authorDetailed', 'affiliation'], 1)
+DOSEN_PROJECTION = dict.fromkeys([f.name for f in DOSEN_SCHEMA], 1)
+
+
+def ensure_indexes(col_journals, col_dosen):
+    col_journals.create_index('updated_at', sparse=True)
+    col_dosen.create_index('profile_crawled_at', sparse=True)
+
+
+def journal_row(doc):
+    row = Publication.from_dict(doc).to_dict()
+    row = {name: row.get(name) for name in JOURNAL_SCHEMA.names}
+    row['_id'] = str(doc['_id'])
+    row['affiliations'] = [a if isinstance(a, str) else (a or {}).get('name', '') for a in row['affiliations']]
+    row['publicationYear'] = row['publicationYear'] or UNKNOWN
+    row['dosen_ids'] = [str(i) for i in doc.get('dosen_ids') or [] if i]
+    row['cluster_id'] = doc.get('cluster_id')
+    row['updated_at'] = doc.get('updated_at')
+    return row
+
+
+def dosen_row(doc):
+    row = Lecturer.from_dict(doc).to_dict()
+    row['_id'] = str(doc['_id'])
+    row['affiliation'] = row['affiliation'] or UNKNOWN
+    row['profile_crawled_at'] = doc.get('profile_crawled_at')
+    return row
+
+
+def load_state(out_dir):
+    path = os.path.join(out_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        state = json.load(f)
+    return {k: datetime.fromisoformat(v) if v else None for k, v in state.items()}
+
+
+def save_state(out_dir, state):
+    path = os.path.join(out_dir, STATE_FILE)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({k: v.isoformat() if v else None for k, v in state.items()}, f, indent=2)
+    os.replace(tmp, path)
+
+
+def export_collection(collection, out_dir, schema, partition, to_row, watermark_field, since=None,
+                      run_id=None, batch_size=5000, rows_per_file=100000, projection=None):
+    '''
+    Stream `collection` (documents with watermark_field > since, or all of
+    them) into hive-partitioned Parquet under `out_dir`. Returns (rows
+    written, new high-water mark).
+    '''
+    run_id = run_id or datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+    query = {watermark_field: {'$gt': since}} if since is not None else {}
+    cursor = collection.find(query, projection).batch_size(batch_size)
+    partitioning = ds.partitioning(pa.schema([schema.field(partition)]), flavor='hive')
+    written = 0
+    high = since
+    rows = []
+    part = 0
+
+    def flush(rows, part):
+        table = pa.Table.from_pylist(rows, schema=schema)
+        with metrics.timer('crawler_export_write_seconds', collection=collection.name):
+            # Distinct basenames per run and chunk: earlier files are never overwritten
+            ds.write_dataset(table, out_dir, format='parquet', partitioning=partitioning,
+                             basename_template=f'part-{run_id}-{part}-{{i}}.parquet',
+                             existing_data_behavior='overwrite_or_ignore')
+
+    for doc in cursor:
+        rows.append(to_row(doc))
+        stamp = doc.get(watermark_field)
+        if isinstance(stamp, datetime) and (high is None or stamp > high):
+            high = stamp
+        if len(rows) >= rows_per_file:
+            flush(rows, part)
+            written += len(rows)
+            part += 1
+            rows = []
+    if rows:
+        flush(rows, part)
+        written += len(rows)
+    metrics.inc('crawler_export_rows_total', written, collection=collection.name)
+    return written, high
+
+
+def export_snapshot(col_journals, col_dosen, out_dir, full=False, batch_size=5000, rows_per_file=100000,
+                    safety_lag=SAFETY_LAG):
+    '''Export journal and dosen into `out_dir`; returns rows written per collection.'''
+    os.makedirs(out_dir, exist_ok=True)
+    state = {} if full else load_state(out_dir)
+    started = datetime.utcnow()
+    run_id = started.strftime('%Y%m%dT%H%M%S%f')
+    counts = {}
+    jobs = (
+        ('journal', col_journals, JOURNAL_SCHEMA, 'publicationYear', journal_row, 'updated_at', JOURNAL_PROJECTION),
+        ('dosen', col_dosen, DOSEN_SCHEMA, 'affiliation', dosen_row, 'profile_crawled_at', DOSEN_PROJECTION),
+    )
+    for name, collection, schema, partition, to_row, field, projection in jobs:
+        written, high = export_collection(
+            collection, os.path.join(out_dir, name), schema, partition, to_row, field,
+            since=state.get(name), run_id=run_id, batch_size=batch_size,
+            rows_per_file=rows_per_file, projection=projection)
+        # Documents without a timestamp (older crawls) only come with the
+        # first export; later runs start from the export time at the latest.
+        # Writes stamped before `started` may still be in flight: keep a lag
+        safe = started - safety_lag
+        mark = high or state.get(name)
+        state[name] = min(mark, safe) if mark else safe
+        counts[name] = written
+    save_state(out_dir, state)
+    return counts
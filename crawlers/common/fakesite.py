@@ -0,0 +1,365 @@
+'''
+Synthetic SINTA and Google Scholar site for load tests (load-test.py).
+
+Pages are generated from the URL, so the same URL always returns the same
+page, with the markup the crawlers parse:
+
+    /affiliations?page=N                        affiliation list (scrap-academic.py)
+    /affiliations/detail?id=..&view=documents   affiliation publications (scrap-google-scholar.py)
+    /affiliations/authors/<affil>?page=N        author list (sinta.iter_author_pages)
+    /authors/profile/<id>[?view=..&page=N]      profile and garuda/scopus/googlescholar views
+    /citations?user=..&cstart=..&pagesize=..    Scholar profile (crawl-frontier.py)
+    /scholar?q=..&start=..                      Scholar results (googlescholar spider)
+
+Faults: a latency per response drawn from `latency` (min, max seconds),
+`error_rate` of 503s (with Retry-After when `retry_after` > 0),
+`captcha_rate` of Scholar requests answered with a 429 "not a robot" page,
+and an `outage` (start, seconds) window, counted from the last
+reset_stats(), in which every request gets a 503.
+
+    site = FakeSite(SiteConfig(affiliations=2, error_rate=0.05))
+    server = ServerThread(site).start()
+    os.environ['HTTP_HOST_MAP'] = server.host_map(SINTA_HOSTS + SCHOLAR_HOSTS)
+
+Requires aiohttp (pip install aiohttp).
+'''
+
+import math
+import time
+import zlib
+import random
+import asyncio
+import threading
+from html import escape
+
+from aiohttp import web
+
+SINTA_HOSTS = ('sinta.kemdiktisaintek.go.id', 'sinta.ristekbrin.go.id')
+SCHOLAR_HOSTS = ('scholar.google.com',)
+
+FIRST_AFFILIATION = 1000
+AUTHOR_ID_BLOCK = 100000  # author IDs of affiliation k start at (k + 1) * AUTHOR_ID_BLOCK
+VIEW_PAGE_SIZE = 10
+LIST_PAGE_SIZE = 10
+VIEWS = ('garuda', 'scopus', 'googlescholar')
+
+CAPTCHA_PAGE = ('<html><body><form id="captcha-form"><p>Our systems have detected unusual traffic from your '
+                'computer network. Please show you\'re not a robot.</p><div class="g-recaptcha"></div>'
+                '</form></body></html>')
+ERROR_PAGE = '<html><body><h1>503 Service Unavailable</h1></body></html>'
+NOT_FOUND_PAGE = '<html><body><h1>404 Not Found</h1></body></html>'
+
+SURNAMES = ('Lubis', 'Siregar', 'Nasution', 'Wijaya', 'Santoso', 'Pratama', 'Hidayat', 'Saputra',
+            'Kusuma', 'Halim', 'Gunawan', 'Setiawan')
+GIVEN_NAMES = ('Muharman', 'Dewi', 'Agus', 'Rina', 'Budi', 'Sari', 'Eko', 'Fitri', 'Hendra', 'Lestari')
+TOPICS = ('Deep Learning', 'Supply Chain', 'Smart Grid', 'Information Security', 'E-Government',
+          'Image Segmentation', 'Network Slicing', 'Sentiment Analysis', 'Antenna Design', 'IoT')
+VENUES = ('Jurnal Teknik Informatika', 'IEEE Access', 'Procedia Computer Science', 'JOIV',
+          'Bulletin of Electrical Engineering and Informatics', 'TELKOMNIKA')
+DEPARTMENTS = ('Informatika', 'Sistem Informasi', 'Teknik Elektro', 'Teknik Industri', 'Manajemen')
+
+
+class SiteConfig(object):
+
+    def __init__(self, affiliations=2, author_pages=3, authors_per_page=10, publications=25,
+                 documents=50, scholar_publications=120, scholar_results=100,
+                 latency=(0.0, 0.0), error_rate=0.0, captcha_rate=0.0, retry_after=0, outage=None, seed=1):
+        self.affiliations = affiliations
+        self.author_pages = author_pages
+        self.authors_per_page = authors_per_page
+        self.publications = publications  # per author and view
+        self.documents = documents  # per affiliation (affiliations/detail)
+        self.scholar_publications = scholar_publications  # per Scholar profile
+        self.scholar_results = scholar_results  # per Scholar query
+        self.latency = latency
+        self.error_rate = error_rate
+        self.captcha_rate = captcha_rate
+        self.retry_after = retry_after
+        self.outage = outage
+        self.seed = seed
+
+    def affiliation_ids(self):
+        return [str(FIRST_AFFILIATION + k) for k in range(self.affiliations)]
+
+    def author_count(self):
+        return self.affiliations * self.author_pages * self.authors_per_page
+
+
+def _rng(*key):
+    # Same URL, same page: seeded from the identifying parts only
+    return random.Random(zlib.crc32('\x1f'.join(map(str, key)).encode('utf-8')))
+
+
+def _name(rng):
+    return f'{rng.choice(GIVEN_NAMES)} {rng.choice(SURNAMES)}'
+
+
+def _title(rng, n):
+    return f'{rng.choice(TOPICS)} for {rng.choice(TOPICS)}: Study {n}'
+
+
+def _int_arg(query, name, default):
+    try:
+        return int(query.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _page(body, title='SINTA'):
+    return f'<html><head><title>{escape(title)}</title></head><body>{body}</body></html>'
+
+
+def _pager(page, pages, records):
+    return f'<div class="pagination-text"><small>Page {page} of {pages} | Total Records : {records}</small></div>'
+
+
+# --- SINTA ---------------------------------------------------------------------
+
+def affiliation_list_page(config, page):
+    ids = config.affiliation_ids()
+    pages = max(1, math.ceil(len(ids) / LIST_PAGE_SIZE))
+    rows = []
+    for affil_id in ids[(page - 1) * LIST_PAGE_SIZE:page * LIST_PAGE_SIZE]:
+        rows.append(f'<tr><td><dl><dt><a href="/affiliations/detail?id={affil_id}&view=overview">'
+                    f'Universitas {affil_id}</a></dt></dl></td></tr>')
+    return _page(f'<table><tbody>{"".join(rows)}</tbody></table>{_pager(page, pages, len(ids))}')
+
+
+def affiliation_documents_page(config, affil_id, page):
+    rows = []
+    start = (page - 1) * LIST_PAGE_SIZE
+    for n in range(start, min(start + LIST_PAGE_SIZE, config.documents)):
+        rng = _rng('document', affil_id, n)
+        authors = ', '.join(_name(rng) for _ in range(rng.randint(1, 4)))
+        rows.append(f'<tr><td><dl><dt><a href="https://doi.org/10.5555/{affil_id}.{n}">{_title(rng, n)}</a></dt>'
+                    f'<dd>{escape(authors)}</dd><dd>{rng.choice(VENUES)}</dd></dl></td>'
+                    f'<td class="index-val uk-text-center">{rng.randint(2010, 2025)}</td>'
+                    f'<td class="index-val uk-text-center">{rng.randint(0, 80)}</td></tr>')
+    return _page(f'<table><tbody>{"".join(rows)}</tbody></table>')
+
+
+def author_list_page(config, affil_id, page):
+    k = int(affil_id) - FIRST_AFFILIATION if affil_id.isdigit() else -1
+    items = []
+    if 0 <= k < config.affiliations and 1 <= page <= config.author_pages:
+        first = (k + 1) * AUTHOR_ID_BLOCK + (page - 1) * config.authors_per_page
+        for sinta_id in range(first, first + config.authors_per_page):
+            name = _name(_rng('author', sinta_id))
+            items.append(f'<div class="au-item"><div class="profile-name">'
+                         f'<a href="/authors/profile/{sinta_id}">{name}</a></div></div>')
+    return _page(''.join(items))
+
+
+def author_affiliation(sinta_id):
+    return str(FIRST_AFFILIATION + sinta_id // AUTHOR_ID_BLOCK - 1)
+
+
+def author_header(config, sinta_id):
+    rng = _rng('author', sinta_id)
+    name = _name(rng)
+    affil_id = author_affiliation(sinta_id)
+    stats = []
+    for metric, values in (('Article', [config.publications] * 2 + [rng.randint(0, 10)]),
+                           ('Citation', [rng.randint(0, 900) for _ in range(3)]),
+                           ('H-Index', [rng.randint(0, 25) for _ in range(3)])):
+        stats.append(f'<tr><td>{metric}</td>' + ''.join(f'<td>{v}</td>' for v in values) + '</tr>')
+    return (f'<div class="profile"><h3><a href="/authors/profile/{sinta_id}">{name}</a></h3>'
+            f'<div class="meta-profile"><a href="/affiliations/profile/{affil_id}">Universitas {affil_id}</a>'
+            f'<a href="/departments/profile/{affil_id}/{rng.randint(1, 5)}">{rng.choice(DEPARTMENTS)}</a>'
+            f'<a href="#!">SINTA ID : {sinta_id}</a></div>'
+            f'<table class="stat-table"><thead><tr><th></th><th>Scopus</th><th>GScholar</th><th>WOS</th></tr>'
+            f'</thead><tbody>{"".join(stats)}</tbody></table></div>')
+
+
+def author_view_items(config, sinta_id, view, page):
+    items = []
+    start = (page - 1) * VIEW_PAGE_SIZE
+    for n in range(start, min(start + VIEW_PAGE_SIZE, config.publications)):
+        rng = _rng(view, sinta_id, n)
+        names = [(rng.choice(SURNAMES), rng.choice(GIVEN_NAMES)) for _ in range(rng.randint(1, 4))]
+        if view == 'garuda':
+            author_line = '; '.join(f'{last}, {first}' for last, first in names)
+            cited = f'10.5555/sinta.{sinta_id}.{n}'
+        elif view == 'googlescholar':
+            author_line = ', '.join(f'{first[0]} {last}' for last, first in names)
+            cited = f'{rng.randint(0, 150)} cited'
+        else:
+            author_line = f'Creator : {names[0][0]} {names[0][1][0]}.'
+            cited = f'{rng.randint(0, 150)} cited'
+        items.append(f'<div class="ar-list-item"><div class="ar-title">'
+                     f'<a href="https://example.org/{view}/{sinta_id}/{n}">{_title(rng, n)}</a></div>'
+                     f'<div class="ar-meta"><a href="#!" class="ar-pub">{rng.choice(VENUES)}</a>'
+                     f'<a href="#!">{escape(author_line)}</a>'
+                     f'<a href="#!" class="ar-year">{rng.randint(2010, 2025)}</a>'
+                     f'<a href="#!" class="ar-cited">{cited}</a></div></div>')
+    pages = max(1, math.ceil(config.publications / VIEW_PAGE_SIZE))
+    return ''.join(items) + _pager(page, pages, config.publications)
+
+
+def author_page(config, sinta_id, view, page):
+    body = author_header(config, sinta_id)
+    if view in VIEWS:
+        body += author_view_items(config, sinta_id, view, page)
+    return _page(body)
+
+
+# --- Google Scholar -----------------------------------------------------------------
+
+def scholar_profile_page(config, user, cstart, pagesize):
+    rng = _rng('scholar', user)
+    citations = rng.randint(10, 5000)
+    stats = ''.join(
+        f'<tr><td class="gsc_rsb_sc1"><a>{label}</a></td><td class="gsc_rsb_std">{value}</td>'
+        f'<td class="gsc_rsb_std">{value // 2}</td></tr>'
+        for label, value in (('Citations', citations), ('h-index', rng.randint(1, 40)),
+                             ('i10-index', rng.randint(0, 80))))
+    rows = []
+    for n in range(cstart, min(cstart + pagesize, config.scholar_publications)):
+        prng = _rng('scholar', user, n)
+        authors = ', '.join(f'{prng.choice(GIVEN_NAMES)[0]} {prng.choice(SURNAMES)}' for _ in range(prng.randint(1, 5)))
+        year = prng.randint(2010, 2025)
+        rows.append(f'<tr class="gsc_a_tr"><td class="gsc_a_t">'
+                    f'<a class="gsc_a_at" href="/citations?view_op=view_citation&user={user}&citation_for_view={user}:{n}">'
+                    f'{_title(prng, n)}</a><div class="gs_gray">{escape(authors)}</div>'
+                    f'<div class="gs_gray">{prng.choice(VENUES)}, {year}</div></td>'
+                    f'<td class="gsc_a_c"><a class="gsc_a_ac">{prng.randint(0, 300)}</a></td>'
+                    f'<td class="gsc_a_y"><span>{year}</span></td></tr>')
+    header = ''
+    if cstart == 0:
+        header = (f'<div id="gsc_prf_in">{_name(rng)}</div><div class="gsc_prf_il">Universitas {rng.randint(1, 9)}</div>'
+                  f'<div id="gsc_prf_int"><a>{rng.choice(TOPICS)}</a><a>{rng.choice(TOPICS)}</a></div>'
+                  f'<table id="gsc_rsb_st"><thead><tr><th></th><th class="gsc_rsb_sth">All</th>'
+                  f'<th class="gsc_rsb_sth">Since 2020</th></tr></thead><tbody>{stats}</tbody></table>')
+    return _page(f'{header}<table id="gsc_a_t"><tbody>{"".join(rows)}</tbody></table>', 'Google Scholar')
+
+
+def scholar_results_page(config, query, start):
+    results = []
+    for n in range(start, min(start + 10, config.scholar_results)):
+        rng = _rng('result', query, n)
+        authors = ', '.join(f'{rng.choice(GIVEN_NAMES)[0]} {rng.choice(SURNAMES)}' for _ in range(rng.randint(1, 4)))
+        cited = rng.randint(0, 500)
+        results.append(f'<div class="gs_r gs_or gs_scl"><div class="gs_ri">'
+                       f'<h3 class="gs_rt"><a href="https://example.org/paper/{n}">{_title(rng, n)}</a></h3>'
+                       f'<div class="gs_a">{escape(authors)} - {rng.choice(VENUES)}, {rng.randint(2010, 2025)} - example.org</div>'
+                       f'<div class="gs_rs">{escape(query)} ...</div>'
+                       f'<div class="gs_fl"><a href="/scholar?cites={n}">Cited by {cited}</a></div></div></div>')
+    more = ''
+    if start + 10 < config.scholar_results:
+        more = f'<a href="/scholar?q={escape(query)}&start={start + 10}">Next</a>'
+    return _page(''.join(results) + more, 'Google Scholar')
+
+
+class FakeSite(object):
+    '''Renders the pages and injects the configured faults; counts what it served.'''
+
+    def __init__(self, config=None):
+        self.config = config or SiteConfig()
+        self._random = random.Random(self.config.seed)
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.epoch = time.monotonic()
+        self.stats = {'requests': 0, 'kinds': {}, 'statuses': {}, 'latencies': []}
+
+    def route(self, path, query):
+        '''(kind, status, html) for a request path, before fault injection.'''
+        config = self.config
+        parts = [p for p in path.split('/') if p]
+        if parts == ['affiliations']:
+            return 'affiliations', 200, affiliation_list_page(config, _int_arg(query, 'page', 1))
+        if parts == ['affiliations', 'detail']:
+            return ('affiliation_documents', 200,
+                    affiliation_documents_page(config, query.get('id', ''), _int_arg(query, 'page', 1)))
+        if len(parts) == 3 and parts[:2] == ['affiliations', 'authors']:
+            return 'author_list', 200, author_list_page(config, parts[2], _int_arg(query, 'page', 1))
+        if len(parts) == 3 and parts[:2] == ['authors', 'profile'] and parts[2].isdigit():
+            view = query.get('view', '')
+            return (f'author_{view}' if view else 'author_profile', 200,
+                    author_page(config, int(parts[2]), view, _int_arg(query, 'page', 1)))
+        if parts == ['citations'] and query.get('user'):
+            return ('scholar_profile', 200, scholar_profile_page(
+                config, query['user'], _int_arg(query, 'cstart', 0), _int_arg(query, 'pagesize', 20)))
+        if parts == ['scholar']:
+            return 'scholar_results', 200, scholar_results_page(config, query.get('q', ''), _int_arg(query, 'start', 0))
+        return 'not_found', 404, NOT_FOUND_PAGE
+
+    def fault(self, kind):
+        '''(status, html, headers) replacing the response, or None.'''
+        config = self.config
+        headers = {'Retry-After': str(config.retry_after)} if config.retry_after > 0 else {}
+        if config.outage:
+            start, seconds = config.outage
+            if start <= time.monotonic() - self.epoch < start + seconds:
+                return 503, ERROR_PAGE, headers
+        if kind.startswith('scholar') and self._random.random() < config.captcha_rate:
+            return 429, CAPTCHA_PAGE, headers
+        if self._random.random() < config.error_rate:
+            return 503, ERROR_PAGE, headers
+        return None
+
+    async def handle(self, request):
+        started = time.perf_counter()
+        kind, status, html = self.route(request.path, request.query)
+        headers = {}
+        injected = self.fault(kind)
+        if injected:
+            status, html, headers = injected
+        low, high = self.config.latency
+        if high > 0:
+            await asyncio.sleep(self._random.uniform(low, high))
+        stats = self.stats
+        stats['requests'] += 1
+        stats['kinds'][kind] = stats['kinds'].get(kind, 0) + 1
+        stats['statuses'][status] = stats['statuses'].get(status, 0) + 1
+        stats['latencies'].append(time.perf_counter() - started)
+        return web.Response(status=status, text=html, content_type='text/html', headers=headers)
+
+    def app(self):
+        app = web.Application()
+        app.router.add_route('GET', '/{tail:.*}', self.handle)
+        return app
+
+
+class ServerThread(object):
+    '''Serve a FakeSite from a background thread with its own event loop.'''
+
+    def __init__(self, site, host='127.0.0.1', port=0):
+        self.site = site
+        self.host = host
+        self.port = port
+        self._loop = None
+        self._runner = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='fakesite', daemon=True)
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._runner = web.AppRunner(self.site.app(), access_log=None)
+        self._loop.run_until_complete(self._runner.setup())
+        self._loop.run_until_complete(web.TCPSite(self._runner, self.host, self.port).start())
+        # Port 0: the OS picked one
+        self.port = self._runner.addresses[0][1]
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.run_until_complete(self._runner.cleanup())
+        self._loop.close()
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    @property
+    def address(self):
+        return f'{self.host}:{self.port}'
+
+    def host_map(self, hosts):
+        '''HTTP_HOST_MAP value (common/session.py) sending `hosts` here.'''
+        return ','.join(f'{host}={self.address}' for host in hosts)
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
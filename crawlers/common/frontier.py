@@ -0,0 +1,221 @@
+'''
+Central crawl frontier: one process owns the work of several sources and
+spaces the requests per host, instead of every crawler sleeping on its own.
+
+- Politeness keeps a request budget per host (min/max delay between
+  request starts, shared by every worker thread). A blocked response
+  (403/429) widens that host's delay, successes narrow it back.
+- Frontier holds the tasks (one author or profile each), deduplicated by
+  key and ordered by priority (the last crawl time: never crawled and
+  stalest first). pop() hands out the best task of a host that has a free
+  slot and is due soonest, so a slow or backed-off host does not hold up
+  the others.
+- dispatch() runs worker threads that pop, handle and report back.
+
+    frontier = Frontier(politeness)
+    frontier.push(Task(url, priority=last_crawled_at.timestamp(), kind='sinta', data=entry))
+    dispatch(frontier, handle, workers=4)   # handle(task) calls politeness.wait(url) per request
+'''
+
+import time
+import heapq
+import random
+import logging
+import threading
+from urllib.parse import urlparse
+
+from . import log, metrics, replay
+
+logger = logging.getLogger(__name__)
+
+BLOCK_STATUSES = (403, 429)
+
+
+def host_of(url):
+    return urlparse(url).netloc.lower()
+
+
+class HostPolicy(object):
+    '''Delay range between request starts and concurrent tasks for one host.'''
+
+    def __init__(self, min_delay, max_delay=None, concurrency=1, max_backoff=16):
+        self.min_delay = min_delay
+        self.max_delay = min_delay if max_delay is None else max_delay
+        self.concurrency = concurrency
+        self.max_backoff = max_backoff
+
+
+class Politeness(object):
+    '''
+    Per-host request spacing shared by all threads of the process. Hosts
+    without a policy use `default`.
+    '''
+
+    def __init__(self, policies=None, default=None):
+        self.policies = dict(policies or {})
+        self.default = default or HostPolicy(1, 3)
+        self._next_at = {}
+        self._backoff = {}
+        self._lock = threading.Lock()
+
+    def policy(self, host):
+        return self.policies.get(host, self.default)
+
+    def wait(self, url):
+        if replay.replaying():
+            # Pages come from the recorded store, no server to be polite to
+            return
+        host = host_of(url)
+        policy = self.policy(host)
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_at.get(host, 0.0))
+            delay = random.uniform(policy.min_delay, policy.max_delay) * self._backoff.get(host, 1)
+            self._next_at[host] = start + delay
+        if start > now:
+            metrics.observe('crawler_politeness_wait_seconds', start - now, host=host)
+            time.sleep(start - now)
+
+    def ready_at(self, host):
+        with self._lock:
+            return self._next_at.get(host, 0.0)
+
+    def report(self, url, status):
+        '''Widen the delay of a host that blocked us, narrow it after a success.'''
+        host = host_of(url)
+        policy = self.policy(host)
+        with self._lock:
+            factor = self._backoff.get(host, 1)
+            if status in BLOCK_STATUSES:
+                factor = min(factor * 2, policy.max_backoff)
+            elif factor > 1:
+                factor = max(factor / 2, 1)
+            self._backoff[host] = factor
+        if status in BLOCK_STATUSES:
+            log.event(logger, logging.WARNING, "Host throttled, delay widened", host=host, status=status,
+                      factor=factor)
+
+    def limiter(self, url):
+        '''RateLimiter-compatible view (wait() without arguments) of the host of `url`.'''
+        return _HostLimiter(self, url)
+
+
+class _HostLimiter(object):
+
+    def __init__(self, politeness, url):
+        self.politeness = politeness
+        self.url = url
+
+    def wait(self):
+        self.politeness.wait(self.url)
+
+
+class Task(object):
+    '''
+    One unit of work: `url` decides the host, `key` deduplicates (defaults
+    to the URL) and lower `priority` is served first.
+    '''
+    __slots__ = ('url', 'priority', 'kind', 'data', 'key', 'host')
+
+    def __init__(self, url, priority=0.0, kind=None, data=None, key=None):
+        self.url = url
+        self.priority = priority
+        self.kind = kind
+        self.data = data
+        self.key = key or url
+        self.host = host_of(url)
+
+
+class Frontier(object):
+    '''Deduplicated, host-aware priority queue of Tasks.'''
+
+    def __init__(self, politeness=None):
+        self.politeness = politeness or Politeness()
+        self._queues = {}
+        self._in_flight = {}
+        self._seen = set()
+        self._seq = 0
+        self._cond = threading.Condition()
+
+    def push(self, task):
+        '''Queue `task`; False when its key was already pushed in this run.'''
+        with self._cond:
+            if task.key in self._seen:
+                metrics.inc('crawler_frontier_duplicates_total', kind=task.kind or '')
+                return False
+            self._seen.add(task.key)
+            self._seq += 1
+            heapq.heappush(self._queues.setdefault(task.host, []), (task.priority, self._seq, task))
+            self._cond.notify()
+        return True
+
+    def __len__(self):
+        with self._cond:
+            return sum(len(q) for q in self._queues.values())
+
+    def _candidate(self):
+        # Host with a free slot that is due soonest; priority breaks the tie
+        best = None
+        for host, queue in self._queues.items():
+            if not queue or self._in_flight.get(host, 0) >= self.politeness.policy(host).concurrency:
+                continue
+            rank = (self.politeness.ready_at(host), queue[0][0])
+            if best is None or rank < best[0]:
+                best = (rank, host)
+        return best[1] if best else None
+
+    def pop(self):
+        '''
+        Next task to run, blocking while every host with work is busy.
+        None once the frontier is empty and no task is in flight (a task in
+        flight may still push more).
+        '''
+        with self._cond:
+            while True:
+                host = self._candidate()
+                if host is not None:
+                    task = heapq.heappop(self._queues[host])[2]
+                    self._in_flight[host] = self._in_flight.get(host, 0) + 1
+                    return task
+                if not any(self._queues.values()) and not any(self._in_flight.values()):
+                    self._cond.notify_all()
+                    return None
+                self._cond.wait()
+
+    def done(self, task):
+        with self._cond:
+            self._in_flight[task.host] -= 1
+            self._cond.notify_all()
+
+
+def dispatch(frontier, handle, workers=4):
+    '''
+    Run handle(task) for every task of the frontier on `workers` threads.
+    Returns (handled, failed); an exception fails that task only.
+    '''
+    counts = {'handled': 0, 'failed': 0}
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            task = frontier.pop()
+            if task is None:
+                return
+            try:
+                handle(task)
+                outcome = 'handled'
+            except Exception as e:
+                outcome = 'failed'
+                log.event(logger, logging.ERROR, "Task failed", kind=task.kind, url=task.url, error=repr(e))
+            finally:
+                frontier.done(task)
+            metrics.inc('crawler_frontier_tasks_total', kind=task.kind or '', outcome=outcome)
+            with lock:
+                counts[outcome] += 1
+
+    threads = [threading.Thread(target=worker, name=f'frontier-{i}', daemon=True) for i in range(max(1, workers))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts['handled'], counts['failed']
@@ -0,0 +1,125 @@
+'''
+Structured logging for the crawlers.
+
+setup() puts one handler on the root logger that writes one JSON object
+per line to stdout, where the Node job runner already collects it:
+
+    {"ts": "...", "level": "INFO", "job": "...", "logger": "...", "msg": "...", <fields>}
+
+    LOG_LEVEL         root level (default INFO)
+    LOG_FORMAT        "json" (default) or "text" for local runs
+    LOG_SAMPLE_EVERY  per-record events (one per dosen, journal, item...) are
+                      logged at INFO only for one in N (default 100, 0 = never);
+                      at LOG_LEVEL=DEBUG every one of them is logged
+
+Fields are passed with event()/record()/summary() as keyword arguments and
+become top-level keys of the JSON line.
+'''
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+
+_RESERVED = ('ts', 'level', 'job', 'logger', 'msg')
+
+_job = os.environ.get('CRAWLER_JOB', 'crawler')
+_handler = None
+_counts = {}
+_counts_lock = threading.Lock()
+
+
+def _fields(record):
+    return getattr(record, 'fields', None) or {}
+
+
+class JsonFormatter(logging.Formatter):
+
+    def format(self, record):
+        payload = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + '.%03dZ' % record.msecs,
+            'level': record.levelname,
+            'job': _job,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in _fields(record).items():
+            payload['field_' + key if key in _RESERVED else key] = value
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+
+    def __init__(self):
+        super(TextFormatter, self).__init__('%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    def format(self, record):
+        line = super(TextFormatter, self).format(record)
+        fields = _fields(record)
+        if fields:
+            line += ' ' + ' '.join(f'{k}={v}' for k, v in fields.items())
+        return line
+
+
+def setup(job=None, level=None, stream=None):
+    '''Configure the root logger once per process; later calls only rename the job.'''
+    global _job, _handler
+    if job:
+        _job = job
+    if _handler is not None:
+        return logging.getLogger()
+    level = level or os.environ.get('LOG_LEVEL', 'INFO').upper()
+    _handler = logging.StreamHandler(stream or sys.stdout)
+    # Also on the handler: Scrapy resets the root logger to NOTSET
+    _handler.setLevel(level)
+    _handler.setFormatter(TextFormatter() if os.environ.get('LOG_FORMAT') == 'text' else JsonFormatter())
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_handler)
+    root.setLevel(level)
+    logging.captureWarnings(True)
+    return root
+
+
+def event(logger, level, msg, **fields):
+    logger.log(level, msg, extra={'fields': fields})
+
+
+def _sample_every():
+    return int(os.environ.get('LOG_SAMPLE_EVERY', 100))
+
+
+def _debug_enabled(logger):
+    if _handler is not None and _handler.level > logging.DEBUG:
+        return False
+    return logger.isEnabledFor(logging.DEBUG)
+
+
+def record(logger, kind, msg, **fields):
+    '''
+    Per-record event of type `kind`: always counted, logged at DEBUG when
+    enabled, otherwise only every LOG_SAMPLE_EVERY-th one at INFO.
+    '''
+    with _counts_lock:
+        n = _counts[kind] = _counts.get(kind, 0) + 1
+    if _debug_enabled(logger):
+        event(logger, logging.DEBUG, msg, kind=kind, seq=n, **fields)
+        return
+    every = _sample_every()
+    if every > 0 and n % every == 1 % every:
+        event(logger, logging.INFO, msg, kind=kind, seq=n, sampled=every, **fields)
+
+
+def record_counts():
+    with _counts_lock:
+        return dict(_counts)
+
+
+def summary(logger, msg, **fields):
+    '''Run-level INFO line, with the per-kind record() counts attached.'''
+    event(logger, logging.INFO, msg, event='summary', records=record_counts(), **fields)
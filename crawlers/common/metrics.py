@@ -0,0 +1,219 @@
+'''
+Crawl metrics: counters, gauges and latency histograms kept in-process and
+exposed in Prometheus text format.
+
+    CRAWLER_METRICS_DIR   flush() writes <dir>/<job>-<pid>.prom there, ready
+                          for the node_exporter textfile collector
+    STATSD_HOST           host:port; every observation is also sent as a
+                          StatsD UDP packet (labels folded into the name)
+
+Each process has its own registry: worker processes call flush() before
+they exit, the parser pool reports parse time back to its parent instead.
+'''
+
+import os
+import time
+import socket
+import threading
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+HELP = {
+    'crawler_fetch_seconds': 'HTTP fetch latency',
+    'crawler_fetch_bytes_total': 'Response bytes downloaded',
+    'crawler_fetch_retries_total': 'Fetch attempts that were retried',
+    'crawler_fetch_errors_total': 'Fetches that failed',
+    'crawler_blocked_total': 'Responses that look like a block (403/429/CAPTCHA)',
+    'crawler_parse_seconds': 'Time spent parsing one page',
+    'crawler_map_seconds': 'Time spent mapping parsed rows to records',
+    'crawler_items_total': 'Records produced by the parsers',
+    'crawler_items_per_second': 'Records per second over the run',
+    'crawler_mongo_write_seconds': 'MongoDB write latency',
+    'crawler_run_seconds': 'Wall time since the process started',
+    'crawler_notify_sent_total': 'Chat notifications sent',
+    'crawler_notify_coalesced_total': 'Queued notifications replaced by a newer one',
+    'crawler_notify_errors_total': 'Chat notifications that failed to send',
+    'crawler_export_rows_total': 'Rows written to Parquet exports',
+    'crawler_export_write_seconds': 'Time spent writing one Parquet chunk',
+    'crawler_analytics_seconds': 'Time spent per citation analytics stage',
+    'crawler_politeness_wait_seconds': 'Time a request waited for its host budget',
+    'crawler_frontier_tasks_total': 'Frontier tasks handled, by outcome',
+    'crawler_frontier_duplicates_total': 'Tasks dropped because their key was already queued',
+    'crawler_breaker_state': 'Circuit breaker state per host (0 closed, 1 half-open, 2 open)',
+    'crawler_breaker_transitions_total': 'Circuit breaker state changes, by new state',
+    'crawler_breaker_rejected_total': 'Requests given up because the breaker stayed open too long',
+    'crawler_breaker_wait_seconds': 'Time a request waited for an open breaker',
+    'crawler_retry_after_total': 'Responses whose Retry-After held the host',
+}
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    body = ','.join('%s="%s"' % (k, v.replace('\\', '\\\\').replace('"', '\\"')) for k, v in pairs)
+    return '{' + body + '}'
+
+
+class Registry(object):
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self.started_at = time.time()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._gauges[(name, _label_key(labels))] = value
+
+    def observe(self, name, value, buckets=DEFAULT_BUCKETS, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = {'buckets': buckets, 'counts': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(hist['buckets']):
+                if value <= bound:
+                    hist['counts'][i] += 1
+            hist['sum'] += value
+            hist['count'] += 1
+
+    def counter_value(self, name, **labels):
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def counters(self, name):
+        '''{labels-tuple: value} for every series of counter `name`.'''
+        with self._lock:
+            return {k[1]: v for k, v in self._counters.items() if k[0] == name}
+
+    def histogram_totals(self, name):
+        '''(sum, count) of histogram `name` over all of its label sets.'''
+        total = 0.0
+        count = 0
+        with self._lock:
+            for (n, _), hist in self._histograms.items():
+                if n == name:
+                    total += hist['sum']
+                    count += hist['count']
+        return total, count
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for kind, series in (('counter', self._counters), ('gauge', self._gauges)):
+                for name in sorted({k[0] for k in series}):
+                    if name in HELP:
+                        lines.append(f'# HELP {name} {HELP[name]}')
+                    lines.append(f'# TYPE {name} {kind}')
+                    for (n, key), value in sorted(series.items()):
+                        if n == name:
+                            lines.append(f'{name}{_format_labels(key)} {value}')
+            for name in sorted({k[0] for k in self._histograms}):
+                if name in HELP:
+                    lines.append(f'# HELP {name} {HELP[name]}')
+                lines.append(f'# TYPE {name} histogram')
+                for (n, key), hist in sorted(self._histograms.items(), key=lambda kv: kv[0]):
+                    if n != name:
+                        continue
+                    for bound, count in zip(hist['buckets'], hist['counts']):
+                        lines.append(f'{name}_bucket{_format_labels(key, [("le", str(bound))])} {count}')
+                    lines.append(f'{name}_bucket{_format_labels(key, [("le", "+Inf")])} {hist["count"]}')
+                    lines.append(f'{name}_sum{_format_labels(key)} {hist["sum"]}')
+                    lines.append(f'{name}_count{_format_labels(key)} {hist["count"]}')
+        return '\n'.join(lines) + '\n'
+
+
+class _StatsD(object):
+
+    def __init__(self, address):
+        host, _, port = address.partition(':')
+        self.address = (host, int(port or 8125))
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def send(self, name, value, kind, labels):
+        suffix = ''.join('.' + str(v).replace('.', '_').replace(' ', '_') for _, v in sorted(labels.items()))
+        try:
+            self.sock.sendto(f'{name}{suffix}:{value}|{kind}'.encode('utf-8'), self.address)
+        except OSError:
+            pass
+
+
+registry = Registry()
+_job = os.environ.get('CRAWLER_JOB', 'crawler')
+_statsd = _StatsD(os.environ['STATSD_HOST']) if os.environ.get('STATSD_HOST') else None
+
+
+def configure(job):
+    '''Name used for the flushed file (and nothing else); call once per entry script.'''
+    global _job
+    _job = job
+
+
+def reset():
+    '''Start from an empty registry, e.g. in a forked worker that inherited the parent's.'''
+    global registry
+    registry = Registry()
+
+
+def inc(name, value=1, **labels):
+    registry.inc(name, value, **labels)
+    if _statsd:
+        _statsd.send(name, value, 'c', labels)
+
+
+def set_gauge(name, value, **labels):
+    registry.set(name, value, **labels)
+    if _statsd:
+        _statsd.send(name, value, 'g', labels)
+
+
+def observe(name, value, **labels):
+    registry.observe(name, value, **labels)
+    if _statsd:
+        _statsd.send(name, int(value * 1000), 'ms', labels)
+
+
+@contextmanager
+def timer(name, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def render():
+    elapsed = time.time() - registry.started_at
+    registry.set('crawler_run_seconds', round(elapsed, 3))
+    for key, value in registry.counters('crawler_items_total').items():
+        registry.set('crawler_items_per_second', round(value / elapsed, 3) if elapsed > 0 else 0, **dict(key))
+    return registry.render()
+
+
+def flush(path=None):
+    '''
+    Write the exposition to `path` or <CRAWLER_METRICS_DIR>/<job>-<pid>.prom.
+    Returns the path written, or None when no destination is configured.
+    '''
+    directory = os.environ.get('CRAWLER_METRICS_DIR')
+    if path is None and not directory:
+        return None
+    path = path or os.path.join(directory, f'{_job}-{os.getpid()}.prom')
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(render())
+    os.replace(tmp, path)
+    return path
@@ -0,0 +1,91 @@
+'''
+Non-blocking chat notifications (Telegram) for long crawls.
+
+notify() only stores the message and returns; a daemon thread sends at
+most one message every `min_interval` seconds. Messages sharing a key
+(e.g. "progress of university X") replace each other while they wait, and
+everything pending is joined into one message per send, so a fast crawl
+produces a handful of updates instead of one request per page and a slow
+or failing chat API never holds up the crawl.
+'''
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+from . import log, metrics
+
+logger = logging.getLogger(__name__)
+
+# Telegram rejects longer messages
+MAX_LENGTH = 4096
+
+
+class Notifier(object):
+
+    def __init__(self, send, min_interval=3.0, max_length=MAX_LENGTH):
+        self.send = send
+        self.min_interval = min_interval
+        self.max_length = max_length
+        self._pending = OrderedDict()
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='notifier', daemon=True)
+        self._thread.start()
+
+    def notify(self, text, key=None):
+        '''Queue `text`; a waiting message with the same key is replaced.'''
+        with self._cond:
+            if key is None:
+                self._seq += 1
+                key = ('seq', self._seq)
+            elif key in self._pending:
+                metrics.inc('crawler_notify_coalesced_total')
+                del self._pending[key]
+            self._pending[key] = text
+            self._cond.notify()
+
+    def _take(self):
+        # Oldest messages first, as many as fit in one chat message
+        parts = []
+        size = 0
+        while self._pending:
+            key, text = next(iter(self._pending.items()))
+            text = text[:self.max_length]
+            if parts and size + len(text) + 1 > self.max_length:
+                break
+            del self._pending[key]
+            parts.append(text)
+            size += len(text) + 1
+        return '\n'.join(parts)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending and self._closed:
+                    return
+                text = self._take()
+            try:
+                self.send(text)
+                metrics.inc('crawler_notify_sent_total')
+            except Exception as e:
+                metrics.inc('crawler_notify_errors_total', reason=type(e).__name__)
+                log.event(logger, logging.WARNING, "Notifikasi gagal dikirim", error=str(e))
+            time.sleep(self.min_interval)
+
+    def close(self, timeout=30):
+        '''Flush what is pending (waiting at most `timeout` seconds) and stop the thread.'''
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+
+def telegram_sender(bot, chat_id):
+    def send(text):
+        bot.sendMessage(chat_id=chat_id, text=text)
+    return send
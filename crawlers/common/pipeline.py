@@ -0,0 +1,136 @@
+'''
+Three-stage fetch -> parse -> write pipeline for the crawlers.
+
+fetch() runs in background threads, parse() in a ProcessPoolExecutor (or
+inline with parse_workers=0) and write() in the calling thread, which is
+the only one touching Mongo. The stages are connected by bounded queues:
+when parsing or writing falls behind, the fetcher blocks instead of piling
+pages up in memory.
+'''
+
+import time
+import logging
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from . import metrics
+from .profiling import detach as detach_profiler
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+def _put(q, value, stop):
+    # Blocking put that still notices when the consumer gave up
+    while not stop.is_set():
+        try:
+            q.put(value, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _timed(parse, item, payload):
+    # Runs in the parser process; the elapsed time travels back with the result
+    start = time.perf_counter()
+    result = parse(item, payload)
+    return result, time.perf_counter() - start
+
+
+def run_pipeline(items, fetch, parse, write, parse_workers=1, queue_size=32, fetch_workers=1,
+                 source='pipeline'):
+    '''
+    fetch(item) -> payload, or None to skip the item
+    parse(item, payload) -> result; a picklable module-level function when
+        parse_workers > 0
+    write(item, result)
+
+    At most `queue_size` fetched pages wait for a parser and at most
+    `queue_size` parse results wait for the writer. With fetch_workers > 1
+    several items are fetched concurrently (fetch must be thread-safe) and
+    results arrive out of order. Parse errors are logged and the item
+    skipped; fetch and write errors abort the run. Parse time is recorded
+    as crawler_parse_seconds{source=...}.
+    Returns the number of items written.
+    '''
+    fetched = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    errors = []
+    items = iter(items)
+    items_lock = threading.Lock()
+
+    def next_item():
+        with items_lock:
+            return next(items, _DONE)
+
+    def fetcher():
+        try:
+            while not stop.is_set():
+                item = next_item()
+                if item is _DONE:
+                    return
+                payload = fetch(item)
+                if payload is not None and not _put(fetched, (item, payload), stop):
+                    return
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            _put(fetched, _DONE, stop)
+
+    def result_of(item, result_fn):
+        try:
+            result, elapsed = result_fn()
+            metrics.observe('crawler_parse_seconds', elapsed, source=source)
+            return True, result
+        except Exception as e:
+            logger.warning(f"Parse failed for {item}: {e}")
+            return False, None
+
+    threads = [threading.Thread(target=fetcher, name=f'pipeline-fetcher-{i}', daemon=True)
+               for i in range(max(1, fetch_workers))]
+    for thread in threads:
+        thread.start()
+    # Parser processes are not profiled: they report their timings back as metrics
+    pool = ProcessPoolExecutor(max_workers=parse_workers, initializer=detach_profiler) if parse_workers > 0 else None
+    in_flight = deque()
+    written = 0
+
+    def drain(block_until):
+        nonlocal written
+        while in_flight and (len(in_flight) > block_until or in_flight[0][1].done()):
+            item, future = in_flight.popleft()
+            ok, result = result_of(item, future.result)
+            if ok:
+                write(item, result)
+                written += 1
+
+    try:
+        running = len(threads)
+        while running:
+            job = fetched.get()
+            if job is _DONE:
+                running -= 1
+                continue
+            item, payload = job
+            if pool is None:
+                ok, result = result_of(item, lambda: _timed(parse, item, payload))
+                if ok:
+                    write(item, result)
+                    written += 1
+                continue
+            in_flight.append((item, pool.submit(_timed, parse, item, payload)))
+            drain(queue_size - 1)
+        drain(0)
+    finally:
+        stop.set()
+        if pool is not None:
+            pool.shutdown()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return written
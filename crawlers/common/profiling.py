@@ -0,0 +1,178 @@
+'''
+--profile support for the crawler entry points.
+
+A profiled run records cProfile data (for the calling thread and every
+thread started while profiling) and tracemalloc snapshots, then writes a
+plain-text report with:
+
+- the per-stage breakdown (fetch, parse, map, write) taken from the
+  metrics histograms, so it also covers parser processes that report
+  their timings back to the parent;
+- the top functions by cumulative time;
+- the top allocation sites still alive at the end of the run.
+
+A forked worker inherits the parent's active profiler; call detach()
+(e.g. as the pool initializer) before the worker profiles itself, since
+only one cProfile may be enabled at a time from Python 3.12.
+'''
+
+import io
+import sys
+import time
+import logging
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Stage -> histogram that measures it
+STAGES = (
+    ('fetch', 'crawler_fetch_seconds'),
+    ('parse', 'crawler_parse_seconds'),
+    ('map', 'crawler_map_seconds'),
+    ('write', 'crawler_mongo_write_seconds'),
+)
+
+# Profilers started in this process (or inherited through fork) and not stopped yet
+_active = []
+
+
+def add_profile_argument(parser):
+    parser.add_argument('--profile', type=str, nargs='?', const='profile_report.txt', default=None,
+                        metavar='REPORT', help='Profile the run and write a report (default profile_report.txt)')
+
+
+class Profiler(object):
+
+    def __init__(self, path, top=30, frames=10):
+        self.path = path
+        self.top = top
+        self.frames = frames
+        self._profiles = []
+        self._lock = threading.Lock()
+        self._started_at = None
+        self._stopped = False
+        self._main = None
+
+    def _thread_hook(self, *args):
+        # Called once on the first profile event of each new thread
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return
+        with self._lock:
+            self._profiles.append(profile)
+
+    def start(self):
+        self._started_at = time.perf_counter()
+        self._stage_base = {name: metrics.registry.histogram_totals(hist) for name, hist in STAGES}
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        if sys.version_info < (3, 12):
+            # From 3.12 cProfile uses sys.monitoring and already sees every thread
+            threading.setprofile(self._thread_hook)
+        main = cProfile.Profile()
+        try:
+            main.enable()
+        except ValueError:
+            # Another profiling tool is already active (3.12+): report stages and memory only
+            logger.warning("cProfile unavailable, another profiler is active; function timings omitted")
+        else:
+            self._main = main
+            self._profiles.append(main)
+        _active.append(self)
+        return self
+
+    def _disable(self):
+        self._stopped = True
+        if self._main is not None:
+            self._main.disable()
+        threading.setprofile(None)
+        if self in _active:
+            _active.remove(self)
+
+    def stop(self):
+        '''Stop profiling and write the report; safe to call more than once.'''
+        if self._stopped or self._started_at is None:
+            return None
+        self._disable()
+        elapsed = time.perf_counter() - self._started_at
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(self.report(elapsed, snapshot, peak))
+        return self.path
+
+    def _stage_lines(self, elapsed):
+        lines = [f'{"stage":<8} {"total s":>10} {"calls":>8} {"mean ms":>10} {"% wall":>8}']
+        for name, hist in STAGES:
+            total, count = metrics.registry.histogram_totals(hist)
+            base_total, base_count = self._stage_base[name]
+            total -= base_total
+            count -= base_count
+            mean = (total / count * 1000) if count else 0.0
+            share = (total / elapsed * 100) if elapsed else 0.0
+            lines.append(f'{name:<8} {total:>10.3f} {count:>8} {mean:>10.2f} {share:>7.1f}%')
+        lines.append('(stages overlap when fetch, parse and write run concurrently)')
+        return lines
+
+    def report(self, elapsed, snapshot, peak):
+        out = io.StringIO()
+        stats = None
+        with self._lock:
+            profiles = list(self._profiles)
+        for profile in profiles:
+            try:
+                if stats is None:
+                    stats = pstats.Stats(profile, stream=out)
+                else:
+                    stats.add(profile)
+            except TypeError:
+                # Thread profile that never saw an event
+                continue
+
+        out.write(f'Wall time: {elapsed:.3f}s, profiled threads: {len(profiles)}\n\n')
+        out.write('== Stages ==\n')
+        out.write('\n'.join(self._stage_lines(elapsed)) + '\n\n')
+        out.write(f'== Top {self.top} functions by cumulative time ==\n')
+        if stats is not None:
+            stats.sort_stats('cumulative').print_stats(self.top)
+        out.write(f'\n== Top {self.top} allocation sites (peak traced {peak / 1024 / 1024:.1f} MiB) ==\n')
+        for stat in snapshot.statistics('lineno')[:self.top]:
+            frame = stat.traceback[0]
+            out.write(f'{stat.size / 1024:10.1f} KiB {stat.count:8} blocks  {frame.filename}:{frame.lineno}\n')
+        return out.getvalue()
+
+
+def detach():
+    '''
+    Turn off the profilers inherited from a forked parent without writing
+    their reports; the parent still writes its own.
+    '''
+    for profiler in list(_active):
+        profiler._disable()
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+@contextmanager
+def profiled(path):
+    '''Profile the block when `path` is set, else run it untouched.'''
+    if not path:
+        yield None
+        return
+    profiler = Profiler(path).start()
+    try:
+        yield profiler
+    finally:
+        written = profiler.stop()
+        if written:
+            logger.info(f"Profile report written to {written}")
@@ -0,0 +1,177 @@
+'''
+Typed records shared by every crawler and writer.
+
+One shape for a publication whatever site it came from, the one the Scopus
+job (crawlers/scopus_api/run.js) already stores in `journal`:
+`authorsDetailed` of {name, authid, hIndex, fullName}, empty strings and 0
+rather than None. Records are slotted dataclasses (no per-object __dict__,
+so long runs holding thousands of parsed items use less memory) and
+encode straight to the dict / JSON / BSON the writers need.
+
+from_dict() also reads the older spellings still found in stored data and
+output files: `authorDetailed`, `authId`, a single `affiliation`.
+'''
+
+import sys
+import json
+from dataclasses import dataclass, field, fields
+
+import bson
+
+# slots=True needs Python 3.10; older interpreters get plain dataclasses
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+def _str(value):
+    return '' if value is None else str(value)
+
+
+def _int(value):
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class Record(object):
+    '''Encoding shared by the record classes; FIELDS is filled in below each class.'''
+
+    __slots__ = ()
+    FIELDS = ()
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False, default=str)
+
+    def to_bson(self):
+        return bson.encode(self.to_dict())
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
+
+    @classmethod
+    def from_bson(cls, data):
+        return cls.from_dict(bson.decode(data))
+
+
+@dataclass(**_SLOTS)
+class Author(Record):
+    name: str = ''
+    authid: str = ''
+    hIndex: int = 0
+    fullName: str = ''
+
+    @classmethod
+    def from_dict(cls, d):
+        if isinstance(d, str):
+            return cls(name=d, fullName=d)
+        name = _str(d.get('name'))
+        return cls(name=name, authid=_str(d.get('authid') or d.get('authId')),
+                   hIndex=_int(d.get('hIndex')), fullName=_str(d.get('fullName')) or name)
+
+
+@dataclass(**_SLOTS)
+class Publication(Record):
+    title: str = ''
+    authors: list = field(default_factory=list)
+    authorsDetailed: list = field(default_factory=list)
+    affiliations: list = field(default_factory=list)
+    doi: str = ''
+    eid: str = ''
+    publicationName: str = ''
+    publicationYear: str = ''
+    coverDate: str = ''
+    citation: int = 0
+    url: str = ''
+    snippet: str = ''
+    # Scholar user whose profile listed the publication (googlescholar_author)
+    profileId: str = ''
+    # sinta-garuda / sinta-scopus / sinta-googlescholar / scholar / scholar-profile / scholar-selenium
+    source: str = ''
+
+    @classmethod
+    def create(cls, title, authors=(), authids=None, **kwargs):
+        '''Publication with authorsDetailed built from author names (and their IDs when known).'''
+        authors = list(authors)
+        authids = authids or {}
+        detailed = [Author(name=name, authid=_str(authids.get(name)), fullName=name) for name in authors]
+        return cls(title=_str(title), authors=authors, authorsDetailed=detailed, **kwargs)
+
+    def to_dict(self):
+        d = Record.to_dict(self)
+        d['authorsDetailed'] = [a.to_dict() for a in self.authorsDetailed]
+        return d
+
+    @classmethod
+    def from_dict(cls, d):
+        detailed = [Author.from_dict(a) for a in (d.get('authorsDetailed') or d.get('authorDetailed') or [])]
+        authors = d.get('authors')
+        if not isinstance(authors, list):
+            authors = [a.fullName or a.name for a in detailed]
+        affiliations = d.get('affiliations')
+        if affiliations is None:
+            affiliations = [d['affiliation']] if d.get('affiliation') else []
+        return cls(
+            title=_str(d.get('title')), authors=authors, authorsDetailed=detailed,
+            affiliations=list(affiliations), doi=_str(d.get('doi')), eid=_str(d.get('eid')),
+            publicationName=_str(d.get('publicationName')), publicationYear=_str(d.get('publicationYear')),
+            coverDate=_str(d.get('coverDate')), citation=_int(d.get('citation')), url=_str(d.get('url')),
+            snippet=_str(d.get('snippet')), profileId=_str(d.get('profileId')), source=_str(d.get('source')))
+
+
+@dataclass(**_SLOTS)
+class Lecturer(Record):
+    '''A `dosen` document: SINTA profile header plus the stat table.'''
+    nama: str = ''
+    affiliation: str = ''
+    department: str = ''
+    sinta_id: str = ''
+    article_scopus: int = 0
+    article_gscholar: int = 0
+    article_wos: int = 0
+    citation_scopus: int = 0
+    citation_gscholar: int = 0
+    citation_wos: int = 0
+    hindex_scopus: int = 0
+    hindex_gscholar: int = 0
+    hindex_wos: int = 0
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(**{name: (_int(d.get(name)) if cls.__dataclass_fields__[name].type is int else _str(d.get(name)))
+                      for name in cls.FIELDS})
+
+
+@dataclass(**_SLOTS)
+class ScholarAuthor(Record):
+    '''A Google Scholar author profile (citations?user=...).'''
+    authId: str = ''
+    name: str = ''
+    affiliation: str = ''
+    interests: list = field(default_factory=list)
+    recentSince: str = ''
+    citations: int = 0
+    citationsRecent: int = 0
+    hIndex: int = 0
+    hIndexRecent: int = 0
+    i10Index: int = 0
+    i10IndexRecent: int = 0
+    url: str = ''
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(**{name: (d.get(name) or [] if name == 'interests' else
+                             _int(d.get(name)) if cls.__dataclass_fields__[name].type is int else _str(d.get(name)))
+                      for name in cls.FIELDS})
+
+
+for _cls in (Author, Publication, Lecturer, ScholarAuthor):
+    _cls.FIELDS = tuple(f.name for f in fields(_cls))
+
+
+def as_document(record):
+    '''Mongo document of a record; dicts pass through, so writers take either.'''
+    return record.to_dict() if isinstance(record, Record) else record
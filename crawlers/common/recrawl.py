@@ -0,0 +1,152 @@
+'''
+Staleness-driven recrawl priority for lecturer (dosen) records.
+
+Every profile crawl is compared with the previous one (observe()):
+
+    crawl_count        profile crawls seen
+    change_count       crawls whose profile differed from the one before
+    content_hash       crc32 of the profile fields, to detect that change
+    first_crawled_at   start of the observation window
+    last_changed_at
+    citation_total     citation_scopus + citation_gscholar + citation_wos
+    citation_velocity  new citations per day, exponentially smoothed
+
+plan() turns those into a score per frontier entry: the probability that
+the profile changed since its last crawl, treating changes as a Poisson
+process whose rate is estimated from change_count over the observed days
+(with a prior of PRIOR_CHANGES per PRIOR_DAYS, so young records are not
+judged on one or two crawls), boosted by the citations expected to have
+arrived since then. Never-crawled records come first. Entries are taken
+in score order while their estimated request cost fits the budget.
+
+The cost of a publication view is the page count its pager showed on the
+last crawl (<view>_pages, stored by sinta.mark_stage), else the article
+count of the profile / PAGE_SIZE, else one page.
+'''
+
+import math
+import zlib
+from datetime import datetime
+
+# Profile fields whose change counts as a change of the record
+HASH_FIELDS = ('nama', 'affiliation', 'department',
+               'article_scopus', 'article_gscholar', 'article_wos',
+               'citation_scopus', 'citation_gscholar', 'citation_wos',
+               'hindex_scopus', 'hindex_gscholar', 'hindex_wos')
+CITATION_FIELDS = ('citation_scopus', 'citation_gscholar', 'citation_wos')
+TRACK_FIELDS = ('content_hash', 'crawl_count', 'change_count', 'first_crawled_at', 'last_changed_at',
+                'citation_total', 'citation_velocity', 'profile_crawled_at')
+TRACK_PROJECTION = dict.fromkeys(TRACK_FIELDS, 1)
+
+PRIOR_CHANGES = 1.0
+PRIOR_DAYS = 30.0
+VELOCITY_SMOOTHING = 0.5
+# Citations expected since the last crawl that double the score
+CITATION_SCALE = 10.0
+PAGE_SIZE = 10  # publications per SINTA view page
+VIEW_ARTICLES = {'scopus': 'article_scopus', 'googlescholar': 'article_gscholar'}
+VIEW_PAGES = {view: f'{view}_pages' for view in ('garuda', 'scopus', 'googlescholar')}
+NEVER = float('inf')
+DAY = 86400.0
+
+
+def content_hash(profile):
+    text = '\x1f'.join(str(profile.get(f, '')) for f in HASH_FIELDS)
+    return zlib.crc32(text.encode('utf-8'))
+
+
+def citation_total(profile):
+    return sum(int(profile.get(f) or 0) for f in CITATION_FIELDS)
+
+
+def observe(previous, profile, now):
+    '''
+    Tracking fields for a profile crawled at `now`, given the tracking fields
+    stored by the previous crawl (None for a new record). Returns
+    (fields to $set, whether the profile changed).
+    '''
+    digest = content_hash(profile)
+    citations = citation_total(profile)
+    if not previous or previous.get('content_hash') is None:
+        return {'content_hash': digest, 'crawl_count': 1, 'change_count': 0, 'first_crawled_at': now,
+                'last_changed_at': now, 'citation_total': citations, 'citation_velocity': 0.0}, True
+    changed = digest != previous['content_hash']
+    velocity = previous.get('citation_velocity') or 0.0
+    last = previous.get('profile_crawled_at')
+    if last is not None:
+        days = (now - last).total_seconds() / DAY
+        if days > 0:
+            observed = max(citations - (previous.get('citation_total') or 0), 0) / days
+            velocity = VELOCITY_SMOOTHING * observed + (1 - VELOCITY_SMOOTHING) * velocity
+    return {
+        'content_hash': digest,
+        'crawl_count': (previous.get('crawl_count') or 0) + 1,
+        'change_count': (previous.get('change_count') or 0) + changed,
+        'first_crawled_at': previous.get('first_crawled_at') or last or now,
+        'last_changed_at': now if changed else previous.get('last_changed_at') or last or now,
+        'citation_total': citations,
+        'citation_velocity': round(velocity, 4),
+    }, changed
+
+
+def change_rate(doc, now):
+    '''Estimated profile changes per day.'''
+    first = doc.get('first_crawled_at') or doc.get('profile_crawled_at') or now
+    days = max((now - first).total_seconds() / DAY, 0.0)
+    return ((doc.get('change_count') or 0) + PRIOR_CHANGES) / (days + PRIOR_DAYS)
+
+
+def score(doc, crawled_at, now):
+    '''Recrawl value of a record last crawled at `crawled_at` (None: never).'''
+    if crawled_at is None or crawled_at == datetime.min:
+        return NEVER
+    age = max((now - crawled_at).total_seconds() / DAY, 0.0)
+    p_changed = 1 - math.exp(-change_rate(doc, now) * age)
+    expected_citations = (doc.get('citation_velocity') or 0.0) * age
+    return p_changed * (1 + expected_citations / CITATION_SCALE)
+
+
+def cost(doc, stages, max_pages=0):
+    '''
+    Requests a recrawl of `stages` is expected to take: one per profile,
+    the pages seen on the last crawl of each publication view (or the
+    article count / PAGE_SIZE).
+    '''
+    views = [s for s in stages if s != 'profile']
+    if not views:
+        return 1
+    total = 0
+    for view in views:
+        pages = doc.get(VIEW_PAGES.get(view))
+        if not pages:
+            pages = math.ceil(int(doc.get(VIEW_ARTICLES.get(view), 0) or 0) / PAGE_SIZE)
+        pages = max(1, int(pages))
+        total += min(pages, max_pages) if max_pages > 0 else pages
+    return total
+
+
+def plan(frontier, docs, budget=0, now=None, max_pages=0):
+    '''
+    Rank frontier entries (sinta.build_frontier) by score using their dosen
+    documents (`docs`, keyed by SINTA ID) and keep those that fit `budget`
+    requests (0 = no budget). Entries get recrawl_score and recrawl_cost.
+    Returns (ranked entries, requests planned).
+    '''
+    now = now or datetime.utcnow()
+    ranked = []
+    for entry in frontier:
+        doc = docs.get(entry['sinta_id'], {})
+        crawled_at = entry.get('last_crawled_at')
+        ranked.append(dict(entry, recrawl_score=score(doc, crawled_at, now),
+                           recrawl_cost=cost(doc, entry['stages'], max_pages)))
+    ranked.sort(key=lambda e: (-e['recrawl_score'], e['recrawl_cost']))
+    if budget <= 0:
+        return ranked, sum(e['recrawl_cost'] for e in ranked)
+    chosen = []
+    spent = 0
+    for entry in ranked:
+        # A costly entry that does not fit leaves room for cheaper ones further down
+        if spent + entry['recrawl_cost'] <= budget:
+            chosen.append(entry)
+            spent += entry['recrawl_cost']
+    return chosen, spent
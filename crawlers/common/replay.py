@@ -0,0 +1,170 @@
+'''
+Record/replay of fetched pages, so a parser change can be tested against
+yesterday's crawl instead of the live sites.
+
+Every response body is stored zlib-compressed in one SQLite file, keyed by
+URL (last recording wins). The mode comes from the environment, so the
+SINTA scripts, the Scrapy spider and scholar_selenium.py all follow it:
+
+    CRAWLER_RECORD   path of the store to write every fetched page into
+    CRAWLER_REPLAY   path of a store to serve pages from; nothing goes to
+                     the network and politeness delays are skipped
+
+A URL missing from the replay store raises ReplayMiss, which callers treat
+like any other failed request.
+'''
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+
+import requests
+
+_stores = {}
+_lock = threading.Lock()
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    headers TEXT,
+    encoding TEXT,
+    body BLOB NOT NULL,
+    recorded_at REAL NOT NULL
+)
+'''
+
+
+class ReplayMiss(requests.exceptions.ConnectionError):
+    '''The URL was never recorded into the replay store.'''
+
+
+class Store(object):
+    '''One SQLite file of compressed pages; safe to share between threads.'''
+
+    def __init__(self, path, readonly=False):
+        self.path = path
+        if readonly:
+            self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            # WAL lets forked shard workers record into the same file
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute(SCHEMA)
+            self._conn.commit()
+        self._lock = threading.Lock()
+
+    def put(self, url, body, status=200, headers=None, encoding=None):
+        if isinstance(body, str):
+            encoding = encoding or 'utf-8'
+            body = body.encode(encoding)
+        row = (url, status, json.dumps(dict(headers or {})), encoding, zlib.compress(body, 6), time.time())
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)', row)
+            self._conn.commit()
+
+    def get(self, url):
+        '''{url, status, headers, encoding, body (bytes), recorded_at} or None.'''
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT url, status, headers, encoding, body, recorded_at FROM pages WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            return None
+        return {
+            'url': row[0],
+            'status': row[1],
+            'headers': json.loads(row[2] or '{}'),
+            'encoding': row[3],
+            'body': zlib.decompress(row[4]),
+            'recorded_at': row[5],
+        }
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+
+def replaying():
+    return bool(os.environ.get('CRAWLER_REPLAY'))
+
+
+def recording():
+    return bool(os.environ.get('CRAWLER_RECORD')) and not replaying()
+
+
+def _store(path, readonly):
+    # One connection per process: a forked worker must not reuse its parent's
+    key = (os.getpid(), path)
+    store = _stores.get(key)
+    if store is None:
+        with _lock:
+            store = _stores.get(key)
+            if store is None:
+                store = _stores[key] = Store(path, readonly=readonly)
+    return store
+
+
+def record_store():
+    return _store(os.environ['CRAWLER_RECORD'], False) if recording() else None
+
+
+def replay_store():
+    return _store(os.environ['CRAWLER_REPLAY'], True) if replaying() else None
+
+
+def lookup(url):
+    '''Recorded page of `url`; raises ReplayMiss when it was never recorded.'''
+    page = replay_store().get(url)
+    if page is None:
+        raise ReplayMiss(f"Not in replay store: {url}")
+    return page
+
+
+def record(url, body, status=200, headers=None, encoding=None):
+    store = record_store()
+    if store is not None:
+        store.put(url, body, status=status, headers=headers, encoding=encoding)
+
+
+class ReplayResponse(object):
+    '''The parts of a requests/httpx response the crawlers read.'''
+
+    def __init__(self, page):
+        self.url = page['url']
+        self.status_code = page['status']
+        self.headers = page['headers']
+        self.encoding = page['encoding'] or 'utf-8'
+        self.content = page['body']
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} (replayed) for url: {self.url}", response=self)
+
+
+def add_replay_arguments(parser):
+    parser.add_argument('--record', type=str, default=None, metavar='STORE',
+                        help='Record every fetched page into this store (same as CRAWLER_RECORD)')
+    parser.add_argument('--replay', type=str, default=None, metavar='STORE',
+                        help='Serve pages from this store instead of the network (same as CRAWLER_REPLAY)')
+
+
+def configure(args):
+    '''Apply --record/--replay through the environment, so worker processes inherit them.'''
+    if getattr(args, 'record', None):
+        os.environ['CRAWLER_RECORD'] = args.record
+    if getattr(args, 'replay', None):
+        os.environ['CRAWLER_REPLAY'] = args.replay
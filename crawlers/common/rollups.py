@@ -0,0 +1,225 @@
+'''
+Materialized statistics in the `stats` collection, kept up to date from
+the records changed since the last rollup.
+
+    {_id: 'year:2021', kind: 'year', key: '2021', publications, citations}
+    {_id: 'dosen:6012345', kind: 'dosen', key: '6012345', nama, department,
+     affiliation, publications, citations, per_year: {'2021': {publications, citations}}}
+    {_id: 'department:Informatika', kind: 'department', key: 'Informatika',
+     dosen, publications, citations, per_year: {...}}
+
+A `journal` or `dosen` document without `stats_at` is a changed record:
+new documents (from any crawler, the Scopus job included) never have it,
+and writers that modify a document unset it. A rollup reads that set, marks
+it, and recomputes only the years, lecturers and departments it touches,
+with indexed queries. Marking a journal also stores `stats_year`, the
+year it was counted under, so a journal whose publicationYear changes
+later recomputes both its old and its new year. Lecturer and department figures come from
+`journal.dosen_ids` (resolve-authors.py); a publication counts once per
+department however many of its lecturers co-authored it.
+'''
+
+from datetime import datetime
+
+from pymongo import ASCENDING, DeleteOne, ReplaceOne, UpdateMany
+
+from . import metrics
+
+UNKNOWN_YEAR = 'Unknown'
+
+
+def stat_id(kind, key):
+    return f'{kind}:{key}'
+
+
+def ensure_indexes(col_journals, col_dosen, col_stats):
+    col_journals.create_index('publicationYear')
+    col_journals.create_index('dosen_ids')
+    col_journals.create_index('stats_at', sparse=True)
+    col_dosen.create_index('department')
+    col_dosen.create_index('stats_at', sparse=True)
+    col_stats.create_index([('kind', ASCENDING), ('key', ASCENDING)], unique=True)
+
+
+def _year(value):
+    return str(value).strip() if value not in (None, '') and str(value).strip() else None
+
+
+def _citation(value):
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else 0
+
+
+def _chunks(items, size):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def changed_records(col_journals, col_dosen, batch_size=1000):
+    '''
+    Years, SINTA IDs, journal _id -> year and dosen _ids of the records
+    changed since the last rollup (documents without stats_at). The years
+    include the one each journal was last counted under (stats_year).
+    '''
+    years = set()
+    dosen_ids = set()
+    journal_years = {}
+    for journal in col_journals.find({'stats_at': {'$exists': False}},
+                                     {'publicationYear': 1, 'dosen_ids': 1, 'stats_year': 1}).batch_size(batch_size):
+        year = journal_years[journal['_id']] = _year(journal.get('publicationYear'))
+        years.update(y for y in (year, journal.get('stats_year')) if y)
+        dosen_ids.update(i for i in journal.get('dosen_ids') or [] if i)
+    dosen_doc_ids = []
+    for dosen in col_dosen.find({'stats_at': {'$exists': False}}, {'sinta_id': 1}).batch_size(batch_size):
+        dosen_doc_ids.append(dosen['_id'])
+        if dosen.get('sinta_id'):
+            dosen_ids.add(dosen['sinta_id'])
+    return years, dosen_ids, journal_years, dosen_doc_ids
+
+
+def mark_rolled_up(collection, ids, now, batch_size=1000, years=None):
+    # Marked before the figures are recomputed: a write landing afterwards
+    # unsets stats_at again and is picked up by the next rollup.
+    # With `years` ({_id: year}) the year counted is kept as stats_year.
+    groups = {}
+    for _id in ids:
+        groups.setdefault(years.get(_id) if years is not None else None, []).append(_id)
+    ops = []
+    for year, group in groups.items():
+        update = {'$set': {'stats_at': now}}
+        if years is not None:
+            if year:
+                update['$set']['stats_year'] = year
+            else:
+                update['$unset'] = {'stats_year': ''}
+        ops.extend(UpdateMany({'_id': {'$in': chunk}}, update) for chunk in _chunks(group, batch_size))
+    for chunk in _chunks(ops, batch_size):
+        with metrics.timer('crawler_mongo_write_seconds', collection=collection.name, op='mark_stats'):
+            collection.bulk_write(chunk, ordered=False)
+
+
+def year_stats(col_journals, years):
+    '''{year: {publications, citations}} for `years`, one grouped query.'''
+    if not years:
+        return {}
+    pipeline = [
+        {'$match': {'publicationYear': {'$in': list(years)}}},
+        {'$group': {'_id': '$publicationYear', 'publications': {'$sum': 1}, 'citations': {'$sum': '$citation'}}},
+    ]
+    stats = {year: {'publications': 0, 'citations': 0} for year in years}
+    for row in col_journals.aggregate(pipeline, allowDiskUse=True):
+        stats[_year(row['_id'])] = {'publications': row['publications'], 'citations': row['citations']}
+    return stats
+
+
+def _empty_totals():
+    return {'publications': 0, 'citations': 0, 'per_year': {}}
+
+
+def _add(totals, year, citation):
+    totals['publications'] += 1
+    totals['citations'] += citation
+    bucket = totals['per_year'].setdefault(year or UNKNOWN_YEAR, {'publications': 0, 'citations': 0})
+    bucket['publications'] += 1
+    bucket['citations'] += citation
+
+
+def people_stats(col_journals, dosen_ids, departments, department_of, batch_size=1000):
+    '''
+    Totals and per-year figures of `dosen_ids` and of `departments`, from one
+    pass over the journals linked to any of their lecturers.
+    '''
+    members = set(dosen_ids)
+    members.update(d for d, dept in department_of.items() if dept in departments)
+    by_dosen = {d: _empty_totals() for d in dosen_ids}
+    by_department = {dept: _empty_totals() for dept in departments}
+    projection = {'publicationYear': 1, 'citation': 1, 'dosen_ids': 1}
+    seen = set()
+    for chunk in _chunks(members, batch_size):
+        for journal in col_journals.find({'dosen_ids': {'$in': chunk}}, projection).batch_size(batch_size):
+            # A journal whose lecturers fall in several chunks comes back once per chunk
+            if journal['_id'] in seen:
+                continue
+            seen.add(journal['_id'])
+            year = _year(journal.get('publicationYear'))
+            citation = _citation(journal.get('citation'))
+            linked = {d for d in journal.get('dosen_ids') or [] if d}
+            for d in linked & by_dosen.keys():
+                _add(by_dosen[d], year, citation)
+            for dept in {department_of.get(d) for d in linked} & by_department.keys():
+                _add(by_department[dept], year, citation)
+    return by_dosen, by_department
+
+
+def load_dosen(col_dosen):
+    '''SINTA ID -> {nama, department, affiliation} of every lecturer.'''
+    projection = {'_id': 0, 'sinta_id': 1, 'nama': 1, 'department': 1, 'affiliation': 1}
+    return {d['sinta_id']: d for d in col_dosen.find({'sinta_id': {'$nin': [None, '']}}, projection).batch_size(5000)}
+
+
+def rollup(col_journals, col_dosen, col_stats, full=False, batch_size=1000):
+    '''
+    Refresh `stats` for the records changed since the last rollup, or for
+    everything with full=True. Returns counts of what was recomputed.
+    '''
+    now = datetime.utcnow()
+    dosen = load_dosen(col_dosen)
+    department_of = {d: (doc.get('department') or '').strip() for d, doc in dosen.items()}
+    department_of = {d: dept for d, dept in department_of.items() if dept}
+
+    if full:
+        years = {_year(y) for y in col_journals.distinct('publicationYear')} - {None}
+        dosen_ids = set(dosen)
+        # Also journals marked before stats_year existed, so later year moves are seen
+        unmarked = {'$or': [{'stats_at': {'$exists': False}}, {'stats_year': {'$exists': False}}]}
+        journal_years = {j['_id']: _year(j.get('publicationYear'))
+                         for j in col_journals.find(unmarked, {'publicationYear': 1})}
+        dosen_doc_ids = [d['_id'] for d in col_dosen.find({'stats_at': {'$exists': False}}, {'_id': 1})]
+    else:
+        years, dosen_ids, journal_years, dosen_doc_ids = changed_records(col_journals, col_dosen, batch_size)
+    mark_rolled_up(col_journals, journal_years, now, batch_size, years=journal_years)
+    mark_rolled_up(col_dosen, dosen_doc_ids, now, batch_size)
+
+    # A lecturer moving department changes both the old and the new one
+    departments = {department_of[d] for d in dosen_ids if d in department_of}
+    if full:
+        departments = set(department_of.values())
+    else:
+        for chunk in _chunks([stat_id('dosen', d) for d in dosen_ids], batch_size):
+            for previous in col_stats.find({'_id': {'$in': chunk}}, {'department': 1}):
+                if previous.get('department'):
+                    departments.add(previous['department'])
+
+    ops = []
+    for year, totals in year_stats(col_journals, years).items():
+        ops.append(ReplaceOne({'_id': stat_id('year', year)},
+                              dict(kind='year', key=year, updated_at=now, **totals), upsert=True))
+    by_dosen, by_department = people_stats(col_journals, dosen_ids, departments, department_of, batch_size)
+    for sinta_id, totals in by_dosen.items():
+        doc = dosen.get(sinta_id)
+        if doc is None:
+            ops.append(DeleteOne({'_id': stat_id('dosen', sinta_id)}))
+            continue
+        ops.append(ReplaceOne({'_id': stat_id('dosen', sinta_id)}, dict(
+            kind='dosen', key=sinta_id, nama=doc.get('nama', ''), department=department_of.get(sinta_id, ''),
+            affiliation=doc.get('affiliation', ''), updated_at=now, **totals), upsert=True))
+    members = {}
+    for sinta_id, dept in department_of.items():
+        members[dept] = members.get(dept, 0) + 1
+    for dept, totals in by_department.items():
+        if not members.get(dept):
+            ops.append(DeleteOne({'_id': stat_id('department', dept)}))
+            continue
+        ops.append(ReplaceOne({'_id': stat_id('department', dept)}, dict(
+            kind='department', key=dept, dosen=members[dept], updated_at=now, **totals), upsert=True))
+    if full:
+        # Keys that no longer exist (a year or department emptied out)
+        for kind, keys in (('year', years), ('dosen', set(dosen)), ('department', departments)):
+            stale = col_stats.find({'kind': kind, 'key': {'$nin': list(keys)}}, {'_id': 1})
+            ops.extend(DeleteOne({'_id': s['_id']}) for s in stale)
+
+    for chunk in _chunks(ops, batch_size):
+        with metrics.timer('crawler_mongo_write_seconds', collection=col_stats.name, op='bulk_replace'):
+            col_stats.bulk_write(chunk, ordered=False)
+    return {'journals_changed': len(journal_years), 'dosen_changed': len(dosen_doc_ids), 'years': len(years),
+            'dosen': len(by_dosen), 'departments': len(by_department), 'writes': len(ops)}
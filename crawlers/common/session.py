@@ -0,0 +1,161 @@
+'''
+Shared keep-alive HTTP session for the crawlers.
+
+One session per process reuses TCP+TLS connections instead of opening a
+new one per page. When httpx with HTTP/2 support (pip install httpx[http2])
+is installed it is used with http2=True; otherwise a requests.Session with
+a sized urllib3 pool. Brotli is advertised only if a decoder is installed.
+
+    HTTP_POOL_SIZE   pooled connections per host (default 10)
+    HTTP2            "0" to force the requests backend
+    HTTP_HOST_MAP    "host=127.0.0.1:8089,..." sends live requests for those
+                     hosts to another address over plain HTTP (the local
+                     stub server of common/fakesite.py, load-test.py)
+
+get() also records into / replays from the page store of common.replay
+(CRAWLER_RECORD / CRAWLER_REPLAY), and sends every live request through
+the circuit breaker of its host (common.breaker).
+'''
+
+import os
+import threading
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import breaker, replay
+
+try:
+    import httpx
+    import h2  # noqa: F401  httpx only speaks HTTP/2 with h2 installed
+except ImportError:
+    httpx = None
+
+try:
+    import brotli  # noqa: F401
+    _BROTLI = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        _BROTLI = True
+    except ImportError:
+        _BROTLI = False
+
+ACCEPT_ENCODING = 'gzip, deflate, br' if _BROTLI else 'gzip, deflate'
+
+# Errors a caller should treat as "request failed" whatever the backend
+REQUEST_ERRORS = (requests.exceptions.RequestException,) + ((httpx.HTTPError,) if httpx else ())
+
+_sessions = {}
+_lock = threading.Lock()
+_host_map = (None, {})
+
+
+class Session(object):
+
+    def __init__(self, pool_size=None, http2=None):
+        pool_size = pool_size or int(os.environ.get('HTTP_POOL_SIZE', 10))
+        if http2 is None:
+            http2 = os.environ.get('HTTP2', '1') != '0'
+        self.http2 = bool(http2 and httpx is not None)
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._streams = set()
+        self._versions = {}
+        headers = {'Accept-Encoding': ACCEPT_ENCODING, 'Connection': 'keep-alive'}
+        if self.http2:
+            self._client = httpx.Client(
+                http2=True, headers=headers, follow_redirects=True,
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size))
+        else:
+            self._client = requests.Session()
+            self._client.headers.update(headers)
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            self._client.mount('http://', adapter)
+            self._client.mount('https://', adapter)
+
+    def get(self, url, headers=None, timeout=10, **kwargs):
+        response = self._client.get(url, headers=headers, timeout=timeout, **kwargs)
+        with self._stats_lock:
+            self._requests += 1
+            if self.http2:
+                version = response.http_version
+                stream = response.extensions.get('network_stream')
+                if stream is not None:
+                    self._streams.add(id(stream))
+            else:
+                version = {10: 'HTTP/1.0', 11: 'HTTP/1.1'}.get(getattr(response.raw, 'version', 11), 'HTTP/1.1')
+            self._versions[version] = self._versions.get(version, 0) + 1
+        return response
+
+    def stats(self):
+        '''Requests sent, connections opened and how many requests reused one.'''
+        with self._stats_lock:
+            requests_sent = self._requests
+            versions = dict(self._versions)
+            connections = len(self._streams)
+        if not self.http2:
+            connections = 0
+            for adapter in set(self._client.adapters.values()):
+                for key in adapter.poolmanager.pools.keys():
+                    connections += adapter.poolmanager.pools[key].num_connections
+        return {
+            'requests': requests_sent,
+            'connections': connections,
+            'reused': max(0, requests_sent - connections),
+            'versions': versions,
+        }
+
+    def close(self):
+        self._client.close()
+
+
+def get_session():
+    '''The process-wide Session (a forked worker gets its own).'''
+    pid = os.getpid()
+    session = _sessions.get(pid)
+    if session is None:
+        with _lock:
+            session = _sessions.get(pid)
+            if session is None:
+                session = _sessions[pid] = Session()
+    return session
+
+
+def host_map():
+    '''HTTP_HOST_MAP as {host: address}, parsed again only when it changes.'''
+    global _host_map
+    raw = os.environ.get('HTTP_HOST_MAP', '')
+    if raw != _host_map[0]:
+        pairs = (item.split('=', 1) for item in raw.split(',') if '=' in item)
+        _host_map = (raw, {host.strip().lower(): address.strip() for host, address in pairs})
+    return _host_map[1]
+
+
+def target_url(url):
+    '''`url` as actually requested: its host swapped per HTTP_HOST_MAP.'''
+    mapping = host_map()
+    if not mapping:
+        return url
+    parts = urlsplit(url)
+    address = mapping.get(parts.netloc.lower())
+    if address is None:
+        return url
+    return urlunsplit(('http', address) + tuple(parts[2:]))
+
+
+def get(url, **kwargs):
+    if replay.replaying():
+        return replay.ReplayResponse(replay.lookup(url))
+    # Breaker and recording keep the original URL, only the wire target changes
+    target = target_url(url)
+    response = breaker.guarded(url, lambda: get_session().get(target, **kwargs))
+    if replay.recording():
+        replay.record(url, response.content, status=response.status_code, encoding=response.encoding,
+                      headers={'Content-Type': response.headers.get('Content-Type', '')})
+    return response
+
+
+def connection_stats():
+    return get_session().stats()
@@ -0,0 +1,136 @@
+'''
+Skip-set of journals already stored, checked before any Mongo call.
+
+Same input as the Scopus job: the scheduler's --skipFile JSON
+({"eids": [...], "dois": [...], "titles": [...]}), or built from the
+`journal` collection when no file is given. Every key is reduced to a
+64-bit fingerprint kept in one sorted array('Q'): 8 bytes per key, a few
+MB for hundreds of thousands of titles, and a lookup is a hash plus a
+short bisect inside a 16-bit prefix bucket.
+
+A false "already stored" needs a fingerprint collision. The 64 bits are
+crc32 + adler32, and adler32 is weak on short input: its sums stay small,
+so a title of a few words adds only about 26 bits (a single word far
+less). The firm bound is crc32 alone, n / 2**32 per lookup for n keys
+(about 2e-4 at a million keys); with adler32 typical titles land near
+n / 2**58 (about 4e-12). Still far below what a Bloom filter of the same
+size would give.
+'''
+
+import json
+import zlib
+import bisect
+from array import array
+
+_SHIFT = 48
+_BUCKETS = 1 << 16
+
+
+def normalize_title(title):
+    # Same as crawlers/scopus_api/run.js: lower-case, collapsed whitespace
+    return ' '.join((title or '').lower().split())
+
+
+def fingerprint(key):
+    # Two C checksums: ~5x cheaper than a blake2b digest and, unlike hash(),
+    # the same in every worker process
+    data = key.encode('utf-8')
+    return zlib.crc32(data) << 32 | zlib.adler32(data)
+
+
+class FingerprintSet(object):
+    '''Sorted fingerprints loaded once, plus a small set for keys added during the run.'''
+
+    def __init__(self, keys=()):
+        self.sorted = array('Q', sorted({fingerprint(k) for k in keys}))
+        self.added = set()
+        # bucket[p] = first index whose top 16 bits are >= p, so a lookup only
+        # bisects the handful of fingerprints sharing its prefix
+        self.buckets = array('L', [0]) * (_BUCKETS + 1)
+        prefix = 0
+        for i, fp in enumerate(self.sorted):
+            top = fp >> _SHIFT
+            while prefix <= top:
+                self.buckets[prefix] = i
+                prefix += 1
+        for p in range(prefix, _BUCKETS + 1):
+            self.buckets[p] = len(self.sorted)
+
+    def __len__(self):
+        return len(self.sorted) + len(self.added)
+
+    def nbytes(self):
+        return self.sorted.itemsize * len(self.sorted) + self.buckets.itemsize * len(self.buckets)
+
+    def add(self, key):
+        self.added.add(fingerprint(key))
+
+    def __contains__(self, key):
+        fp = fingerprint(key)
+        if fp in self.added:
+            return True
+        top = fp >> _SHIFT
+        hi = self.buckets[top + 1]
+        i = bisect.bisect_left(self.sorted, fp, self.buckets[top], hi)
+        return i < hi and self.sorted[i] == fp
+
+
+def journal_keys(journal):
+    keys = []
+    if journal.get('eid'):
+        keys.append('eid:' + journal['eid'])
+    if journal.get('doi'):
+        keys.append('doi:' + journal['doi'].strip().lower())
+    title = normalize_title(journal.get('title'))
+    if title:
+        keys.append('title:' + title)
+    return keys
+
+
+class SkipSet(object):
+
+    def __init__(self, keys=()):
+        self.fingerprints = FingerprintSet(keys)
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    def nbytes(self):
+        return self.fingerprints.nbytes()
+
+    def add(self, journal):
+        for key in journal_keys(journal):
+            self.fingerprints.add(key)
+
+    def __contains__(self, journal):
+        return any(key in self.fingerprints for key in journal_keys(journal))
+
+
+def load_skip_file(path):
+    with open(path, encoding='utf-8') as f:
+        payload = json.load(f)
+    journals = ([{'eid': eid} for eid in payload.get('eids') or []] +
+                [{'doi': doi} for doi in payload.get('dois') or []] +
+                [{'title': title} for title in payload.get('titles') or []])
+    return SkipSet(key for journal in journals for key in journal_keys(journal))
+
+
+def build_skip_set(col_journals, query=None):
+    cursor = col_journals.find(query or {}, {'_id': 0, 'eid': 1, 'doi': 1, 'title': 1}).batch_size(5000)
+    return SkipSet(key for journal in cursor for key in journal_keys(journal))
+
+
+def add_skip_arguments(parser):
+    parser.add_argument('--skipFile', type=str, default=None,
+                        help='JSON {eids, dois, titles} of journals already stored (as built by the scheduler)')
+    parser.add_argument('--no-skip-set', action='store_true',
+                        help='Do not build the skip-set from the journal collection when --skipFile is missing')
+
+
+def resolve_skip_set(args, col_journals):
+    '''SkipSet from --skipFile, else built from `col_journals`, or None with --no-skip-set.'''
+    if args.skipFile:
+        return load_skip_file(args.skipFile)
+    if args.no_skip_set or col_journals is None:
+        return None
+    return build_skip_set(col_journals)
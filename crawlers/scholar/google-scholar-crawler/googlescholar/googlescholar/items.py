@@ -2,10 +2,8 @@
 #
 # See documentation in:
 # http://doc.scrapy.org/en/latest/topics/items.html
+#
+# The spiders yield the typed records shared with the other crawlers
+# (crawlers/common/records.py); Scrapy accepts dataclass items as they are.
 
-from scrapy.item import Item, Field
-
-class googlescholarItem(Item):
-    # define the fields for your item here like:
-    name = Field()
-
+from common.records import Author, Publication, ScholarAuthor
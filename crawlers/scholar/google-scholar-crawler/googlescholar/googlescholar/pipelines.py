@@ -11,6 +11,11 @@ import json
 import codecs
 from collections import OrderedDict
 
+from common.records import Publication, Record, ScholarAuthor
+
+# JSON lines of the author spider mix both kinds of record
+RECORD_TYPES = {Publication: 'publication', ScholarAuthor: 'author'}
+
 
 class JsonWithEncodingPipeline(object):
 
@@ -18,7 +23,11 @@ class JsonWithEncodingPipeline(object):
         self.file = codecs.open('data_utf8.json', 'w', encoding='utf-8')
 
     def process_item(self, item, spider):
-        line = json.dumps(OrderedDict(item), ensure_ascii=False, sort_keys=False) + "\n"
+        if isinstance(item, Record):
+            data = dict(recordType=RECORD_TYPES.get(type(item)), **item.to_dict())
+        else:
+            data = OrderedDict(item)
+        line = json.dumps(data, ensure_ascii=False, sort_keys=False) + "\n"
         self.file.write(line)
         return item
 
@@ -11,6 +11,7 @@ import os
 from os.path import dirname
 path = dirname(dirname(os.path.abspath(os.path.dirname(__file__))))
 sys.path.append(path)
+sys.path.append(dirname(dirname(path)))  # crawlers/ for the shared common package
 from misc.log import *
 
 BOT_NAME = 'googlescholar'
@@ -22,8 +23,13 @@ NEWSPIDER_MODULE = 'googlescholar.spiders'
 #USER_AGENT = 'googlescholar (+http://www.yourdomain.com)'
 
 DOWNLOADER_MIDDLEWARES = {
+    # First in line: a replayed page skips proxy, user agent and the network;
+    # last to see responses, so what is recorded is what the spider parses
+    'misc.middleware.ReplayMiddleware': 50,
     'misc.middleware.CustomHttpProxyMiddleware': 400,
     'misc.middleware.CustomUserAgentMiddleware': 401,
+    # After the retry middleware (550) so each attempt is timed on its own
+    'misc.middleware.MetricsMiddleware': 950,
 }
 
 ITEM_PIPELINES = {
@@ -33,7 +39,19 @@ ITEM_PIPELINES = {
 
 LOG_LEVEL = 'INFO'
 
+# JSON lines through crawlers/common/log.py; LOG_FORMAT=text keeps Scrapy's own handler
+if os.environ.get('LOG_FORMAT') != 'text':
+    from common import log as common_log
+    LOG_ENABLED = False
+    common_log.setup(BOT_NAME, level=os.environ.get('LOG_LEVEL', LOG_LEVEL), stream=sys.stderr)
+
 import random
 # Add random delay to each request to avoid bot detection
 DOWNLOAD_DELAY = random.uniform(3, 7)
 RANDOMIZE_DOWNLOAD_DELAY = True
+
+# CRAWLER_REPLAY: pages come from the recorded store, parse at full speed
+if os.environ.get('CRAWLER_REPLAY'):
+    DOWNLOAD_DELAY = 0
+    RANDOMIZE_DOWNLOAD_DELAY = False
+    CONCURRENT_REQUESTS_PER_DOMAIN = 32
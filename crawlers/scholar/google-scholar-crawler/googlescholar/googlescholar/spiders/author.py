@@ -0,0 +1,155 @@
+import re
+import time
+from urllib.parse import urlparse, parse_qs
+
+from scrapy.http import Request
+
+from misc.log import *
+from misc.spider import CommonSpider
+from common import metrics
+from common.profiling import Profiler
+from common.records import Publication, ScholarAuthor
+
+
+PROFILE_URL = 'https://scholar.google.com/citations?hl=en&user={user}&cstart={cstart}&pagesize={pagesize}'
+# Largest page the profile view serves; 100 publications per request instead of 20
+PAGESIZE = 100
+
+
+def scholar_user_id(url):
+    '''The `user` parameter of a Scholar citations/profile link, or None.'''
+    if not url:
+        return None
+    users = parse_qs(urlparse(url).query).get('user')
+    return users[0] if users else None
+
+
+def _int(text):
+    text = re.sub(r'[^\d]', '', text or '')
+    return int(text) if text else 0
+
+
+class AuthorProfileMixin(object):
+    '''
+    Parses Scholar author profiles (citations?user=...): one author record
+    with the citation/h-index table, then every publication in bulk pages
+    of PAGESIZE rows. Shared by the profile spider and by the search spider
+    when it follows author-links.
+    '''
+
+    profile_css_rules = {
+        'tr.gsc_a_tr': {
+            'title': 'a.gsc_a_at::text',
+            'url': 'a.gsc_a_at::attr(href)',
+            'authors': '.gsc_a_t .gs_gray:nth-of-type(1)::text',
+            'venue': '.gsc_a_t .gs_gray:nth-of-type(2)::text',
+            'citation-text': 'a.gsc_a_ac::text',
+            'year': '.gsc_a_y span::text',
+        }
+    }
+
+    def author_request(self, user, cstart=0):
+        # self.authors_seen is set up by the spider's __init__
+        if cstart == 0:
+            if user in self.authors_seen:
+                return None
+            self.authors_seen.add(user)
+        url = PROFILE_URL.format(user=user, cstart=cstart, pagesize=PAGESIZE)
+        return Request(url, callback=self.parse_author, meta={'scholar_user': user, 'cstart': cstart})
+
+    def parse_author_stats(self, response, user):
+        # Rows: Citations / h-index / i10-index; columns: All, Since <year>
+        stats = {}
+        for row in response.css('#gsc_rsb_st tbody tr'):
+            label = ' '.join(row.css('td.gsc_rsb_sc1 *::text').extract()).strip().lower()
+            values = [_int(v) for v in row.css('td.gsc_rsb_std::text').extract()]
+            if not label or not values:
+                continue
+            key = {'citations': 'citations', 'h-index': 'hIndex', 'i10-index': 'i10Index'}.get(label, label)
+            stats[key] = values[0]
+            stats[key + 'Recent'] = values[1] if len(values) > 1 else None
+        since = response.css('#gsc_rsb_st thead th.gsc_rsb_sth::text').extract()
+        # First .gsc_prf_il is the affiliation line (may be a link)
+        affiliation = response.css('.gsc_prf_il')[:1].xpath('string()').extract_first()
+        return ScholarAuthor(
+            authId=user,
+            name=(response.css('#gsc_prf_in::text').extract_first() or '').strip(),
+            affiliation=(affiliation or '').strip(),
+            interests=[i.strip() for i in response.css('#gsc_prf_int a::text').extract()],
+            recentSince=since[-1].strip() if len(since) > 1 else '',
+            citations=stats.get('citations', 0),
+            citationsRecent=stats.get('citationsRecent') or 0,
+            hIndex=stats.get('hIndex', 0),
+            hIndexRecent=stats.get('hIndexRecent') or 0,
+            i10Index=stats.get('i10Index', 0),
+            i10IndexRecent=stats.get('i10IndexRecent') or 0,
+            url=PROFILE_URL.format(user=user, cstart=0, pagesize=PAGESIZE),
+        )
+
+    def map_author_publication(self, row, user):
+        authors = [a.strip() for a in (row.get('authors') or '').split(',') if a.strip() and a.strip() != '...']
+        venue = (row.get('venue') or '').strip()
+        url = row.get('url') or ''
+        return Publication.create(
+            row.get('title'), authors,
+            citation=_int(row.get('citation-text')),
+            publicationName=re.sub(r',?\s*\d{4}$', '', venue).strip(),
+            publicationYear=row.get('year') or '',
+            url='https://scholar.google.com' + url if url.startswith('/') else url,
+            profileId=user,
+            source='scholar-profile')
+
+    def parse_author(self, response):
+        user = response.meta['scholar_user']
+        cstart = response.meta['cstart']
+        info('Parse author ' + response.url)
+
+        parse_start = time.perf_counter()
+        author = self.parse_author_stats(response, user) if cstart == 0 else None
+        x = self.parse_with_rules(response, self.profile_css_rules, dict)
+        rows = x[0].get('tr.gsc_a_tr', []) if x else []
+        map_start = time.perf_counter()
+        metrics.observe('crawler_parse_seconds', map_start - parse_start, source='googlescholar_author')
+
+        publications = [self.map_author_publication(row, user) for row in rows if row.get('title')]
+        metrics.observe('crawler_map_seconds', time.perf_counter() - map_start, source='googlescholar_author')
+
+        if author is not None:
+            metrics.inc('crawler_items_total', source='googlescholar_author')
+            record('author', 'Parsed author', authId=user, name=author.name, hIndex=author.hIndex)
+            yield author
+        metrics.inc('crawler_items_total', len(publications), source='googlescholar_author_publication')
+        for publication in publications:
+            record('author_publication', 'Parsed author publication', authId=user, title=publication.title)
+            yield publication
+
+        # A full page means there may be more; the profile has no total count
+        if len(rows) >= PAGESIZE:
+            yield self.author_request(user, cstart + PAGESIZE)
+
+
+class googlescholarAuthorSpider(AuthorProfileMixin, CommonSpider):
+    name = "googlescholar_author"
+    allowed_domains = ["google.com"]
+
+    # scrapy crawl googlescholar_author -a user=ID1,ID2
+    def __init__(self, user='', start_url='', profile='', *args, **kwargs):
+        self.users = [u.strip() for u in user.split(',') if u.strip()]
+        self.authors_seen = set()
+        user_from_url = scholar_user_id(start_url)
+        if user_from_url:
+            self.users.append(user_from_url)
+        self.profiler = Profiler(profile).start() if profile else None
+        super(googlescholarAuthorSpider, self).__init__(*args, **kwargs)
+
+    def start_requests(self):
+        for user in self.users:
+            request = self.author_request(user)
+            if request is not None:
+                yield request
+
+    def closed(self, reason):
+        summary('Spider closed', reason=reason,
+                authors=metrics.registry.counter_value('crawler_items_total', source='googlescholar_author'))
+        if self.profiler is not None and self.profiler.stop():
+            info('Profile report written to ' + self.profiler.path)
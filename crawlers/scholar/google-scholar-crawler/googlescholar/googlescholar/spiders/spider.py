@@ -2,6 +2,7 @@
 import re
 import json
 import pdb
+import time
 from urllib.parse import urlparse
 import urllib.parse
 
@@ -25,6 +26,9 @@ from scrapy.http import Request
 from googlescholar.items import *
 from misc.log import *
 from misc.spider import CommonSpider
+from common import metrics
+from common.profiling import Profiler
+from .author import AuthorProfileMixin, scholar_user_id
 
 
 def _monkey_patching_HTTPClientParser_statusReceived():
@@ -45,7 +49,7 @@ def _monkey_patching_HTTPClientParser_statusReceived():
     HTTPClientParser.statusReceived = statusReceived
 
 
-class googlescholarSpider(CommonSpider):
+class googlescholarSpider(AuthorProfileMixin, CommonSpider):
     name = "googlescholar"
     allowed_domains = ["google.com"]
     start_urls = [
@@ -58,12 +62,23 @@ class googlescholarSpider(CommonSpider):
         Rule(sle(allow=(r".*\.pdf"))),
     ]
 
-    def __init__(self, start_url='', *args, **kwargs):
+    def __init__(self, start_url='', profile='', follow_authors='', *args, **kwargs):
         _monkey_patching_HTTPClientParser_statusReceived()
         if start_url:
             self.start_urls = [start_url]
+        # -a follow_authors=1: also crawl the profile of every linked author
+        self.follow_authors = bool(follow_authors)
+        self.authors_seen = set()
+        # scrapy crawl googlescholar -a profile=profile_report.txt
+        self.profiler = Profiler(profile).start() if profile else None
         super(googlescholarSpider, self).__init__(*args, **kwargs)
 
+    def closed(self, reason):
+        summary('Spider closed', reason=reason,
+                items=metrics.registry.counter_value('crawler_items_total', source=self.name))
+        if self.profiler is not None and self.profiler.stop():
+            info('Profile report written to ' + self.profiler.path)
+
     #.gs_ri: content besides related html/pdf
     list_css_rules = {
         '.gs_r.gs_or': {
@@ -98,36 +113,38 @@ class googlescholarSpider(CommonSpider):
         except Exception as e:
             info(f'Failed to write response_debug.html: {e}')
 
+        parse_start = time.perf_counter()
         x = self.parse_with_rules(response, self.list_css_rules, dict)
         items = []
         if len(x) > 0:
             selector_key = list(self.list_css_rules.keys())[0]
             items = x[0].get(selector_key, [])
-
-        for item in items:
+        # Per result row, same order as `items`: the full .gs_a line (the
+        # ::text rule drops linked names) and every linked author, which the
+        # dict rules reduce to the first href
+        rows = [((row.css('.gs_a').xpath('string()').extract_first() or ''),
+                 [((a.xpath('string()').extract_first() or '').strip(),
+                   scholar_user_id(a.css('::attr(href)').extract_first()))
+                  for a in row.css('.gs_a a')])
+                for row in response.css(selector_key)] if items else []
+        map_start = time.perf_counter()
+        metrics.observe('crawler_parse_seconds', map_start - parse_start, source=self.name)
+
+        results = []
+        linked_users = []
+        for row, item in enumerate(items):
             # --- Parse and map to Scopus-like format ---
             # Parse authors
-            authors_str = item.get('authors', '')
+            authors_str = rows[row][0] if row < len(rows) and rows[row][0] else item.get('authors', '')
             author_names = []
             if authors_str:
                 # Remove trailing journal info if present
                 author_names = authors_str.split('-')[0].split(',')
             author_names = [a.strip() for a in author_names if a.strip()]
-            # Parse author links (if any)
-            author_links = item.get('author-links', [])
-            if isinstance(author_links, str):
-                author_links = [author_links]
-            # Build authorDetailed (no crawling yet, just name)
-            authorDetailed = []
-            for idx, name in enumerate(author_names):
-                author_obj = {
-                    'name': name,
-                    'authId': None,
-                    'hIndex': None,
-                    'fullName': None
-                }
-                # Optionally, follow author link for more detail (not implemented here)
-                authorDetailed.append(author_obj)
+            # Parse author links (if any): linked name -> Scholar user id, kept
+            # as authorsDetailed[].authid to link the googlescholar_author records
+            links = dict((name, user) for name, user in (rows[row][1] if row < len(rows) else []) if user)
+            linked_users.extend(links.values())
 
             # Parse citation
             citation = 0
@@ -157,19 +174,27 @@ class googlescholarSpider(CommonSpider):
                 if doi_match:
                     doi = doi_match.group(1)
 
-            # Compose result
-            scopus_like = {
-                'title': item.get('title', None),
-                'affiliation': None,  # Not available from GS list
-                'authorDetailed': authorDetailed,
-                'citation': citation,
-                'coverDate': pub_year,
-                'doi': doi,
-                'eid': None,  # Not available from GS
-                'publicationName': pub_name,
-                'publicationYear': pub_year,
-                'url': url
-            }
-            info(f"Parsed item: {scopus_like}")
+            # Compose result; affiliations and eid are not available from the GS list
+            scopus_like = Publication.create(
+                item.get('title'), author_names, links,
+                citation=citation,
+                coverDate=pub_year or '',
+                doi=doi or '',
+                publicationName=pub_name or '',
+                publicationYear=pub_year or '',
+                url=url or '',
+                source='scholar')
+            record('item', "Parsed item", title=scopus_like.title, url=scopus_like.url)
+            results.append(scopus_like)
+
+        # Timed before yielding so pipeline work on the items is not counted
+        metrics.observe('crawler_map_seconds', time.perf_counter() - map_start, source=self.name)
+        metrics.inc('crawler_items_total', len(results), source=self.name)
+        for scopus_like in results:
             yield scopus_like
+        if self.follow_authors:
+            for user in linked_users:
+                request = self.author_request(user)
+                if request is not None:
+                    yield request
 
@@ -2,23 +2,33 @@
 # pip install pymongo
 
 import os
-from pymongo import MongoClient
+import sys
+import logging
+from datetime import datetime
+from os.path import dirname
+from pymongo import UpdateOne
+sys.path.append(dirname(dirname(dirname(os.path.abspath(os.path.dirname(__file__))))))
+from common.db import get_db, get_collection
+from common import log, metrics
+from common.records import Record, as_document
 
-# You can adjust this connection string as needed
-MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017/")
-MONGO_DB = os.environ.get("MONGO_DB", "journal_crawling")
+# Connection comes from MONGO_URI / MONGO_DB (see crawlers/common/db.py)
 MONGO_COLLECTION = os.environ.get("MONGO_COLLECTION", "scholar_articles")
+logger = logging.getLogger(__name__)
 
-client = MongoClient(MONGO_URI)
-db = client[MONGO_DB]
-collection = db[MONGO_COLLECTION]
+db = get_db()
+collection = get_collection(MONGO_COLLECTION, db, bulk=True)
 
 def insert_articles(articles):
+    # One article (dict or record) or any iterable of them, generators included
+    if isinstance(articles, (dict, Record)):
+        articles = [articles]
+    else:
+        articles = list(articles or [])
     if articles:
-        if isinstance(articles, dict):
-            articles = [articles]
-        upserted = 0
-        for art in articles:
+        now = datetime.utcnow()
+        ops = []
+        for art in map(as_document, articles):
             # Use DOI or EID if available, else fallback to title+authors as unique key
             query = {}
             if art.get('doi'):
@@ -29,9 +39,15 @@ def insert_articles(articles):
                 # Fallback: use title+authors as unique key
                 query['title'] = art.get('title')
                 query['authors'] = art.get('authors')
-            result = collection.update_one(query, {'$set': art}, upsert=True)
-            if result.upserted_id or result.modified_count:
-                upserted += 1
-        print(f"Upserted {upserted} articles to MongoDB.")
+            # updated_at is the high-water mark of common/export.py
+            ops.append(UpdateOne(query, {'$set': dict(art, updated_at=now)}, upsert=True))
+        # One round trip for the whole batch instead of one per article
+        with metrics.timer('crawler_mongo_write_seconds', collection=collection.name, op='bulk_upsert'):
+            result = collection.bulk_write(ops, ordered=False)
+        if result.acknowledged:
+            upserted = result.upserted_count + result.modified_count
+            log.event(logger, logging.INFO, "Upserted articles to MongoDB", upserted=upserted, batch=len(ops))
+        else:
+            log.event(logger, logging.INFO, "Sent articles to MongoDB (unacknowledged)", batch=len(ops))
     else:
-        print("No articles to insert.")
+        logger.info("No articles to insert.")
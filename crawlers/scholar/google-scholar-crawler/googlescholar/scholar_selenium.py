@@ -1,13 +1,25 @@
 
 import time
 import json
+from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.keys import Keys
 from selenium.common.exceptions import WebDriverException
 # MongoDB helper
-from pymongo import MongoClient
+import os
+import sys
+import atexit
+import logging
+import tempfile
+from os.path import dirname
+sys.path.append(dirname(dirname(dirname(os.path.abspath(os.path.dirname(__file__))))))
+from common.db import get_db, get_collection
+from common import log, metrics, replay
+from common.profiling import Profiler, add_profile_argument
+from common.skipset import add_skip_arguments, resolve_skip_set
+from common.records import Publication
 
 
 # --- CONFIG & CLI ARGS ---
@@ -17,14 +29,25 @@ parser.add_argument('--query', type=str, default='Telkom University', help='Sear
 parser.add_argument('--count', type=int, default=10, help='Number of results to fetch')
 parser.add_argument('--output', type=str, default='output_selenium.json', help='Output JSON file')
 parser.add_argument('--mongoUri', type=str, default=None, help='MongoDB URI (optional)')
+add_profile_argument(parser)
+add_skip_arguments(parser)
+replay.add_replay_arguments(parser)
 args = parser.parse_args()
+replay.configure(args)
 
 QUERY = args.query
 RESULTS_LIMIT = args.count
 OUTPUT_FILE = args.output
 
+metrics.configure('scholar_selenium')
+log.setup('scholar_selenium')
+logger = logging.getLogger('scholar_selenium')
+
+# --profile: the report is written on every exit path (CAPTCHA included)
+if args.profile:
+    atexit.register(Profiler(args.profile).start().stop)
+
 # Optionally override Mongo URI for automation
-import os
 if args.mongoUri:
     os.environ['MONGO_URI'] = args.mongoUri
 
@@ -41,32 +64,61 @@ chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x
 # Path to chromedriver (update if needed)
 driver = webdriver.Chrome(options=chrome_options)
 
-# DB
-MONGO_URI = 'mongodb://localhost:27017/'  # Ganti jika perlu
-DB_NAME = 'journal_crawling'  # Ganti jika perlu
+# DB (MONGO_URI / MONGO_DB, see crawlers/common/db.py)
 COLLECTION_NAME = 'journal'
 
-client = MongoClient(MONGO_URI)
-db = client[DB_NAME]
-col_journals = db[COLLECTION_NAME]
-
-def insert_articles(journal):
-        # Cek duplikasi berdasarkan title, doi, dan authors
+db = get_db()
+col_journals = get_collection(COLLECTION_NAME, db)
+# Journal yang sudah tersimpan (--skipFile dari scheduler, atau dibangun dari koleksi)
+skip = resolve_skip_set(args, col_journals)
+
+def insert_articles(article):
+        journal = article.to_dict()
+        # Skip-set dulu tanpa query Mongo, lalu cek duplikasi berdasarkan title, doi, dan authors
+        if skip is not None and journal in skip:
+            log.record(logger, 'journal_skip', "SKIP (skip-set)", title=journal['title'])
+            return
         query = {
             "title": journal["title"],
-            "doi": journal.get("doi", ""),
-            "authors": journal.get("authors", [])
+            # Older Scholar documents stored a missing DOI as null
+            "doi": journal["doi"] or {"$in": ["", None]},
+            "authors": journal["authors"]
         }
         existing = col_journals.find_one(query)
         if not existing:
-            col_journals.insert_one(journal)
+            journal['updated_at'] = datetime.utcnow()
+            with metrics.timer('crawler_mongo_write_seconds', collection=COLLECTION_NAME, op='insert'):
+                col_journals.insert_one(journal)
+            if skip is not None:
+                skip.add(journal)
         else:
-            print(f"SKIP REDUNDAN: {journal['title']}")
+            log.record(logger, 'journal_skip', "SKIP REDUNDAN", title=journal['title'])
+
+# --- RECORD / REPLAY ---
+# Every result page is stored under page_url(page): the search URL plus
+# &start=10, 20, ... for the pages reached with the Next button, since a
+# click has no URL of its own to key on. With --replay the recorded page
+# source is opened from a local file, so the parser below runs unchanged
+# without touching Scholar.
+REPLAY_FILE = os.path.join(tempfile.gettempdir(), f'scholar_replay_{os.getpid()}.html')
+
+def page_url(page):
+    return SEARCH_URL if page == 0 else f"{SEARCH_URL}&start={page * 10}"
+
+def open_page(page, fetch, settle):
+    if replay.replaying():
+        recorded = replay.lookup(page_url(page))
+        with open(REPLAY_FILE, 'wb') as f:
+            f.write(recorded['body'])
+        driver.get('file://' + REPLAY_FILE)
+        return
+    with metrics.timer('crawler_fetch_seconds', source='scholar_selenium'):
+        fetch()
+    time.sleep(settle)
+    replay.record(page_url(page), driver.page_source)
 
 # --- CRAWL ---
-url = f"https://scholar.google.com/scholar?hl=en&q={QUERY.replace(' ', '+')}"
-driver.get(url)
-time.sleep(3)
+SEARCH_URL = f"https://scholar.google.com/scholar?hl=en&q={QUERY.replace(' ', '+')}"
 
 # CAPTCHA detection helper
 def is_captcha_page(driver):
@@ -80,110 +132,120 @@ def is_captcha_page(driver):
     except WebDriverException:
         return False
 
-results = []
-
-if is_captcha_page(driver):
-    print("[!] CAPTCHA detected. Saving page for debugging.")
-    with open("response_debug.html", "w", encoding="utf-8") as f:
-        f.write(driver.page_source)
-    driver.quit()
-    # Save empty output for consistency
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
-    print(f"Saved 0 results to {OUTPUT_FILE}")
-    print("CAPTCHA page saved as response_debug.html. Please solve CAPTCHA manually or try again later.")
-    exit(1)
-
-while len(results) < RESULTS_LIMIT:
-    articles = driver.find_elements(By.CSS_SELECTOR, '.gs_r.gs_or')
-    for art in articles:
-        try:
-            title_el = art.find_element(By.CSS_SELECTOR, '.gs_rt')
-            title = title_el.text
-            url = title_el.find_element(By.TAG_NAME, 'a').get_attribute('href') if title_el.find_elements(By.TAG_NAME, 'a') else None
-            authors_info = art.find_element(By.CSS_SELECTOR, '.gs_a').text
-            snippet = art.find_element(By.CSS_SELECTOR, '.gs_rs').text if art.find_elements(By.CSS_SELECTOR, '.gs_rs') else ''
-            cited = 0
-            cited_links = art.find_elements(By.PARTIAL_LINK_TEXT, 'Cited by')
-            if cited_links:
+# The replayed page file is removed on every exit, the CAPTCHA ones included
+try:
+    page = 0
+    try:
+        open_page(page, lambda: driver.get(SEARCH_URL), 3)
+    except replay.ReplayMiss:
+        log.event(logger, logging.ERROR, "Search page not in replay store", url=SEARCH_URL, store=os.environ.get('CRAWLER_REPLAY'))
+        driver.quit()
+        exit(1)
+
+    results = []
+
+    if is_captcha_page(driver):
+        log.event(logger, logging.ERROR, "CAPTCHA detected. Saving page for debugging.", url=SEARCH_URL)
+        metrics.inc('crawler_blocked_total', source='scholar_selenium', status='captcha')
+        metrics.flush()
+        with open("response_debug.html", "w", encoding="utf-8") as f:
+            f.write(driver.page_source)
+        driver.quit()
+        # Save empty output for consistency
+        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+            json.dump([r.to_dict() for r in results], f, ensure_ascii=False, indent=2)
+        log.summary(logger, "CAPTCHA page saved as response_debug.html. Please solve CAPTCHA manually or try again later.",
+                    results=0, output=OUTPUT_FILE)
+        exit(1)
+
+    while len(results) < RESULTS_LIMIT:
+        articles = driver.find_elements(By.CSS_SELECTOR, '.gs_r.gs_or')
+        for art in articles:
+            try:
+                parse_start = time.perf_counter()
+                title_el = art.find_element(By.CSS_SELECTOR, '.gs_rt')
+                title = title_el.text
+                article_url = title_el.find_element(By.TAG_NAME, 'a').get_attribute('href') if title_el.find_elements(By.TAG_NAME, 'a') else None
+                authors_info = art.find_element(By.CSS_SELECTOR, '.gs_a').text
+                snippet = art.find_element(By.CSS_SELECTOR, '.gs_rs').text if art.find_elements(By.CSS_SELECTOR, '.gs_rs') else ''
+                cited = 0
+                cited_links = art.find_elements(By.PARTIAL_LINK_TEXT, 'Cited by')
+                if cited_links:
+                    try:
+                        cited = int(cited_links[0].text.split('Cited by ')[-1])
+                    except Exception:
+                        cited = 0
+                # Parse year (best effort)
+                pub_year = None
+                import re
+                m = re.search(r'(\d{4})', authors_info)
+                if m:
+                    pub_year = m.group(1)
+
+                # Parse authors and affiliations (best effort)
+                # Example authors_info: "Ramadan W., Sari D. - 2026 - Multidisciplinary Science Journal"
+                authors_raw = authors_info.split('-')[0].strip()
+                authors_list = [a.strip() for a in authors_raw.split(',') if a.strip()]
+                # Try to parse publication name
+                pub_name = None
+                if '-' in authors_info:
+                    parts = authors_info.split('-')
+                    if len(parts) > 2:
+                        pub_name = parts[-1].strip()
+                # Compose result in Scopus-like format (affiliations, doi and eid are not on the page)
+                journal = Publication.create(
+                    title, authors_list,
+                    publicationName=pub_name or '',
+                    publicationYear=pub_year or '',
+                    snippet=snippet,
+                    citation=cited,
+                    url=article_url or '',
+                    source='scholar-selenium')
+                metrics.observe('crawler_parse_seconds', time.perf_counter() - parse_start, source='scholar_selenium')
+                results.append(journal)
+                log.record(logger, 'journal', "Article parsed", title=title, url=article_url)
+                metrics.inc('crawler_items_total', source='scholar_selenium')
+                insert_articles(journal)
+                if len(results) >= RESULTS_LIMIT:
+                    break
+            except Exception as e:
+                continue
+        # Next page if needed
+        if len(results) < RESULTS_LIMIT:
+            next_btn = driver.find_elements(By.LINK_TEXT, 'Next')
+            if next_btn:
+                page += 1
                 try:
-                    cited = int(cited_links[0].text.split('Cited by ')[-1])
-                except Exception:
-                    cited = 0
-            # Parse year (best effort)
-            pub_year = None
-            import re
-            m = re.search(r'(\d{4})', authors_info)
-            if m:
-                pub_year = m.group(1)
-
-            # Parse authors and affiliations (best effort)
-            # Example authors_info: "Ramadan W., Sari D. - 2026 - Multidisciplinary Science Journal"
-            authors_raw = authors_info.split('-')[0].strip()
-            authors_list = [a.strip() for a in authors_raw.split(',') if a.strip()]
-            # Dummy detailed authors (since Scholar doesn't provide)
-            authors_detailed = []
-            for a in authors_list:
-                authors_detailed.append({
-                    "name": a,
-                    "authid": "",
-                    "hIndex": 0,
-                    "fullName": a
-                })
-            # Dummy affiliations (not available from Scholar)
-            affiliations = []
-            # Try to parse publication name
-            pub_name = None
-            if '-' in authors_info:
-                parts = authors_info.split('-')
-                if len(parts) > 2:
-                    pub_name = parts[-1].strip()
-            # Compose result in Scopus-like format
-            journal = {
-                'title': title,
-                'publicationName': pub_name,
-                'publicationYear': pub_year,
-                'authors': authors_list,
-                'authorsDetailed': authors_detailed,
-                'affiliations': affiliations,
-                'snippet': snippet,
-                'citation': cited,
-                'url': url,
-                # Add more fields as needed, set to None or best-effort
-                'doi': None,
-                'eid': None
-            }
-            results.append(journal)
-            insert_articles(journal)
-            if len(results) >= RESULTS_LIMIT:
+                    open_page(page, next_btn[0].click, 2)
+                except replay.ReplayMiss:
+                    log.event(logger, logging.WARNING, "Next page not in replay store", url=page_url(page))
+                    break
+                # Check for CAPTCHA after clicking next
+                if is_captcha_page(driver):
+                    log.event(logger, logging.ERROR, "CAPTCHA detected on next page. Saving page for debugging.",
+                              results=len(results))
+                    metrics.inc('crawler_blocked_total', source='scholar_selenium', status='captcha')
+                    metrics.flush()
+                    with open("response_debug.html", "w", encoding="utf-8") as f:
+                        f.write(driver.page_source)
+                    driver.quit()
+                    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+                        json.dump([r.to_dict() for r in results], f, ensure_ascii=False, indent=2)
+                    log.summary(logger, "CAPTCHA page saved as response_debug.html. Please solve CAPTCHA manually or try again later.",
+                                results=len(results), output=OUTPUT_FILE)
+                    exit(1)
+            else:
                 break
-        except Exception as e:
-            continue
-    # Next page if needed
-    if len(results) < RESULTS_LIMIT:
-        next_btn = driver.find_elements(By.LINK_TEXT, 'Next')
-        if next_btn:
-            next_btn[0].click()
-            time.sleep(2)
-            # Check for CAPTCHA after clicking next
-            if is_captcha_page(driver):
-                print("[!] CAPTCHA detected on next page. Saving page for debugging.")
-                with open("response_debug.html", "w", encoding="utf-8") as f:
-                    f.write(driver.page_source)
-                driver.quit()
-                with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-                    json.dump(results, f, ensure_ascii=False, indent=2)
-                print(f"Saved {len(results)} results to {OUTPUT_FILE}")
-                print("CAPTCHA page saved as response_debug.html. Please solve CAPTCHA manually or try again later.")
-                exit(1)
-        else:
-            break
 
-driver.quit()
+    driver.quit()
+finally:
+    if os.path.exists(REPLAY_FILE):
+        os.remove(REPLAY_FILE)
 
 
 # --- SAVE OUTPUT ---
 with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-    json.dump(results, f, ensure_ascii=False, indent=2)
-print(f"Saved {len(results)} results to {OUTPUT_FILE}")
+    json.dump([r.to_dict() for r in results], f, ensure_ascii=False, indent=2)
+log.summary(logger, "Saved results", results=len(results), output=OUTPUT_FILE)
+metrics.flush()
 
@@ -1,6 +1,7 @@
 
 
 import logging
+from common import log as common_log
 logger = logging.getLogger(__name__)
 
 def warn(msg):
@@ -14,12 +15,18 @@ def info(msg):
 def debug(msg):
     logger.debug(str(msg))
 
+
+def record(kind, msg, **fields):
+    # Per-record line, sampled (see crawlers/common/log.py)
+    common_log.record(logger, kind, msg, **fields)
+
+
+def summary(msg, **fields):
+    common_log.summary(logger, msg, **fields)
+
 import pprint
-class MyPrettyPrinter(pprint.PrettyPrinter):
-    def format(self, object, context, maxlevels, level):
-        if isinstance(object, unicode):
-            return (object.encode('utf8'), True, False)
-        return pprint.PrettyPrinter.format(self, object, context, maxlevels, level)
+# Python 3 str is already unicode, nothing to re-encode
+MyPrettyPrinter = pprint.PrettyPrinter
 pu = MyPrettyPrinter()
 
 pp = pprint.PrettyPrinter()
@@ -1,11 +1,17 @@
 
 
+import time
 import logging
 from .proxy import PROXIES
 from .agents import AGENTS
 
 import random
 
+from scrapy import signals
+from scrapy.exceptions import IgnoreRequest
+from scrapy.http import HtmlResponse
+from common import log, metrics, replay
+
 
 
 logger = logging.getLogger(__name__)
@@ -18,7 +24,7 @@ class CustomHttpProxyMiddleware(object):
             p = random.choice(PROXIES)
             try:
                 request.meta['proxy'] = "http://%s" % p['ip_port']
-                logger.info(f"Using proxy: {request.meta['proxy']}")
+                log.record(logger, 'proxy', "Using proxy", proxy=request.meta['proxy'], url=request.url)
             except Exception as e:
                 logger.critical(f"Exception {e}")
 
@@ -37,3 +43,64 @@ class CustomUserAgentMiddleware(object):
         request.headers['Accept'] = 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
         request.headers['Connection'] = 'keep-alive'
         request.headers['Upgrade-Insecure-Requests'] = '1'
+
+
+class MetricsMiddleware(object):
+    """Fetch latency, bytes, retries and blocks for every Scrapy download."""
+
+    BLOCK_STATUSES = (403, 429, 503)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        mw = cls()
+        metrics.configure(crawler.spider.name if getattr(crawler, 'spider', None) else 'scrapy')
+        crawler.signals.connect(mw.spider_closed, signal=signals.spider_closed)
+        return mw
+
+    def process_request(self, request, spider):
+        request.meta['metrics_start'] = time.perf_counter()
+        if request.meta.get('retry_times'):
+            metrics.inc('crawler_fetch_retries_total', source=spider.name)
+
+    def process_response(self, request, response, spider):
+        start = request.meta.get('metrics_start')
+        if start is not None:
+            metrics.observe('crawler_fetch_seconds', time.perf_counter() - start, source=spider.name)
+        metrics.inc('crawler_fetch_bytes_total', len(response.body), source=spider.name)
+        if response.status in self.BLOCK_STATUSES or b'recaptcha' in response.body[:200000].lower():
+            metrics.inc('crawler_blocked_total', source=spider.name, status=response.status)
+        return response
+
+    def process_exception(self, request, exception, spider):
+        metrics.inc('crawler_fetch_errors_total', source=spider.name, reason=type(exception).__name__)
+
+    def spider_closed(self, spider):
+        path = metrics.flush()
+        if path:
+            logger.info(f"Metrics written to {path}")
+
+
+class ReplayMiddleware(object):
+    """
+    Record downloaded pages into, or serve them from, the common.replay store
+    (CRAWLER_RECORD / CRAWLER_REPLAY). Replayed requests never reach the proxy
+    or the network.
+    """
+
+    def process_request(self, request, spider):
+        if not replay.replaying():
+            return None
+        try:
+            page = replay.lookup(request.url)
+        except replay.ReplayMiss:
+            metrics.inc('crawler_fetch_errors_total', source=spider.name, reason='ReplayMiss')
+            raise IgnoreRequest(f"Not in replay store: {request.url}")
+        return HtmlResponse(request.url, status=page['status'], body=page['body'],
+                            encoding=page['encoding'] or 'utf-8', request=request)
+
+    def process_response(self, request, response, spider):
+        if replay.recording():
+            replay.record(request.url, response.body, status=response.status,
+                          encoding=getattr(response, 'encoding', None),
+                          headers={'Content-Type': response.headers.get('Content-Type', b'').decode('latin-1')})
+        return response
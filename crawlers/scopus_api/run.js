@@ -308,10 +308,12 @@ async function run() {
       const dbName = new URL(mongoUri).pathname.replace('/', '') || 'journal_crawling';
       const db = client.db(dbName);
       // Bulk upsert agar tidak error jika _id sudah ada
+      const now = new Date();
       const ops = deduped.map(doc => ({
         updateOne: {
           filter: { _id: doc._id },
-          update: { $set: doc },
+          // updated_at: high-water mark export Parquet; stats_at dilepas agar stats-rollup menghitung ulang
+          update: { $set: { ...doc, updated_at: now }, $unset: { stats_at: '' } },
           upsert: true
         }
       }));
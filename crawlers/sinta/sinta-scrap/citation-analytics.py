@@ -0,0 +1,81 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from datetime import datetime
+from os.path import dirname
+from pymongo import ReplaceOne
+sys.path.append(dirname(dirname(os.path.abspath(os.path.dirname(__file__)))))
+from common.db import get_db, get_collection
+from common import analytics
+from common.profiling import add_profile_argument, profiled
+from common import log, metrics
+
+# h-index, i10, sitasi per tahun per dosen dan distribusi per departemen, dihitung dari koleksi
+# journal (NumPy), lalu dibandingkan dengan nilai citation_* / hindex_* hasil scrape profil SINTA.
+
+db = get_db()
+col_journals = get_collection('journal', db)
+col_dosen = get_collection('dosen', db)
+col_dosen_metrics = get_collection('dosen_metrics', db, bulk=True)
+col_department_metrics = get_collection('department_metrics', db, bulk=True)
+logger = logging.getLogger('citation-analytics')
+
+SCRAPED_FIELDS = [f'{m}_{f}' for f in analytics.SCRAPED for m in ('hindex', 'citation')]
+
+def load_dosen():
+    projection = dict.fromkeys(['sinta_id', 'department'] + SCRAPED_FIELDS, 1)
+    projection['_id'] = 0
+    return {d['sinta_id']: d for d in col_dosen.find({'sinta_id': {'$nin': [None, '']}}, projection).batch_size(5000)}
+
+def write(ops, collection, batch_size):
+    for start in range(0, len(ops), batch_size):
+        with metrics.timer('crawler_mongo_write_seconds', collection=collection.name, op='bulk_replace'):
+            collection.bulk_write(ops[start:start + batch_size], ordered=False)
+
+def main():
+    # Contoh: python citation-analytics.py --report crosscheck.json
+    #         python citation-analytics.py --no-write --tolerance 0.1
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--report', default='crosscheck_report.json',
+                        help='File JSON hasil cross-check dengan nilai SINTA')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Selisih relatif (minimal 1) yang dianggap tidak cocok')
+    parser.add_argument('--no-write', action='store_true',
+                        help='Hanya tulis report, jangan simpan ke dosen_metrics / department_metrics')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Dokumen per bulk_write')
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
+    metrics.configure('citation-analytics')
+    log.setup('citation-analytics')
+    started = time.perf_counter()
+    now = datetime.utcnow()
+    with profiled(args.profile):
+        links = analytics.load_links(col_journals)
+        dosen = load_dosen()
+        computed = analytics.compute(links)
+        department_of = {s: (d.get('department') or '').strip() for s, d in dosen.items()}
+        departments = analytics.department_metrics(computed, links.lecturers, department_of)
+        summary, rows = analytics.crosscheck(computed, links.lecturers, dosen, args.tolerance)
+
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'generated_at': now.isoformat(), 'tolerance': args.tolerance, 'summary': summary,
+                       'departments': departments, 'mismatches': rows}, f, indent=2, ensure_ascii=False)
+        if not args.no_write:
+            docs = analytics.metric_documents(computed, links.lecturers, now)
+            write([ReplaceOne({'_id': d['_id']}, d, upsert=True) for d in docs], col_dosen_metrics, args.batch_size)
+            names = set(departments['hindex'])
+            write([ReplaceOne({'_id': name}, {'_id': name, 'computed_at': now,
+                                              **{k: v[name] for k, v in departments.items()}}, upsert=True)
+                   for name in sorted(names)], col_department_metrics, args.batch_size)
+    log.summary(logger, "Analitik sitasi selesai", pairs=len(links), lecturers=len(links.lecturers),
+                departments=len(departments['hindex']), mismatches=len(rows), report=args.report,
+                elapsed_seconds=round(time.perf_counter() - started, 3),
+                **{f'{k}_mismatched': v['mismatched'] for k, v in summary.items()})
+    metrics.flush()
+
+if __name__ == "__main__":
+    main()
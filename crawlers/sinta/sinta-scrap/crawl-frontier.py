@@ -0,0 +1,247 @@
+import os
+import sys
+import time
+import logging
+import argparse
+import itertools
+import threading
+from datetime import datetime, timedelta
+from os.path import dirname
+sys.path.append(dirname(dirname(os.path.abspath(os.path.dirname(__file__)))))
+from common.db import get_db, get_collection
+from common.frontier import Frontier, HostPolicy, Politeness, Task, dispatch, host_of
+from common.profiling import add_profile_argument, profiled
+from common.breaker import breaker_stats
+from common.session import REQUEST_ERRORS, connection_stats, get as http_get
+from common.skipset import add_skip_arguments, resolve_skip_set
+from common.records import ScholarAuthor
+from common import log, metrics, replay
+import sinta
+
+# Satu proses untuk author SINTA dan profil Google Scholar: frontier bersama (tanpa duplikat,
+# author paling lama tidak di-crawl lebih dulu), jeda per host dibagi semua worker, dan host
+# yang membalas 403/429 diperlambat tanpa menahan host lain.
+
+SCHOLAR_HOST = 'scholar.google.com'
+SCHOLAR_SOURCE = 'googlescholar_author'  # label metrics seperti spider googlescholar_author
+SCHOLAR_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+SCHOLAR_DIR = os.path.join(dirname(dirname(os.path.abspath(os.path.dirname(__file__)))),
+                           'scholar', 'google-scholar-crawler')
+
+db = get_db()
+col_dosen = get_collection('dosen', db)
+col_journals = get_collection('journal', db)
+col_scholar_profiles = get_collection('scholar_profiles', db)
+logger = logging.getLogger('crawl-frontier')
+
+def priority(crawled_at):
+    # Belum pernah di-crawl = 0, lalu yang paling lama
+    return crawled_at.timestamp() if crawled_at and crawled_at > datetime.min else 0.0
+
+def scholar_request(url):
+    # Tanpa retry: CAPTCHA/429 ditahan breaker host Scholar dan jeda politeness, bukan diulang di sini
+    try:
+        with metrics.timer('crawler_fetch_seconds', source=SCHOLAR_SOURCE):
+            response = http_get(url, headers=SCHOLAR_HEADERS, timeout=20)
+        metrics.inc('crawler_fetch_bytes_total', len(response.content), source=SCHOLAR_SOURCE)
+        if response.status_code in sinta.BLOCK_STATUSES:
+            metrics.inc('crawler_blocked_total', source=SCHOLAR_SOURCE, status=response.status_code)
+        response.raise_for_status()
+    except REQUEST_ERRORS as e:
+        metrics.inc('crawler_fetch_errors_total', source=SCHOLAR_SOURCE, reason=type(e).__name__)
+        raise
+    return response
+
+def make_get(politeness, fetch, budget=None):
+    # fetch: sinta.safe_request untuk host SINTA, scholar_request untuk Scholar
+    # budget: sinta.RequestBudget, request SINTA berhenti begitu --budget terpakai
+    exhausted = threading.Event()
+
+    def get(url):
+        if budget is not None and not budget.take():
+            if not exhausted.is_set():
+                exhausted.set()
+                log.event(logger, logging.WARNING, "Budget request habis, sisa frontier dilewati",
+                          budget=budget.limit)
+            return None
+        politeness.wait(url)
+        try:
+            response = fetch(url)
+        except REQUEST_ERRORS as e:
+            status = getattr(getattr(e, 'response', None), 'status_code', None)
+            politeness.report(url, status)
+            log.event(logger, logging.WARNING, "Failed to fetch", url=url, error=str(e))
+            return None
+        politeness.report(url, response.status_code)
+        return response.text
+    return get
+
+def sinta_tasks(args, politeness, stages):
+    affiliations = sinta.resolve_affiliations(args)
+    seen = sinta.SeenIds()
+    pages = sinta.iter_discovered(list(affiliations), args.page_start, args.page_end,
+                                  politeness.limiter(sinta.BASE), seen)
+    if args.known_authors:
+        pages = itertools.chain(pages, sinta.iter_known_authors(col_dosen, seen))
+    stats = {}
+    # window=0: satu peringkat untuk semua author, urutan dilayani diatur frontier
+    frontier = list(sinta.iter_frontier(pages, col_dosen, stages, args.max_age_hours, args.budget,
+                                        args.max_pages, 0, stats))
+    log.event(logger, logging.INFO, "Frontier SINTA siap", affiliations=len(affiliations), budget=args.budget,
+              **stats)
+    # Skor recrawl tertinggi dilayani lebih dulu (priority kecil = lebih dulu)
+    return [Task(entry['url'], -entry['recrawl_score'], 'sinta',
+                 dict(entry, affiliation=affiliations.get(entry['affil_id'], '')), key=f"sinta:{entry['sinta_id']}")
+            for entry in frontier]
+
+def scholar_tasks(args):
+    users = [u.strip() for u in args.scholar_users.split(',') if u.strip()]
+    cutoff = datetime.utcnow() - timedelta(hours=args.max_age_hours) if args.max_age_hours > 0 else None
+    crawled = {p['_id']: p.get('crawled_at') for p in col_scholar_profiles.find({}, {'crawled_at': 1})}
+    if args.scholar_from_db:
+        users.extend(crawled)
+    tasks = []
+    for user in dict.fromkeys(users):
+        crawled_at = crawled.get(user)
+        if cutoff is not None and crawled_at is not None and crawled_at >= cutoff:
+            continue
+        tasks.append(Task(scholar_profile_url(user), priority(crawled_at), 'scholar', user, key=f'scholar:{user}'))
+    log.event(logger, logging.INFO, "Frontier Scholar siap", users=len(users), stale=len(tasks))
+    return tasks
+
+def scholar_profile_url(user, cstart=0):
+    from googlescholar.spiders.author import PAGESIZE, PROFILE_URL
+    return PROFILE_URL.format(user=user, cstart=cstart, pagesize=PAGESIZE)
+
+def make_scholar_parser():
+    '''Parser profil Scholar dari spider Scrapy (googlescholar_author), dipakai tanpa engine Scrapy.'''
+    from scrapy.http import HtmlResponse, Request
+    from googlescholar.spiders.author import googlescholarAuthorSpider
+    spider = googlescholarAuthorSpider()
+
+    def parse(url, html, user, cstart):
+        request = Request(url, meta={'scholar_user': user, 'cstart': cstart})
+        response = HtmlResponse(url, body=html, encoding='utf-8', request=request)
+        author, publications, has_next = None, [], False
+        for item in spider.parse_author(response):
+            if isinstance(item, Request):
+                has_next = True
+            elif isinstance(item, ScholarAuthor):
+                author = item
+            else:
+                publications.append(item)
+        return author, publications, has_next
+    return parse
+
+def main():
+    # Contoh: python crawl-frontier.py 1 0 --affiliations-from-db --scholar-from-db --workers 4
+    parser = argparse.ArgumentParser()
+    parser.add_argument('page_start', type=int, nargs='?', default=1)
+    parser.add_argument('page_end', type=int, nargs='?', default=1,
+                        help='Halaman terakhir daftar author (0 = sampai halaman kosong)')
+    parser.add_argument('--stages', type=str, default='profile,garuda',
+                        help=f'Stage SINTA dipisah koma: {", ".join(sinta.STAGE_FIELDS)}')
+    parser.add_argument('--affiliations', type=str, default='',
+                        help=f'ID afiliasi SINTA dipisah koma (default {sinta.AFFIL_ID})')
+    parser.add_argument('--affiliations-from-db', action='store_true',
+                        help='Ambil semua afiliasi dari koleksi universities (scrap-academic.py)')
+    parser.add_argument('--no-sinta', action='store_true', help='Hanya profil Google Scholar')
+    parser.add_argument('--scholar-users', type=str, default='',
+                        help='ID user Google Scholar dipisah koma (citations?user=...)')
+    parser.add_argument('--scholar-from-db', action='store_true',
+                        help='Tambahkan semua profil di koleksi scholar_profiles')
+    parser.add_argument('--max-age-hours', type=float, default=24,
+                        help='Lewati author/profil yang sudah di-crawl dalam N jam terakhir (0 = crawl semua)')
+    parser.add_argument('--max-pages', type=int, default=0,
+                        help='Batas halaman per view publikasi SINTA (0 = semua halaman)')
+    parser.add_argument('--workers', type=int, default=4, help='Thread fetch; dibagi antar host')
+    parser.add_argument('--sinta-delay', type=float, nargs=2, default=[3, 6], metavar=('MIN', 'MAX'),
+                        help='Jeda antar request ke SINTA (detik), untuk semua worker')
+    parser.add_argument('--sinta-concurrency', type=int, default=2, help='Author SINTA yang diproses bersamaan')
+    parser.add_argument('--scholar-delay', type=float, nargs=2, default=[3, 7], metavar=('MIN', 'MAX'),
+                        help='Jeda antar request ke Google Scholar (detik), untuk semua worker')
+    sinta.add_recrawl_arguments(parser)
+    add_profile_argument(parser)
+    add_skip_arguments(parser)
+    replay.add_replay_arguments(parser)
+    args = parser.parse_args()
+    stages = sinta.resolve_stages(parser, args)
+    replay.configure(args)
+
+    metrics.configure('crawl-frontier')
+    log.setup('crawl-frontier')
+    started = time.perf_counter()
+    politeness = Politeness({
+        host_of(sinta.BASE): HostPolicy(*args.sinta_delay, concurrency=args.sinta_concurrency),
+        SCHOLAR_HOST: HostPolicy(*args.scholar_delay, concurrency=1),
+    })
+    frontier = Frontier(politeness)
+    sinta_get = make_get(politeness, sinta.safe_request, sinta.RequestBudget(args.budget))
+    scholar_get = make_get(politeness, scholar_request)
+    write_lock = threading.Lock()
+    counts = {'dosen': 0, 'journal': 0, 'scholar_profiles': 0}
+
+    with profiled(args.profile):
+        skip = None
+        if sinta.publication_views(stages) or args.scholar_users or args.scholar_from_db:
+            skip = resolve_skip_set(args, col_journals)
+
+        scholar_parse = None
+        if args.scholar_users or args.scholar_from_db:
+            sys.path.extend([SCHOLAR_DIR, os.path.join(SCHOLAR_DIR, 'googlescholar')])
+            scholar_parse = make_scholar_parser()
+            for task in scholar_tasks(args):
+                frontier.push(task)
+        if not args.no_sinta:
+            for task in sinta_tasks(args, politeness, stages):
+                frontier.push(task)
+        log.event(logger, logging.INFO, "Frontier siap", tasks=len(frontier))
+
+        def handle_sinta(task):
+            entry = task.data
+            payload = sinta.fetch_author(entry, sinta_get, args.max_pages)
+            if payload is None:
+                return
+            parsed = sinta.parse_fetched(entry, payload)
+            # Satu writer sekaligus: skip-set dan hitungan tidak thread-safe
+            with write_lock:
+                d, j = sinta.write_author(entry, parsed, sinta_get, col_dosen, col_journals, skip)
+                counts['dosen'] += d
+                counts['journal'] += j
+
+        def handle_scholar(task):
+            user = task.data
+            cstart = 0
+            author = None
+            publications = []
+            while True:
+                url = scholar_profile_url(user, cstart)
+                html = scholar_get(url)
+                if html is None:
+                    return
+                parsed_author, page, has_next = scholar_parse(url, html, user, cstart)
+                author = author or parsed_author
+                publications.extend(page)
+                if not has_next:
+                    break
+                cstart += len(page)
+            with write_lock:
+                if author is not None:
+                    col_scholar_profiles.update_one({'_id': user}, {'$set': dict(
+                        author.to_dict(), crawled_at=datetime.utcnow())}, upsert=True)
+                    counts['scholar_profiles'] += 1
+                for publication in publications:
+                    if sinta.upsert_journal(col_journals, publication, skip):
+                        counts['journal'] += 1
+
+        handlers = {'sinta': handle_sinta, 'scholar': handle_scholar}
+        handled, failed = dispatch(frontier, lambda task: handlers[task.kind](task), args.workers)
+    log.summary(logger, "Crawl frontier selesai", tasks=handled, failed=failed, http=connection_stats(),
+                breakers=breaker_stats(), elapsed_seconds=round(time.perf_counter() - started, 3), **counts)
+    metrics.flush()
+
+if __name__ == "__main__":
+    main()
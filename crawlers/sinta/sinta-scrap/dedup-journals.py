@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+import logging
+from datetime import datetime
+import argparse
+from os.path import dirname
+from pymongo import UpdateOne
+sys.path.append(dirname(dirname(os.path.abspath(os.path.dirname(__file__)))))
+from common.db import get_db, get_collection
+from common.dedup import cluster_titles
+from common.profiling import add_profile_argument, profiled
+from common import log, metrics
+
+# Kelompokkan publikasi yang sama dari Scopus, Scholar dan SINTA (judul mirip atau DOI sama)
+# dan tulis cluster_id: _id dokumen kanonik cluster (yang punya DOI, lalu _id terkecil).
+
+db = get_db()
+col_journals = get_collection('journal', db, bulk=True)
+logger = logging.getLogger('dedup-journals')
+
+def load_journals():
+    docs = list(col_journals.find({}, {'title': 1, 'doi': 1, 'cluster_id': 1}).batch_size(5000))
+    # Urutan menentukan dokumen kanonik: root cluster = indeks terkecil
+    docs.sort(key=lambda d: (not (d.get('doi') or '').strip(), str(d['_id'])))
+    return docs
+
+def write_clusters(docs, roots, batch_size):
+    now = datetime.utcnow()
+    ops = []
+    changed = 0
+    for doc, root in zip(docs, roots):
+        cluster_id = str(docs[root]['_id'])
+        if doc.get('cluster_id') == cluster_id:
+            continue
+        ops.append(UpdateOne({'_id': doc['_id']}, {'$set': {'cluster_id': cluster_id, 'updated_at': now}}))
+        if len(ops) >= batch_size:
+            with metrics.timer('crawler_mongo_write_seconds', collection=col_journals.name, op='bulk_update'):
+                col_journals.bulk_write(ops, ordered=False)
+            changed += len(ops)
+            ops = []
+    if ops:
+        with metrics.timer('crawler_mongo_write_seconds', collection=col_journals.name, op='bulk_update'):
+            col_journals.bulk_write(ops, ordered=False)
+        changed += len(ops)
+    return changed
+
+def main():
+    # Contoh: python dedup-journals.py --threshold 0.8
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threshold', type=float, default=0.8, help='Minimal estimasi Jaccard judul (0-1)')
+    parser.add_argument('--num-perm', type=int, default=128, help='Jumlah permutasi MinHash')
+    parser.add_argument('--bands', type=int, default=16, help='Jumlah band LSH (num-perm harus kelipatannya)')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Judul per batch MinHash dan update per bulk_write')
+    parser.add_argument('--dry-run', action='store_true', help='Hitung cluster tanpa menulis ke MongoDB')
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
+    metrics.configure('dedup-journals')
+    log.setup('dedup-journals')
+    started = time.perf_counter()
+    with profiled(args.profile):
+        docs = load_journals()
+        roots = cluster_titles([d.get('title') for d in docs], [d.get('doi') for d in docs],
+                               threshold=args.threshold, num_perm=args.num_perm, bands=args.bands,
+                               batch_size=args.batch_size)
+        clusters = len(set(roots.tolist()))
+        changed = 0 if args.dry_run else write_clusters(docs, roots, args.batch_size)
+    log.summary(logger, "Deduplikasi journal selesai", journals=len(docs), clusters=clusters,
+                duplicates=len(docs) - clusters, updated=changed, dry_run=args.dry_run,
+                elapsed_seconds=round(time.perf_counter() - started, 3))
+    metrics.flush()
+
+if __name__ == "__main__":
+    main()
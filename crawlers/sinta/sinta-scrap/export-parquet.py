@@ -0,0 +1,44 @@
+import os
+import sys
+import time
+import logging
+import argparse
+from os.path import dirname
+sys.path.append(dirname(dirname(os.path.abspath(os.path.dirname(__file__)))))
+from common.db import get_db, get_collection
+from common.export import ensure_indexes, export_snapshot
+from common.profiling import add_profile_argument, profiled
+from common import log, metrics
+
+# Ekspor journal dan dosen ke Parquet (partisi publicationYear / affiliation) untuk analisis
+# offline. Run berikutnya hanya menambah dokumen yang berubah sejak high-water mark terakhir.
+
+db = get_db()
+col_journals = get_collection('journal', db)
+col_dosen = get_collection('dosen', db)
+logger = logging.getLogger('export-parquet')
+
+def main():
+    # Contoh: python export-parquet.py --out export/          (inkremental)
+    #         python export-parquet.py --out export/ --full   (ulang dari awal ke folder kosong)
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--out', default='export', help='Folder tujuan Parquet dan _state.json')
+    parser.add_argument('--full', action='store_true', help='Abaikan high-water mark, ekspor semua dokumen')
+    parser.add_argument('--batch-size', type=int, default=5000, help='Dokumen per batch cursor Mongo')
+    parser.add_argument('--rows-per-file', type=int, default=100000, help='Baris maksimal per tulis Parquet')
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
+    metrics.configure('export-parquet')
+    log.setup('export-parquet')
+    started = time.perf_counter()
+    with profiled(args.profile):
+        ensure_indexes(col_journals, col_dosen)
+        counts = export_snapshot(col_journals, col_dosen, args.out, full=args.full,
+                                 batch_size=args.batch_size, rows_per_file=args.rows_per_file)
+    log.summary(logger, "Ekspor Parquet selesai", out=args.out, full=args.full,
+                elapsed_seconds=round(time.perf_counter() - started, 3), **counts)
+    metrics.flush()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+import os
+import sys
+import json
+import time
+import runpy
+import logging
+import argparse
+import importlib.util
+from os.path import dirname
+sys.path.append(dirname(dirname(os.path.abspath(os.path.dirname(__file__)))))
+from common import log, metrics
+from common.breaker import reset_breakers
+from common.fakesite import SCHOLAR_HOSTS, SINTA_HOSTS, FakeSite, ServerThread, SiteConfig
+from common import session
+
+# Load test offline: server SINTA/Scholar palsu (common/fakesite.py, aiohttp) di thread yang sama,
+# lalu setiap crawler dijalankan di proses ini terhadap server itu (HTTP_HOST_MAP) dan diukur:
+# throughput request, latency p50/p99 (sisi crawler dan sisi server) dan laju tulis Mongo.
+# Default MONGO_URI mongomock:// (in-memory, tidak menyentuh database mana pun).
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCENARIOS = ('academic', 'sinta-authors', 'frontier', 'documents')
+DEFAULT_SCENARIOS = 'academic,sinta-authors,frontier'
+# (database, koleksi) yang dihitung sebelum/sesudah tiap skenario; None = MONGO_DB
+COLLECTIONS = ((None, 'dosen'), (None, 'journal'), (None, 'scholar_profiles'),
+               ('sinta', 'universities'), ('sinta', 'google_scholars'))
+
+logger = logging.getLogger('load-test')
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(q / 100.0 * len(ordered)))], 4)
+
+def latency_summary(values):
+    return {'p50': percentile(values, 50), 'p99': percentile(values, 99),
+            'max': round(max(values), 4) if values else None}
+
+class TimedRequests(object):
+    '''Latency setiap Session.get dari sisi crawler (termasuk antre di connection pool).'''
+
+    def __init__(self):
+        self.latencies = []
+        self._original = None
+
+    def __enter__(self):
+        self._original = original = session.Session.get
+        latencies = self.latencies
+
+        def timed_get(self, url, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(self, url, *args, **kwargs)
+            finally:
+                latencies.append(time.perf_counter() - start)
+        session.Session.get = timed_get
+        return self
+
+    def __exit__(self, *exc):
+        session.Session.get = self._original
+
+def document_counts():
+    from common.db import get_db
+    return {f'{db or "default"}.{name}': get_db(db)[name].estimated_document_count() for db, name in COLLECTIONS}
+
+def scenario_argv(name, args, config):
+    affiliations = ','.join(config.affiliation_ids())
+    if name == 'academic':
+        return 'scrap-academic.py', ['--workers', str(args.workers), '--delay', '0', '0']
+    if name == 'sinta-authors':
+        return 'scrap-sinta-authors.py', ['1', str(config.author_pages), '--affiliations', affiliations,
+                                          '--stages', args.stages, '--delay', '0', '0', '--max-age-hours', '0',
+                                          '--fetch-workers', str(args.workers),
+                                          '--parse-workers', str(args.parse_workers)]
+    if name == 'frontier':
+        argv = ['1', str(config.author_pages), '--affiliations', affiliations, '--stages', args.stages,
+                '--sinta-delay', '0', '0', '--scholar-delay', '0', '0', '--max-age-hours', '0',
+                '--workers', str(args.workers), '--sinta-concurrency', str(args.workers)]
+        if args.scholar_users > 0:
+            argv += ['--scholar-users', ','.join(f'loadtest{i}' for i in range(args.scholar_users))]
+        return 'crawl-frontier.py', argv
+    # documents: butuh config.py dan python-telegram-bot, seperti saat dijalankan biasa
+    return 'scrap-google-scholar.py', ['--workers', str(args.workers), '--delay', '0', '0', '--retry-wait', '1']
+
+def run_scenario(name, args, site):
+    script, argv = scenario_argv(name, args, site.config)
+    if args.mongo_uri.startswith('mongomock://'):
+        # In-memory: tiap skenario mulai dari database kosong supaya hasilnya sebanding
+        from common.db import get_client
+        for db in (args.mongo_db, 'sinta'):
+            get_client().drop_database(db)
+    site.reset_stats()
+    metrics.reset()
+    reset_breakers()
+    before = document_counts()
+    result = {'scenario': name, 'script': script, 'argv': argv}
+    log.event(logger, logging.WARNING, "Skenario dimulai", scenario=name, script=script)
+    saved_argv = sys.argv
+    sys.argv = [os.path.join(HERE, script)] + argv
+    started = time.perf_counter()
+    with TimedRequests() as timed:
+        try:
+            runpy.run_path(sys.argv[0], run_name='__main__')
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                result['exit_code'] = e.code
+        except Exception as e:
+            result['error'] = repr(e)
+        finally:
+            sys.argv = saved_argv
+            log.setup('load-test')  # crawler mengganti nama job
+    elapsed = time.perf_counter() - started
+    stats = site.stats
+    writes = metrics.registry.histogram_totals('crawler_mongo_write_seconds')
+    after = document_counts()
+    result.update({
+        'elapsed_seconds': round(elapsed, 3),
+        'requests': len(timed.latencies),
+        'requests_per_second': round(len(timed.latencies) / elapsed, 2) if elapsed > 0 else 0,
+        'latency_seconds': latency_summary(timed.latencies),
+        'server': {'requests': stats['requests'], 'kinds': stats['kinds'],
+                   'statuses': {str(k): v for k, v in stats['statuses'].items()},
+                   'latency_seconds': latency_summary(stats['latencies'])},
+        'mongo': {'writes': writes[1],
+                  'writes_per_second': round(writes[1] / elapsed, 2) if elapsed > 0 else 0,
+                  'mean_write_seconds': round(writes[0] / writes[1], 5) if writes[1] else None,
+                  'documents_added': {k: after[k] - before[k] for k in after if after[k] != before[k]}},
+        'items': {dict(k).get('source', ''): v for k, v in metrics.registry.counters('crawler_items_total').items()},
+    })
+    log.event(logger, logging.WARNING, "Skenario selesai", scenario=name, requests=result['requests'],
+              requests_per_second=result['requests_per_second'], mongo_writes_per_second=result['mongo']['writes_per_second'],
+              error=result.get('error'))
+    return result
+
+def main():
+    # Contoh: python load-test.py --scenarios sinta-authors,frontier --workers 8 --latency 0.05 0.3 --error-rate 0.05
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scenarios', type=str, default=DEFAULT_SCENARIOS,
+                        help=f'Skenario dipisah koma: {", ".join(SCENARIOS)}')
+    parser.add_argument('--serve', action='store_true',
+                        help='Hanya jalankan server palsu (sampai Ctrl-C) untuk crawler yang dijalankan manual')
+    parser.add_argument('--port', type=int, default=0, help='Port server palsu (0 = pilih otomatis)')
+    parser.add_argument('--mongo-uri', type=str, default='mongomock://',
+                        help='MONGO_URI untuk crawler (default in-memory, dikosongkan per skenario; '
+                             'mongod lokal menyimpan data antar skenario, jangan gunakan database produksi)')
+    parser.add_argument('--mongo-db', type=str, default='loadtest', help='MONGO_DB untuk crawler')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrency crawler (fetch workers / threads)')
+    parser.add_argument('--parse-workers', type=int, default=1, help='Proses parser untuk sinta-authors')
+    parser.add_argument('--stages', type=str, default='profile,garuda', help='Stage SINTA yang di-crawl')
+    parser.add_argument('--scholar-users', type=int, default=5,
+                        help='Profil Scholar palsu di skenario frontier (butuh Scrapy; 0 = tanpa Scholar)')
+    parser.add_argument('--affiliations', type=int, default=2, help='Jumlah afiliasi palsu')
+    parser.add_argument('--author-pages', type=int, default=3, help='Halaman daftar author per afiliasi')
+    parser.add_argument('--authors-per-page', type=int, default=10)
+    parser.add_argument('--publications', type=int, default=25, help='Publikasi per author per view')
+    parser.add_argument('--latency', type=float, nargs=2, default=[0.0, 0.0], metavar=('MIN', 'MAX'),
+                        help='Latency tiap respons server (detik)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraksi respons 503')
+    parser.add_argument('--captcha-rate', type=float, default=0.0, help='Fraksi request Scholar dibalas CAPTCHA (429)')
+    parser.add_argument('--retry-after', type=int, default=0, help='Header Retry-After (detik) pada 503/429')
+    parser.add_argument('--outage', type=float, nargs=2, default=None, metavar=('START', 'SECONDS'),
+                        help='Semua request 503 selama SECONDS detik, mulai START detik setelah skenario dimulai')
+    parser.add_argument('--report', type=str, default='load_test_report.json')
+    args = parser.parse_args()
+    scenarios = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+    if any(s not in SCENARIOS for s in scenarios):
+        parser.error(f"--scenarios harus berisi salah satu dari: {', '.join(SCENARIOS)}")
+    if not args.serve and 'frontier' in scenarios and args.scholar_users > 0 and importlib.util.find_spec('scrapy') is None:
+        args.scholar_users = 0
+        print('Scrapy tidak terpasang: skenario frontier tanpa profil Scholar', file=sys.stderr)
+
+    metrics.configure('load-test')
+    # Log crawler per record terlalu ramai untuk load test: WARNING kecuali LOG_LEVEL diisi
+    log.setup('load-test', level=os.environ.get('LOG_LEVEL', 'WARNING').upper())
+    config = SiteConfig(affiliations=args.affiliations, author_pages=args.author_pages,
+                        authors_per_page=args.authors_per_page, publications=args.publications,
+                        latency=tuple(args.latency), error_rate=args.error_rate, captcha_rate=args.captcha_rate,
+                        retry_after=args.retry_after, outage=tuple(args.outage) if args.outage else None)
+    site = FakeSite(config)
+    server = ServerThread(site, port=args.port).start()
+    os.environ['HTTP_HOST_MAP'] = server.host_map(SINTA_HOSTS + SCHOLAR_HOSTS)
+    os.environ['MONGO_URI'] = args.mongo_uri
+    os.environ['MONGO_DB'] = args.mongo_db
+    os.environ['SINTA_UNIVERSITIES_DB'] = 'sinta'
+    try:
+        if args.serve:
+            print(f"Server palsu di http://{server.address}\nexport HTTP_HOST_MAP='{os.environ['HTTP_HOST_MAP']}'")
+            while True:
+                time.sleep(3600)
+        results = [run_scenario(name, args, site) for name in scenarios]
+    except KeyboardInterrupt:
+        return
+    finally:
+        server.stop()
+
+    report = {'site': {'affiliations': config.affiliations, 'authors': config.author_count(),
+                       'publications_per_view': config.publications, 'latency': list(config.latency),
+                       'error_rate': config.error_rate, 'captcha_rate': config.captcha_rate,
+                       'retry_after': config.retry_after, 'outage': args.outage},
+              'mongo_uri': args.mongo_uri, 'workers': args.workers, 'scenarios': results}
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    for r in results:
+        print(f"{r['scenario']:<14} {r['requests']:>6} req  {r['requests_per_second']:>8} req/s  "
+              f"p50 {r['latency_seconds']['p50']}s  p99 {r['latency_seconds']['p99']}s  "
+              f"mongo {r['mongo']['writes_per_second']} writes/s" + (f"  ERROR {r['error']}" if 'error' in r else ''))
+    print(f"Report: {args.report}")
+    if any('error' in r or r.get('exit_code') for r in results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import os
+import sys
+import json
+import logging
+import argparse
+from os.path import dirname
+sys.path.append(dirname(dirname(os.path.abspath(os.path.dirname(__file__)))))
+from common.db import get_db, get_collection
+from common import log
+import sinta
+
+# Daftar recrawl berperingkat untuk semua dosen di koleksi dosen, tanpa request ke SINTA:
+# skor = peluang profil berubah sejak crawl terakhir (frekuensi perubahan yang teramati)
+# dikali perkiraan sitasi baru; dipotong sampai --budget perkiraan request.
+
+db = get_db()
+col_dosen = get_collection('dosen', db)
+logger = logging.getLogger('recrawl-plan')
+
+def main():
+    # Contoh: python recrawl-plan.py --budget 500 --stages profile,garuda --out plan.jsonl
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--stages', type=str, default='profile,garuda',
+                        help=f'Stage dipisah koma: {", ".join(sinta.STAGE_FIELDS)}')
+    parser.add_argument('--budget', type=int, default=0, help='Batas perkiraan request (0 = tanpa batas)')
+    parser.add_argument('--max-pages', type=int, default=0, help='Batas halaman per view publikasi (0 = semua)')
+    parser.add_argument('--max-age-hours', type=float, default=0,
+                        help='Lewati dosen yang sudah di-crawl dalam N jam terakhir')
+    parser.add_argument('--out', default='-', help='File JSON lines hasil (default stdout)')
+    args = parser.parse_args()
+    stages = sinta.resolve_stages(parser, args)
+
+    log.setup('recrawl-plan')
+    frontier = sinta.build_frontier(sinta.known_author_urls(col_dosen), col_dosen, stages,
+                                    args.max_age_hours, args.budget, args.max_pages)
+    out = sys.stdout if args.out == '-' else open(args.out, 'w', encoding='utf-8')
+    try:
+        for rank, entry in enumerate(frontier, 1):
+            out.write(json.dumps({
+                'rank': rank,
+                'sinta_id': entry['sinta_id'],
+                'stages': entry['stages'],
+                'score': None if entry['recrawl_score'] == float('inf') else round(entry['recrawl_score'], 4),
+                'cost': entry['recrawl_cost'],
+                'last_crawled_at': entry['last_crawled_at'].isoformat(),
+            }) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    log.summary(logger, "Rencana recrawl selesai", authors=len(frontier), budget=args.budget,
+                planned_requests=sum(e['recrawl_cost'] for e in frontier))
+
+if __name__ == "__main__":
+    main()
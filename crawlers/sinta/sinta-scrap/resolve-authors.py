@@ -0,0 +1,44 @@
+import os
+import sys
+import time
+import logging
+import argparse
+from os.path import dirname
+sys.path.append(dirname(dirname(os.path.abspath(os.path.dirname(__file__)))))
+from common.db import get_db, get_collection
+from common.authors import load_index, link_publications
+from common.profiling import add_profile_argument, profiled
+from common import log, metrics
+
+# Hubungkan author publikasi di koleksi journal (SINTA, Scholar, Scopus) ke dosen
+# lewat index nama di memori, bukan query regex per nama.
+
+db = get_db()
+col_dosen = get_collection('dosen', db)
+col_journals = get_collection('journal', db, bulk=True)
+logger = logging.getLogger('resolve-authors')
+
+def main():
+    # Contoh: python resolve-authors.py            (hanya journal baru / yang belum ter-resolve)
+    #         python resolve-authors.py --full     (resolve ulang semua journal)
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--full', action='store_true', help='Resolve ulang semua journal, bukan hanya yang baru')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Jumlah update per bulk_write')
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
+    metrics.configure('resolve-authors')
+    log.setup('resolve-authors')
+    started = time.perf_counter()
+    with profiled(args.profile):
+        index = load_index(col_dosen)
+        log.event(logger, logging.INFO, "Index dosen siap", dosen=len(index),
+                  exact_keys=len(index.exact), initials_keys=len(index.initials))
+        updated, resolved = link_publications(col_journals, index, incremental=not args.full,
+                                              batch_size=args.batch_size)
+    log.summary(logger, "Resolusi author selesai", journals=updated, authors_resolved=resolved,
+                elapsed_seconds=round(time.perf_counter() - started, 3))
+    metrics.flush()
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,138 @@
+import os
 import sys
-import requests
+import time
+import logging
+import argparse
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from bs4 import BeautifulSoup
 from furl import furl
-from pymongo import MongoClient
+from os.path import dirname
+from pymongo import UpdateOne
+sys.path.append(dirname(dirname(os.path.abspath(os.path.dirname(__file__)))))
+from common.breaker import breaker_stats
+from common.session import REQUEST_ERRORS, get as http_get
+from common.db import get_db, get_collection, ensure_unique_index
+from common.profiling import add_profile_argument, profiled
+from common import log, metrics
+from sinta import RateLimiter, page_count_from_html
 
-client = MongoClient()
-db = client.sinta
-col_universities = db.universities
+# Daftar universitas SINTA: halaman pertama memberi jumlah halaman, sisanya diambil bersamaan.
+# Upsert berdasarkan id SINTA (unique index), jadi menjalankan ulang tidak membuat duplikat.
+
+AFFILIATIONS_URL = 'http://sinta.ristekbrin.go.id/affiliations?page={page}&sort=all2'
+# Batas halaman di luar jumlah dari pager saat lanjut per halaman
+EXTRA_PAGES = 50
+
+db = get_db('sinta')
+col_universities = get_collection('universities', db, bulk=True)
+logger = logging.getLogger('scrap-academic')
+
+def fetch_page(page, limiter):
+    limiter.wait()
+    start = time.perf_counter()
+    response = http_get(AFFILIATIONS_URL.format(page=page))
+    metrics.observe('crawler_fetch_seconds', time.perf_counter() - start, source='sinta-affiliations')
+    response.raise_for_status()
+    return response.text
+
+def parse_universities(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    table = soup.find('tbody')
+    universities = []
+    for university in (table.find_all('tr') if table else []):
+        link = university.find('dt').find('a')
+        f = furl(link['href'])
+        universities.append({'id': f.args['id'], 'name': link.text})
+    return universities
+
+def save_universities(universities, page):
+    if not universities:
+        return 0
+    now = datetime.utcnow()
+    ops = [UpdateOne({'id': u['id']}, {'$set': {'name': u['name'], 'updated_at': now}}, upsert=True)
+           for u in universities]
+    with metrics.timer('crawler_mongo_write_seconds', collection=col_universities.name, op='bulk_upsert'):
+        col_universities.bulk_write(ops, ordered=False)
+    metrics.inc('crawler_items_total', len(universities), source='sinta-affiliations')
+    for u in universities:
+        log.record(logger, 'university', "Data universitas tersimpan", id=u['id'], name=u['name'], page=page)
+    return len(universities)
+
+def crawl_pages(pages, limiter, workers, seen):
+    '''
+    Ambil dan simpan `pages` bersamaan; return (universitas tersimpan, halaman kosong, halaman gagal).
+    Halaman yang semua id-nya sudah ada di `seen` (SINTA mengulang halaman terakhir untuk page= di luar
+    jangkauan) dihitung kosong.
+    '''
+    saved = 0
+    empty = []
+    failed = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(fetch_page, page, limiter): page for page in pages}
+        for future in as_completed(futures):
+            page = futures[future]
+            try:
+                html = future.result()
+            except REQUEST_ERRORS as e:
+                metrics.inc('crawler_fetch_errors_total', source='sinta-affiliations', reason=type(e).__name__)
+                log.event(logger, logging.ERROR, "Halaman afiliasi gagal diambil", page=page, error=str(e))
+                failed.append(page)
+                continue
+            universities = parse_universities(html)
+            ids = {u['id'] for u in universities}
+            if not ids - seen:
+                empty.append(page)
+                continue
+            seen.update(ids)
+            saved += save_universities(universities, page)
+    return saved, empty, failed
 
 def main():
-    i = 0
-    while True:
-        i+=1
-        page = requests.get('http://sinta.ristekbrin.go.id/affiliations?page=' + str(i) + '&sort=all2')
-        soup = BeautifulSoup(page.text, 'html.parser')
-        universities = soup.find('tbody').find_all('tr')
-        if len(universities) == 0:
-            print("Semua data universitas tersimpan!")
-            sys.exit()
-        for university in universities:
-            link = university.find('dt').find('a')
-
-            f = furl(link['href'])
-
-            col_universities.insert_one({
-                'id': f.args['id'],
-                'name': link.text
-            })
-
-            print("Data universitas " + link.text + " tersimpan!")
+    # Contoh: python scrap-academic.py --workers 8 --delay 0.5 1.5
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=8, help='Jumlah halaman yang diambil bersamaan')
+    parser.add_argument('--delay', type=float, nargs=2, default=[0.5, 1.5], metavar=('MIN', 'MAX'),
+                        help='Jeda antar request (detik), dibagi semua worker')
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
+    metrics.configure('scrap-academic')
+    log.setup('scrap-academic')
+    started = time.perf_counter()
+    limiter = RateLimiter(*args.delay)
+    with profiled(args.profile):
+        removed = ensure_unique_index(col_universities, 'id')
+        if removed:
+            log.event(logger, logging.WARNING, "Duplikat universitas dihapus sebelum unique index", deleted=removed)
+
+        first = fetch_page(1, limiter)
+        total = page_count_from_html(first)
+        universities = parse_universities(first)
+        seen = {u['id'] for u in universities}
+        saved = save_universities(universities, 1)
+        log.event(logger, logging.INFO, "Jumlah halaman afiliasi", pages=total)
+
+        count, empty, failed = crawl_pages(range(2, total + 1), limiter, args.workers, seen)
+        saved += count
+        # Jumlah halaman bisa kurang dari kenyataan (pager terpotong): lanjut per halaman sampai kosong,
+        # halaman berulang, atau EXTRA_PAGES halaman di luar pager
+        page = total
+        limit = total + EXTRA_PAGES
+        while not empty and not failed and page < limit:
+            page += 1
+            count, empty, failed = crawl_pages([page], limiter, 1, seen)
+            saved += count
+            if not empty:
+                total = page
+        if page >= limit and not empty and not failed:
+            log.event(logger, logging.WARNING, "Batas halaman tambahan tercapai", pages=page, extra_pages=EXTRA_PAGES)
+    log.summary(logger, "Semua data universitas tersimpan!", pages=total, universities=saved,
+                failed_pages=sorted(failed), universities_in_db=col_universities.estimated_document_count(),
+                breakers=breaker_stats(), elapsed_seconds=round(time.perf_counter() - started, 3))
+    metrics.flush()
+    if failed:
+        sys.exit(1)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,23 +1,37 @@
+import os
 import sys
 import time
 import config
-import requests
 import telegram
 import logging
-logging.basicConfig(level=logging.INFO)
+import argparse
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from bs4 import BeautifulSoup
-from pymongo import MongoClient
+from os.path import dirname
+sys.path.append(dirname(dirname(os.path.abspath(os.path.dirname(__file__)))))
+from common.breaker import breaker_stats
+from common.session import REQUEST_ERRORS, get as http_get
+from common.db import get_client, get_db
+from common.notify import Notifier, telegram_sender
+from common.profiling import add_profile_argument, profiled
+from common import log, metrics
+from sinta import RateLimiter
+
+# Publikasi (view documents) semua universitas di koleksi universities, beberapa universitas
+# sekaligus. Checkpoint per universitas di university_checkpoint: {university_id, page, done};
+# dokumen lama tanpa field done berarti universitas itu sudah selesai.
 
 bot = telegram.Bot(token='YOURTELEGRAMTOKEN')
 chat_id = 'YOURCHATID'
 
-client = MongoClient(config.host, username=config.username,  password=config.password)
-db = client.sinta
+client = get_client(config.host, username=config.username, password=config.password)
+db = get_db('sinta', client)
 col_google_scholars = db.google_scholars
 col_universities = db.universities
 col_university_checkpoint = db.university_checkpoint
 
-page_saved = [16]
+logger = logging.getLogger('scrap-google-scholar')
 
 def cleansing_authors(authors):
     if authors[-1] == '...':
@@ -25,7 +39,8 @@ def cleansing_authors(authors):
         return authors
     return authors
 
-def get_publications(papers, university_id, university_name, page_site):
+def parse_publications(papers, university_id):
+    docs = []
     for paper in papers:
         link = paper.find('dt').find('a')
 
@@ -36,67 +51,137 @@ def get_publications(papers, university_id, university_name, page_site):
                 authors.append(cleansing_authors(dd.text.strip().split(", ")))
             else:
                 publisher.append(dd.text.strip())
-        col_google_scholars.insert_one({
+        index_values = paper.find_all("td", class_="index-val uk-text-center")
+        docs.append({
             'university_id': university_id,
             'title': link.text,
             'link': link['href'],
             'authors': '' if len(authors) == 0 else authors[0],
             'publisher': '' if len(publisher) == 0 else publisher[0],
-            'citation': '' if len(paper.find_all("td", class_="index-val uk-text-center")) < 2 else
-                            paper.find_all("td", class_="index-val uk-text-center")[1].text
+            'citation': '' if len(index_values) < 2 else index_values[1].text
         })
+    return docs
 
-        text = "Publikasi dengan judul '" + link.text + \
-               "' dari '" + university_name +\
-               "' pada halaman ke-" + str(page_site) + \
-               " berhasil disimpan!"
-
-        logging.info(text)
+def save_publications(docs, university_name, page_site):
+    # Satu insert_many per halaman, bukan satu insert_one per publikasi
+    with metrics.timer('crawler_mongo_write_seconds', collection=col_google_scholars.name, op='insert_many'):
+        col_google_scholars.insert_many(docs, ordered=False)
+    metrics.inc('crawler_items_total', len(docs), source='sinta-affiliation-documents')
+    for doc in docs:
+        log.record(logger, 'publication', "Publikasi berhasil disimpan", title=doc['title'],
+                   university=university_name, page=page_site)
 
 def request_publication(page_site, university_id):
-    page = requests.get(
+    start = time.perf_counter()
+    page = http_get(
         'http://sinta.ristekbrin.go.id/affiliations/detail?page=' + str(page_site) + '&id=' + str(
             university_id) +
         '&view=documents')
+    metrics.observe('crawler_fetch_seconds', time.perf_counter() - start, source='sinta-affiliation-documents')
     soup = BeautifulSoup(page.text, 'html.parser')
-    papers = soup.find('tbody').find_all('tr')
+    table = soup.find('tbody')
+    if table is None:
+        raise ValueError(f"Tabel publikasi tidak ditemukan (HTTP {page.status_code})")
+    papers = table.find_all('tr')
 
     return papers
 
+def save_checkpoint(university_id, page, done=False):
+    col_university_checkpoint.update_one(
+        {'university_id': university_id},
+        {'$set': {'page': page, 'done': done, 'updated_at': datetime.utcnow()}},
+        upsert=True)
+
+def pending_universities():
+    # Dokumen checkpoint tanpa field done berasal dari versi lama: universitas sudah selesai
+    done = {c['university_id'] for c in col_university_checkpoint.find({'done': {'$ne': False}}, {'university_id': 1})}
+    return [u for u in col_universities.find({}, {'id': 1, 'name': 1}) if u['id'] not in done]
+
+def crawl_university(university, limiter, notifier, start_page=1, retries=3, retry_wait=60):
+    '''
+    Halaman documents satu universitas dari halaman setelah checkpoint sampai halaman kosong.
+    Return jumlah publikasi yang disimpan; gagal `retries` kali berturut-turut berarti berhenti,
+    checkpoint tetap di halaman terakhir yang tersimpan sehingga run berikutnya melanjutkan.
+    '''
+    university_id = university['id']
+    name = university['name']
+    checkpoint = col_university_checkpoint.find_one({'university_id': university_id})
+    page = checkpoint.get('page', 0) if checkpoint else start_page - 1
+    saved = 0
+    failures = 0
+    while True:
+        limiter.wait()
+        try:
+            papers = request_publication(page + 1, university_id)
+        except (ValueError,) + REQUEST_ERRORS as e:
+            failures += 1
+            metrics.inc('crawler_fetch_errors_total', source='sinta-affiliation-documents', reason=type(e).__name__)
+            log.event(logger, logging.ERROR, "Request publikasi gagal", university_id=university_id,
+                      page=page + 1, attempt=failures, error=str(e))
+            notifier.notify(f"Request publikasi '{name}' halaman ke-{page + 1} gagal: {e}",
+                            key=('error', university_id))
+            if failures >= retries:
+                return saved
+            time.sleep(retry_wait)
+            continue
+        failures = 0
+        page += 1
+
+        if len(papers) == 0:
+            save_checkpoint(university_id, page - 1, done=True)
+            text = "Semua data publikasi dari universitas '" + name + "' telah tersimpan!"
+            log.event(logger, logging.INFO, text, university_id=university_id, pages=page - 1, publications=saved)
+            notifier.notify(text, key=('progress', university_id))
+            return saved
+
+        docs = parse_publications(papers, university_id)
+        save_publications(docs, name, page)
+        save_checkpoint(university_id, page)
+        saved += len(docs)
+
+        # Pesan progres universitas yang sama saling menggantikan selama antre
+        notifier.notify("Publikasi dari '" + name + "' sampai halaman ke-" + str(page) + " berhasil disimpan!",
+                        key=('progress', university_id))
+
 def main():
-    for university in col_universities.find():
-        check_univ = col_university_checkpoint.find_one({'university_id': university['id']})
-        if check_univ == None:
-            i = page_saved[-1]
-            while True:
-                i += 1
-
-                try:
-                    papers = request_publication(i, university['id'])
-                except ValueError as e:
-                    logging.info(str(e))
-                    bot.sendMessage(chat_id=chat_id,
-                                    text=str(e))
-                    time.sleep(60)
-                    main(university['id'])
-
-                if len(papers) == 0:
-                    col_university_checkpoint.insert_one({
-                        'university_id': university['id']
-                    })
-                    page_saved.append(0)
-                    text = "Semua data publikasi dari universitas '" + university['name'] + "' telah tersimpan!"
-                    logging.info(text)
-                    bot.sendMessage(chat_id=chat_id,
-                                    text=text)
-                    break
-
-                get_publications(papers, university['id'], university['name'], i)
-
-                text = "Publikasi dari '" + university['name'] + \
-                       "' pada halaman ke-" + str(i) + \
-                       " berhasil disimpan!"
-
-                bot.sendMessage(chat_id=chat_id, text=text)
+    # Contoh: python scrap-google-scholar.py --workers 4 --delay 1 3
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=4, help='Jumlah universitas yang di-crawl bersamaan')
+    parser.add_argument('--delay', type=float, nargs=2, default=[1, 3], metavar=('MIN', 'MAX'),
+                        help='Jeda antar request (detik), dibagi semua worker')
+    parser.add_argument('--start-page', type=int, default=1,
+                        help='Halaman awal untuk universitas yang belum punya checkpoint')
+    parser.add_argument('--retries', type=int, default=3, help='Gagal berturut-turut sebelum universitas dilewati')
+    parser.add_argument('--retry-wait', type=float, default=60, help='Jeda sebelum mengulang request gagal (detik)')
+    parser.add_argument('--notify-interval', type=float, default=3,
+                        help='Jarak minimal antar pesan Telegram (detik)')
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
+    metrics.configure('scrap-google-scholar')
+    log.setup('scrap-google-scholar')
+    started = time.perf_counter()
+    notifier = Notifier(telegram_sender(bot, chat_id), min_interval=args.notify_interval)
+    limiter = RateLimiter(*args.delay)
+    with profiled(args.profile):
+        universities = pending_universities()
+        log.event(logger, logging.INFO, "Universitas yang belum selesai", universities=len(universities))
+        def sweep(university):
+            try:
+                return crawl_university(university, limiter, notifier, args.start_page, args.retries, args.retry_wait)
+            except Exception as e:
+                # Satu universitas bermasalah tidak menghentikan worker lain; checkpoint tetap tersimpan
+                log.event(logger, logging.ERROR, "Crawl universitas gagal", university_id=university['id'],
+                          error=repr(e))
+                return 0
+
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            saved = list(pool.map(sweep, universities))
+    notifier.close()
+    log.summary(logger, "Sweep publikasi universitas selesai", universities=len(universities),
+                publications=sum(saved), breakers=breaker_stats(),
+                elapsed_seconds=round(time.perf_counter() - started, 3))
+    metrics.flush()
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,27 @@
+import os
+import sys
+import argparse
+from os.path import dirname
+sys.path.append(dirname(dirname(os.path.abspath(os.path.dirname(__file__)))))
+from common.db import get_db, get_collection
+from sinta import STAGE_PROFILE, STAGE_GARUDA, add_crawl_arguments, run
+
+# Profil dosen + publikasi garuda dalam satu kali fetch per author.
+# Menggantikan menjalankan scrap-google-scholar-dosen.py dan
+# scrap-google-scholar-specific.py bersamaan untuk page range yang sama.
+
+db = get_db()
+col_dosen = get_collection('dosen', db)
+
+def main():
+    # Contoh: python scrap-sinta-authors.py 1 0 --affiliations-from-db --workers 8
+    parser = argparse.ArgumentParser()
+    add_crawl_arguments(parser, page_start=1, page_end=5, stages=[STAGE_PROFILE, STAGE_GARUDA],
+                        max_age_hours=20, delay=(3, 6))
+
+    # discovery sekali -> frontier terdeduplikasi -> profil + publikasi dari fetch yang sama
+    # Ringkasan (dosen, journal) ditulis run() sebagai log summary
+    run(parser, col_dosen)
+
+if __name__ == "__main__":
+    main()
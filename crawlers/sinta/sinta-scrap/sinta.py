@@ -0,0 +1,879 @@
+'''
+Shared pieces of the SINTA author crawlers: fetching, author discovery,
+the deduplicated author frontier, page parsers and Mongo writers.
+
+scrap-sinta-authors.py runs the profile and garuda stages together so each
+author page is fetched once; scrap-google-scholar-dosen.py and
+scrap-google-scholar-specific.py run a single stage on the same frontier.
+
+All three accept several affiliations and split the frontier across worker
+processes by a stable hash of the SINTA ID; each worker keeps its own
+RateLimiter, so the request budget scales with --workers. With one worker
+discovery is a generator feeding the crawl: profiles are fetched while
+the author listing is still being read.
+'''
+
+import os
+import re
+import sys
+import time
+import threading
+import zlib
+import random
+import itertools
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from os.path import dirname
+
+from bs4 import BeautifulSoup
+sys.path.append(dirname(dirname(os.path.abspath(os.path.dirname(__file__)))))
+from common.db import get_db, get_collection
+from common import log, metrics
+from common.pipeline import run_pipeline
+from common.profiling import add_profile_argument, detach as detach_profiler, profiled
+from common.skipset import add_skip_arguments, resolve_skip_set
+from common import recrawl, replay
+from common.records import Lecturer, Publication, as_document
+from common.breaker import CircuitOpen, breaker_stats, retry_after_seconds
+from common.session import REQUEST_ERRORS, connection_stats, get as http_get
+
+# --- CONFIG ---
+BASE = "https://sinta.kemdiktisaintek.go.id"
+AFFIL_ID = "1093"  # Telkom University, default jika --affiliations tidak diisi
+AFFILIATION_NAME = "Telkom University"
+UNIVERSITIES_DB = os.environ.get('SINTA_UNIVERSITIES_DB', 'sinta')  # diisi scrap-academic.py
+
+logger = logging.getLogger('sinta')
+
+headers = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+
+AUTHOR_LINK_SELECTOR = '.au-item .profile-name a[href^="/authors/profile/"], .au-item .profile-name a[href^="https://sinta.kemdiktisaintek.go.id/authors/profile/"]'
+
+# Stage -> field on the dosen document recording when it last ran.
+# Publication stages are the ?view= tabs of an author profile.
+STAGE_PROFILE = 'profile'
+STAGE_GARUDA = 'garuda'
+STAGE_SCOPUS = 'scopus'
+STAGE_GSCHOLAR = 'googlescholar'
+PUBLICATION_VIEWS = (STAGE_GARUDA, STAGE_SCOPUS, STAGE_GSCHOLAR)
+STAGE_FIELDS = {
+    STAGE_PROFILE: 'profile_crawled_at',
+    STAGE_GARUDA: 'garuda_crawled_at',
+    STAGE_SCOPUS: 'scopus_crawled_at',
+    STAGE_GSCHOLAR: 'googlescholar_crawled_at',
+}
+
+# "Page 1 of 12 | Total Records : 115" di bawah daftar publikasi; fallback ke link pager
+PAGE_OF_RE = re.compile(r'Page\s+\d+\s+of\s+(\d+)', re.I)
+PAGE_PARAM_RE = re.compile(r'[?&;]page=(\d+)')
+AUTHOR_PREFIX_RE = re.compile(r'^\s*(Creator|Authors?)\s*:\s*')
+
+
+class RateLimiter(object):
+    '''
+    Politeness budget of one process: request starts are spaced by at least
+    uniform(min_delay, max_delay) seconds, also across fetcher threads.
+    '''
+
+    def __init__(self, min_delay, max_delay=None):
+        self.min_delay = min_delay
+        self.max_delay = min_delay if max_delay is None else max_delay
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if replay.replaying():
+            # Halaman dari store rekaman: tidak ada server yang perlu dijaga
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_at)
+            self._next_at = start + random.uniform(self.min_delay, self.max_delay)
+        if start > now:
+            time.sleep(start - now)
+
+
+class RequestBudget(object):
+    '''
+    Hard cap on the author page requests of one process (0 = no cap): the
+    recrawl plan only estimates them, this counts the ones actually sent,
+    shared by all fetcher threads.
+    '''
+
+    def __init__(self, limit=0):
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def take(self):
+        '''Claim one request; False once the budget is spent.'''
+        with self._lock:
+            if self.limit > 0 and self.used >= self.limit:
+                return False
+            self.used += 1
+            return True
+
+
+BLOCK_STATUSES = (403, 429)
+
+
+def safe_request(url, max_retries=3):
+    for attempt in range(max_retries):
+        start = time.perf_counter()
+        try:
+            # Session bersama: koneksi keep-alive dipakai ulang antar halaman
+            response = http_get(url, headers=headers, timeout=10)
+            metrics.observe('crawler_fetch_seconds', time.perf_counter() - start, source='sinta')
+            metrics.inc('crawler_fetch_bytes_total', len(response.content), source='sinta')
+            if response.status_code in BLOCK_STATUSES:
+                metrics.inc('crawler_blocked_total', source='sinta', status=response.status_code)
+            response.raise_for_status()
+            return response
+        except REQUEST_ERRORS as e:
+            metrics.inc('crawler_fetch_errors_total', source='sinta', reason=type(e).__name__)
+            if isinstance(e, (replay.ReplayMiss, CircuitOpen)):
+                # Tidak ada di rekaman / SINTA down lebih lama dari BREAKER_MAX_WAIT:
+                # mengulang tidak akan mengubah hasilnya
+                raise
+            if attempt < max_retries - 1:
+                metrics.inc('crawler_fetch_retries_total', source='sinta')
+                if retry_after_seconds(getattr(e, 'response', None)) is not None:
+                    # Host sudah ditahan breaker selama Retry-After, request berikutnya menunggu di sana
+                    wait_time = 0
+                else:
+                    wait_time = (2 ** attempt) + random.uniform(0, 1)  # Exponential backoff with jitter
+                log.event(logger, logging.WARNING, "Request failed, retrying", url=url, attempt=attempt + 1,
+                          max_retries=max_retries, error=str(e), wait_seconds=round(wait_time, 2))
+                time.sleep(wait_time)
+            else:
+                raise e
+
+
+def author_id_from_url(url):
+    m = re.search(r'/authors/profile/(\d+)', url)
+    return m.group(1) if m else ""
+
+
+def affil_authors_url(affil_id=AFFIL_ID):
+    return f"{BASE}/affiliations/authors/{affil_id}"
+
+
+class SeenIds(object):
+    '''
+    Compact seen-set of SINTA IDs for discovery: numeric IDs are one bit in
+    a bytearray that grows to the largest ID seen (about 1 MB for IDs up to
+    8 million, however many authors), anything else goes to a plain set.
+    '''
+
+    def __init__(self):
+        self.bits = bytearray()
+        self.other = set()
+        self.count = 0
+
+    def add(self, key):
+        '''Add `key`; False when it was already there.'''
+        key = str(key)
+        if not key.isdigit():
+            if key in self.other:
+                return False
+            self.other.add(key)
+        else:
+            n = int(key)
+            byte, bit = n >> 3, 1 << (n & 7)
+            if byte >= len(self.bits):
+                self.bits.extend(bytes(max(byte + 1 - len(self.bits), len(self.bits) // 2)))
+            if self.bits[byte] & bit:
+                return False
+            self.bits[byte] |= bit
+        self.count += 1
+        return True
+
+    def __contains__(self, key):
+        key = str(key)
+        if not key.isdigit():
+            return key in self.other
+        n = int(key)
+        return (n >> 3) < len(self.bits) and bool(self.bits[n >> 3] & (1 << (n & 7)))
+
+    def __len__(self):
+        return self.count
+
+    def nbytes(self):
+        return len(self.bits)
+
+
+def iter_author_pages(page_start=1, page_end=1, affil_id=AFFIL_ID, limiter=None, seen=None, retries=3):
+    '''
+    Generator over the listing pages page_start..page_end of one affiliation
+    (page_end <= 0 walks until the first empty page, a 4xx or a page missing
+    from the replay store), yielding per page the author profile URLs not in
+    `seen` (a SeenIds, shared to deduplicate across affiliations). The next
+    page is only requested when the caller asks for it. `retries` failed
+    pages in a row end the walk.
+    '''
+    limiter = limiter or RateLimiter(2, 5)  # Random delay between 2-5 seconds
+    seen = SeenIds() if seen is None else seen
+    page = page_start
+    failures = 0
+    while page_end <= 0 or page <= page_end:
+        url = f"{affil_authors_url(affil_id)}?page={page}"
+        limiter.wait()
+        page += 1
+        try:
+            res = safe_request(url)
+        except CircuitOpen as e:
+            # SINTA down: halaman berikutnya juga akan gagal, hentikan afiliasi ini
+            log.event(logger, logging.ERROR, "SINTA tidak tersedia, discovery afiliasi dihentikan",
+                      affil_id=affil_id, page=page - 1, error=str(e))
+            return
+        except REQUEST_ERRORS as e:
+            failures += 1
+            status = getattr(getattr(e, 'response', None), 'status_code', None) or 0
+            log.event(logger, logging.ERROR, "Failed to fetch affiliation page", affil_id=affil_id, page=page - 1,
+                      attempt=failures, error=str(e))
+            # Tanpa page_end, 4xx / halaman tidak terekam berarti sudah lewat halaman terakhir
+            if page_end <= 0 and (isinstance(e, replay.ReplayMiss) or 400 <= status < 500):
+                return
+            if failures >= retries:
+                log.event(logger, logging.ERROR, "Discovery afiliasi dihentikan setelah gagal berturut-turut",
+                          affil_id=affil_id, page=page - 1, failures=failures)
+                return
+            continue
+        failures = 0
+        links = BeautifulSoup(res.text, "html.parser").select(AUTHOR_LINK_SELECTOR)
+        if not links:
+            log.event(logger, logging.INFO, "Tidak ada author ditemukan", affil_id=affil_id, page=page - 1)
+            if page_end <= 0:
+                break
+            continue
+        urls = []
+        for a in links:
+            href = a["href"]
+            if not href.startswith("http"):
+                href = BASE + href
+            if seen.add(author_id_from_url(href) or href):
+                urls.append(href)
+        log.event(logger, logging.INFO, "Authors found", affil_id=affil_id, page=page - 1, authors=len(links),
+                  new=len(urls))
+        yield urls
+
+
+def get_all_author_urls(page_start=1, page_end=1, affil_id=AFFIL_ID, limiter=None):
+    '''Author profile URLs listed on pages page_start..page_end of one affiliation.'''
+    return [url for urls in iter_author_pages(page_start, page_end, affil_id, limiter) for url in urls]
+
+
+def iter_discovered(affil_ids, page_start=1, page_end=1, limiter=None, seen=None):
+    '''Per listing page, [(author URL, affiliation ID)] over several affiliations (first seen wins).'''
+    limiter = limiter or RateLimiter(2, 5)
+    seen = SeenIds() if seen is None else seen
+    for affil_id in affil_ids:
+        for urls in iter_author_pages(page_start, page_end, affil_id, limiter, seen):
+            yield [(url, affil_id) for url in urls]
+
+
+def discover_authors(affil_ids, page_start=1, page_end=1):
+    '''Map author URL -> affiliation ID over several affiliations (first seen wins).'''
+    return dict(pair for page in iter_discovered(affil_ids, page_start, page_end) for pair in page)
+
+
+def load_affiliations(affil_ids=None):
+    '''
+    Affiliation ID -> name. Without explicit IDs every university stored by
+    scrap-academic.py is used.
+    '''
+    col_universities = get_db(UNIVERSITIES_DB).universities
+    query = {"id": {"$in": list(affil_ids)}} if affil_ids else {}
+    names = {str(u["id"]): u.get("name", "") for u in col_universities.find(query, {"id": 1, "name": 1})}
+    if affil_ids:
+        return {str(a): names.get(str(a), "") for a in affil_ids}
+    return names
+
+
+def shard_of(key, shards):
+    # crc32, bukan hash(): harus stabil antar proses
+    return zlib.crc32(str(key).encode("utf-8")) % shards
+
+
+def partition_frontier(frontier, shards):
+    parts = [[] for _ in range(shards)]
+    for entry in frontier:
+        parts[shard_of(entry["sinta_id"], shards)].append(entry)
+    return parts
+
+
+def known_author_urls(col_dosen):
+    '''Profile URL -> None (affiliation unknown) of every lecturer already in `dosen`.'''
+    return dict(pair for page in iter_known_authors(col_dosen) for pair in page)
+
+
+def iter_known_authors(col_dosen, seen=None, batch_size=500):
+    '''known_author_urls() in batches of [(URL, None)], skipping SINTA IDs in `seen`.'''
+    seen = SeenIds() if seen is None else seen
+    batch = []
+    for d in col_dosen.find({"sinta_id": {"$nin": [None, ""]}}, {"sinta_id": 1}).batch_size(5000):
+        if seen.add(d["sinta_id"]):
+            batch.append((f"{BASE}/authors/profile/{d['sinta_id']}", None))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def build_frontier(author_urls, col_dosen, stages, max_age_hours=0, budget=0, max_pages=0):
+    '''
+    Deduplicate author URLs by SINTA ID and attach, per author, the stages
+    that are stale according to the timestamps on the `dosen` collection.
+    `author_urls` may be a list or the URL -> affiliation ID map returned
+    by discover_authors().
+
+    Authors whose requested stages all ran within `max_age_hours` are
+    dropped. The frontier is ranked by common.recrawl: never-crawled first,
+    then by the chance the profile changed since its last crawl; with
+    `budget` > 0 only the entries whose estimated requests fit are kept.
+    '''
+    if not isinstance(author_urls, dict):
+        author_urls = dict.fromkeys(author_urls, AFFIL_ID)
+    by_id = {}
+    for url, affil_id in author_urls.items():
+        sinta_id = author_id_from_url(url) or url
+        by_id.setdefault(sinta_id, (url, affil_id))
+
+    fields = [STAGE_FIELDS[s] for s in stages]
+    seen = {}
+    if by_id:
+        projection = dict(recrawl.TRACK_PROJECTION, **dict.fromkeys(
+            ['sinta_id'] + fields + list(recrawl.VIEW_ARTICLES.values()) + list(recrawl.VIEW_PAGES.values()), 1))
+        for doc in col_dosen.find({"sinta_id": {"$in": list(by_id)}}, projection):
+            seen[doc["sinta_id"]] = doc
+
+    cutoff = datetime.utcnow() - timedelta(hours=max_age_hours) if max_age_hours > 0 else None
+    frontier = []
+    for sinta_id, (url, affil_id) in by_id.items():
+        doc = seen.get(sinta_id, {})
+        stale = []
+        for stage in stages:
+            crawled_at = doc.get(STAGE_FIELDS[stage])
+            if cutoff is None or crawled_at is None or crawled_at < cutoff:
+                stale.append((stage, crawled_at or datetime.min))
+        if stale:
+            frontier.append({
+                "url": url,
+                "sinta_id": sinta_id,
+                "affil_id": affil_id,
+                "stages": [stage for stage, _ in stale],
+                "last_crawled_at": min(at for _, at in stale),
+            })
+    frontier, _ = recrawl.plan(frontier, seen, budget, max_pages=max_pages)
+    return frontier
+
+
+def iter_frontier(pages, col_dosen, stages, max_age_hours=0, budget=0, max_pages=0, window=100, stats=None):
+    '''
+    Streaming build_frontier(): `pages` yields lists of (author URL,
+    affiliation ID), e.g. iter_discovered(). Entries are ranked within
+    windows of `window` authors (0 = all of discovery first, a global
+    ranking) and yielded as soon as their window is ranked; the first
+    listing page is yielded on its own so crawling starts right away.
+    With `budget` > 0 discovery stops once the planned requests use it up.
+    `stats` (a dict) receives discovered / frontier / planned_requests.
+    '''
+    stats = {} if stats is None else stats
+    stats.update(discovered=0, frontier=0, planned_requests=0)
+    buffer = {}
+    flushed = False
+
+    def flush():
+        remaining = budget - stats["planned_requests"] if budget > 0 else 0
+        entries = build_frontier(buffer, col_dosen, stages, max_age_hours, remaining, max_pages)
+        buffer.clear()
+        stats["frontier"] += len(entries)
+        stats["planned_requests"] += sum(e["recrawl_cost"] for e in entries)
+        return entries
+
+    for page in pages:
+        for url, affil_id in page:
+            buffer.setdefault(url, affil_id)
+        stats["discovered"] += len(page)
+        if buffer and (not flushed or (window > 0 and len(buffer) >= window)):
+            flushed = True
+            yield from flush()
+            if budget > 0 and stats["planned_requests"] >= budget:
+                return
+    if buffer:
+        yield from flush()
+
+
+def _to_int(text):
+    return int(text) if text.isdigit() else 0
+
+
+def parse_author_profile(s):
+    # Extract nama
+    nama_tag = s.select_one("h3 a")
+    nama = nama_tag.text.strip() if nama_tag else ""
+
+    # Extract affiliation
+    affil_tag = s.select_one('.meta-profile a[href*="affiliations/profile"]')
+    affiliation = affil_tag.text.strip() if affil_tag else ""
+
+    # Extract department
+    dept_tag = s.select_one('.meta-profile a[href*="departments/profile"]')
+    department = dept_tag.text.strip() if dept_tag else ""
+
+    # Extract SINTA ID
+    sinta_id_tag = s.select_one('.meta-profile a[href="#!"]')
+    sinta_id = ""
+    if sinta_id_tag and "SINTA ID" in sinta_id_tag.text:
+        sinta_id = sinta_id_tag.text.replace("SINTA ID :", "").strip()
+
+    # Extract stats from table
+    stats = {}
+    table = s.select_one('.stat-table tbody')
+    if table:
+        for row in table.find_all('tr'):
+            cols = row.find_all('td')
+            if len(cols) >= 4:
+                metric = cols[0].text.strip()
+                prefix = {"Article": "article", "Citation": "citation", "H-Index": "hindex"}.get(metric)
+                if prefix:
+                    stats[f'{prefix}_scopus'] = _to_int(cols[1].text.strip())
+                    stats[f'{prefix}_gscholar'] = _to_int(cols[2].text.strip())
+                    stats[f'{prefix}_wos'] = _to_int(cols[3].text.strip())
+
+    return Lecturer(nama=nama, affiliation=affiliation, department=department, sinta_id=sinta_id, **stats)
+
+
+def _reorder_name(raw):
+    # "Lubis, Muharman" -> "Muharman Lubis"
+    if ',' in raw:
+        parts = [p.strip() for p in raw.split(',')]
+        if len(parts) == 2:
+            return f"{parts[1]} {parts[0]}"
+    return raw
+
+
+def page_count_from_html(html):
+    '''Number of pages of an author publication view, read from the pager.'''
+    m = PAGE_OF_RE.search(html)
+    if m:
+        return int(m.group(1))
+    pages = [int(p) for p in PAGE_PARAM_RE.findall(html)]
+    return max(pages) if pages else 1
+
+
+def author_view_url(url, view, page=1):
+    if page > 1:
+        return f"{url}?page={page}&view={view}"
+    return f"{url}?view={view}"
+
+
+def _split_authors(author_line, view):
+    # garuda: "Lubis, Muharman; Doe, J"; googlescholar: "M Lubis, J Doe"; scopus: "Creator : Lubis M."
+    author_line = AUTHOR_PREFIX_RE.sub('', author_line)
+    if view == STAGE_GARUDA:
+        return [_reorder_name(n.strip()) for n in author_line.split(';') if n.strip()]
+    if view == STAGE_GSCHOLAR:
+        return [n.strip() for n in author_line.split(',') if n.strip() and n.strip() != '...']
+    return [author_line.strip()] if author_line.strip() else []
+
+
+def parse_publications(s, view=STAGE_GARUDA, affiliations=None):
+    '''
+    Publications on one page of an author view. The three views share the
+    .ar-list-item layout; on garuda .ar-cited carries the DOI, on scopus
+    and googlescholar the citation count.
+    '''
+    journals = []
+    for item in s.select(".ar-list-item"):
+        title_tag = item.select_one(".ar-title a")
+        if not title_tag:
+            continue
+        journal_tag = item.select_one(".ar-meta .ar-pub")
+        year_tag = item.select_one(".ar-meta .ar-year")
+        cited_tag = item.select_one(".ar-meta .ar-cited")
+        # Ambil semua a[href^='#!'] di .ar-meta, exclude yang ada class ar-year, ar-cited, ar-quartile
+        author_line = None
+        for a in item.select(".ar-meta a[href^='#!']"):
+            classes = a.get('class') or []
+            if 'ar-year' in classes or 'ar-cited' in classes or 'ar-quartile' in classes:
+                continue
+            if ';' in a.text or ',' in a.text or AUTHOR_PREFIX_RE.match(a.text):
+                author_line = a.text.strip()
+                break
+        authors = _split_authors(author_line, view) if author_line else []
+        doi = ""
+        citation = 0
+        if cited_tag and view == STAGE_GARUDA:
+            doi = cited_tag.text.strip()
+        elif cited_tag:
+            m = re.search(r'(\d+)', cited_tag.text.replace(',', ''))
+            citation = int(m.group(1)) if m else 0
+        journals.append(Publication.create(
+            title_tag.text.strip(), authors,
+            affiliations=list(affiliations or [AFFILIATION_NAME]),
+            url=title_tag.get("href", ""),
+            doi=doi,
+            publicationName=journal_tag.text.strip() if journal_tag else "",
+            publicationYear=year_tag.text.strip() if year_tag else "",
+            citation=citation,
+            source=f"sinta-{view}"))
+    return journals
+
+
+def upsert_dosen(col_dosen, dosen):
+    # Cek duplikasi berdasarkan SINTA ID
+    query = {"sinta_id": dosen.sinta_id}
+    now = datetime.utcnow()
+    profile = dosen.to_dict()
+    # Riwayat perubahan profil untuk prioritas recrawl (common/recrawl.py)
+    previous = col_dosen.find_one(query, recrawl.TRACK_PROJECTION)
+    tracking, changed = recrawl.observe(previous, profile, now)
+    update = {"$set": dict(profile, **tracking, **{STAGE_FIELDS[STAGE_PROFILE]: now})}
+    if changed:
+        # stats_at dilepas: profil berubah, stats-rollup.py menghitung ulang dosen ini
+        update["$unset"] = {"stats_at": ""}
+    with metrics.timer('crawler_mongo_write_seconds', collection=col_dosen.name, op='upsert'):
+        result = col_dosen.update_one(query, update, upsert=True)
+    action = "INSERTED" if result.upserted_id is not None else ("UPDATED" if changed else "UNCHANGED")
+    log.record(logger, 'dosen', action, sinta_id=dosen.sinta_id, nama=dosen.nama)
+
+
+def upsert_journal(col_journals, journal, skip=None):
+    journal = as_document(journal)
+    # Skip-set dulu (tanpa query Mongo), lalu cek duplikasi berdasarkan title, doi, dan authors
+    if skip is not None and journal in skip:
+        log.record(logger, 'journal_skip', "SKIP (skip-set)", title=journal["title"])
+        return False
+    query = {
+        "title": journal["title"],
+        "doi": journal.get("doi", ""),
+        "authors": journal.get("authors", [])
+    }
+    existing = col_journals.find_one(query)
+    if not existing:
+        # updated_at dipakai export-parquet.py sebagai high-water mark
+        journal["updated_at"] = datetime.utcnow()
+        with metrics.timer('crawler_mongo_write_seconds', collection=col_journals.name, op='insert'):
+            col_journals.insert_one(journal)
+    if skip is not None:
+        skip.add(journal)
+    if not existing:
+        return True
+    log.record(logger, 'journal_skip', "SKIP REDUNDAN", title=journal["title"])
+    return False
+
+
+def mark_stage(col_dosen, sinta_id, stage, pages=None):
+    # Hanya update dosen yang sudah ada, jangan buat dokumen kosong
+    fields = {STAGE_FIELDS[stage]: datetime.utcnow()}
+    if pages:
+        # Jumlah halaman view menurut pager: biaya recrawl berikutnya (common/recrawl.py)
+        fields[recrawl.VIEW_PAGES[stage]] = pages
+    with metrics.timer('crawler_mongo_write_seconds', collection=col_dosen.name, op='mark_stage'):
+        col_dosen.update_one({"sinta_id": sinta_id}, {"$set": fields})
+
+
+def publication_views(stages):
+    return [view for view in PUBLICATION_VIEWS if view in stages]
+
+
+def parse_author_page(entry, pages):
+    '''
+    CPU-bound stage, run in the parser pool: profile plus publications of
+    every fetched view page, as picklable records (common.records).
+    `pages` maps 'profile' or a view name to its list of HTML pages.
+    '''
+    dosen_data = None
+    journals = []
+    for view, htmls in pages.items():
+        for html in htmls:
+            s = BeautifulSoup(html, "html.parser")
+            if dosen_data is None:
+                dosen_data = parse_author_profile(s)
+            if view in PUBLICATION_VIEWS:
+                affiliation = entry.get("affiliation") or dosen_data.affiliation or AFFILIATION_NAME
+                journals.extend(parse_publications(s, view, [affiliation]))
+    return {"dosen": dosen_data, "journals": journals}
+
+
+def parse_fetched(entry, payload):
+    # Module-level so the parser pool can pickle it
+    return dict(parse_author_page(entry, payload["pages"]), complete=payload["complete"],
+                page_counts=payload.get("page_counts", {}))
+
+
+def fetch_author(entry, get, max_pages=0):
+    '''
+    HTML pages of the stale stages of one frontier entry, or None when
+    nothing could be fetched: {"pages": {view: [html, ...]}, "complete":
+    [views read in full], "page_counts": {view: pages per the pager}}.
+    get(url) returns the page text or None.
+    '''
+    url = entry["url"]
+    views = publication_views(entry["stages"])
+    if not views:
+        html = get(url)
+        return {"pages": {STAGE_PROFILE: [html]}, "complete": [STAGE_PROFILE]} if html else None
+    pages = {}
+    complete = []
+    page_counts = {}
+    for view in views:
+        first = get(author_view_url(url, view))
+        if first is None:
+            continue
+        htmls = [first]
+        total = page_counts[view] = page_count_from_html(first)
+        if max_pages > 0:
+            total = min(total, max_pages)
+        for page in range(2, total + 1):
+            html = get(author_view_url(url, view, page))
+            if html is None:
+                break
+            htmls.append(html)
+        pages[view] = htmls
+        if len(htmls) == total:
+            complete.append(view)
+        log.record(logger, 'view', "Halaman view diambil", sinta_id=entry['sinta_id'], view=view,
+                   pages=len(htmls), total=total)
+    return {"pages": pages, "complete": complete, "page_counts": page_counts} if pages else None
+
+
+def write_author(entry, parsed, get, col_dosen, col_journals, skip=None):
+    '''
+    Upsert the profile and publications parsed for one frontier entry and
+    stamp the views read in full. Returns (dosen written, journals inserted).
+    '''
+    stages = entry["stages"]
+    dosen_count = journal_count = 0
+    if STAGE_PROFILE in stages:
+        dosen_data = parsed["dosen"]
+        if not dosen_data.sinta_id and publication_views(stages):
+            html = get(entry["url"])
+            if html is None:
+                return 0, 0
+            dosen_data = parse_author_page(entry, {STAGE_PROFILE: [html]})["dosen"]
+        upsert_dosen(col_dosen, dosen_data)
+        metrics.inc('crawler_items_total', source='sinta-dosen')
+        dosen_count += 1
+    for journal_data in parsed["journals"]:
+        log.record(logger, 'journal', "Journal parsed", sinta_id=entry["sinta_id"],
+                   source=journal_data.source, title=journal_data.title)
+        metrics.inc('crawler_items_total', source=journal_data.source)
+        if upsert_journal(col_journals, journal_data, skip):
+            journal_count += 1
+    # Setelah profil di-upsert supaya dosen baru ikut tercatat
+    for view in publication_views(stages):
+        if view in parsed["complete"]:
+            mark_stage(col_dosen, entry["sinta_id"], view, parsed.get("page_counts", {}).get(view))
+    return dosen_count, journal_count
+
+
+def crawl_authors(frontier, col_dosen, col_journals=None, limiter=None, affiliation_names=None,
+                  parse_workers=1, queue_size=32, fetch_workers=1, max_pages=0, skip=None, budget=0):
+    '''
+    Run the stale stages of every frontier entry as a fetch -> parse -> write
+    pipeline (common/pipeline.py): fetching never waits on BeautifulSoup,
+    `fetch_workers` threads fetch different authors concurrently under the
+    shared limiter and parsing spreads over `parse_workers` processes.
+
+    Every publication view due is read in full: the page count comes from
+    the pager of its first page (capped by `max_pages` when > 0). A view
+    with a failed page is written but not stamped, so the next run retries
+    it. The first view page also supplies the profile (same header and stat
+    table); the plain profile page is only fetched when no view is due or
+    that parse comes back empty. Journals found in `skip` (a
+    common.skipset.SkipSet) are dropped before any Mongo call. With
+    `budget` > 0 no request goes out once that many were sent; the
+    remaining authors come back as failed fetches and stay stale.
+    '''
+    limiter = limiter or RateLimiter(3, 6)  # Random delay to avoid blocking
+    affiliation_names = affiliation_names or {}
+    counts = {"dosen": 0, "journal": 0}
+    requests_left = RequestBudget(budget)
+    exhausted = threading.Event()
+
+    def get(url):
+        if not requests_left.take():
+            if not exhausted.is_set():
+                exhausted.set()
+                log.event(logger, logging.WARNING, "Budget request habis, sisa frontier dilewati",
+                          budget=budget)
+            return None
+        logger.debug("Fetching %s", url)
+        limiter.wait()
+        try:
+            return safe_request(url).text
+        except REQUEST_ERRORS as e:
+            log.event(logger, logging.WARNING, "Failed to fetch", url=url, error=str(e))
+            return None
+
+    def fetch(entry):
+        return fetch_author(entry, get, max_pages)
+
+    def write(entry, parsed):
+        d, j = write_author(entry, parsed, get, col_dosen, col_journals, skip)
+        counts["dosen"] += d
+        counts["journal"] += j
+
+    entries = (dict(entry, affiliation=affiliation_names.get(entry.get("affil_id"), "")) for entry in frontier)
+    run_pipeline(entries, fetch, parse_fetched, write, parse_workers, queue_size, fetch_workers, source='sinta')
+    return counts["dosen"], counts["journal"]
+
+
+def crawl_shard(shard, frontier, affiliation_names, delay=(3, 6), profile=None, limiter=None, **options):
+    '''
+    Worker entry point: own Mongo pool (common.db is per-process) and own
+    RateLimiter, unless `limiter` is given (inline run sharing it with
+    discovery). `frontier` may be a generator. `options` are passed on to
+    crawl_authors(); `profile` is the report path of a profiled worker
+    process.
+    '''
+    db = get_db()
+    log.event(logger, logging.INFO, "Shard started", shard=shard,
+              authors=len(frontier) if isinstance(frontier, list) else "stream")
+    with profiled(profile):
+        result = crawl_authors(frontier, get_collection('dosen', db), get_collection('journal', db),
+                               limiter or RateLimiter(*delay), affiliation_names, **options)
+    log.summary(logger, "Shard finished", shard=shard, dosen=result[0], journals=result[1],
+                http=connection_stats(), breakers=breaker_stats())
+    metrics.flush()  # worker proses tidak menjalankan atexit
+    return result
+
+
+def init_shard_worker():
+    # Fork mewarisi registry metrics dan profiler parent (--profile); worker memprofil dirinya sendiri
+    metrics.reset()
+    detach_profiler()
+
+
+def run_frontier(frontier, workers=1, affiliation_names=None, profile=None, limiter=None, **options):
+    '''
+    Crawl the frontier inline (streaming it, under `limiter`) or split by
+    hash across `workers` processes, which needs the whole frontier first.
+    With `profile`, each worker process writes <profile>.shard<N>; a
+    request `budget` in `options` is split evenly over the workers.
+    '''
+    if workers <= 1:
+        return crawl_shard(0, frontier, affiliation_names, limiter=limiter, **options)
+    if options.get('budget'):
+        options['budget'] = -(-options['budget'] // workers)
+    shards = partition_frontier(frontier, workers)
+    dosen_count = journal_count = 0
+    # Worker mulai dari registry metrics kosong, bukan salinan milik parent
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_shard_worker) as pool:
+        futures = [pool.submit(crawl_shard, i, part, affiliation_names,
+                               profile=f"{profile}.shard{i}" if profile else None, **options)
+                   for i, part in enumerate(shards) if part]
+        for future in futures:
+            d, j = future.result()
+            dosen_count += d
+            journal_count += j
+    return dosen_count, journal_count
+
+
+def add_crawl_arguments(parser, page_start, page_end, stages, max_age_hours=0, delay=(3, 6)):
+    parser.add_argument('page_start', type=int, nargs='?', default=page_start)
+    parser.add_argument('page_end', type=int, nargs='?', default=page_end,
+                        help='Halaman terakhir daftar author (0 = sampai halaman kosong)')
+    parser.add_argument('--stages', type=str, default=','.join(stages),
+                        help=f'Stage dipisah koma: {", ".join(STAGE_FIELDS)}')
+    parser.add_argument('--affiliations', type=str, default='',
+                        help=f'ID afiliasi SINTA dipisah koma (default {AFFIL_ID})')
+    parser.add_argument('--affiliations-from-db', action='store_true',
+                        help='Ambil semua afiliasi dari koleksi universities (scrap-academic.py)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Jumlah proses; frontier dibagi berdasarkan hash SINTA ID')
+    parser.add_argument('--fetch-workers', type=int, default=1,
+                        help='Thread fetch per worker, beberapa author diambil bersamaan')
+    parser.add_argument('--delay', type=float, nargs=2, default=list(delay), metavar=('MIN', 'MAX'),
+                        help='Jeda antar request per worker (detik)')
+    parser.add_argument('--parse-workers', type=int, default=1,
+                        help='Proses parser BeautifulSoup per worker (0 = parse di proses utama)')
+    parser.add_argument('--max-pages', type=int, default=0,
+                        help='Batas halaman per view publikasi (0 = semua halaman)')
+    parser.add_argument('--max-age-hours', type=float, default=max_age_hours,
+                        help='Lewati stage yang sudah di-crawl dalam N jam terakhir (0 = crawl semua)')
+    add_recrawl_arguments(parser)
+    parser.add_argument('--window', type=int, default=100,
+                        help='Author hasil discovery yang diperingkat bersama sebelum di-crawl (0 = tunggu discovery selesai)')
+    add_profile_argument(parser)
+    add_skip_arguments(parser)
+    replay.add_replay_arguments(parser)
+
+
+def add_recrawl_arguments(parser):
+    parser.add_argument('--budget', type=int, default=0,
+                        help='Batas request author per run; author dengan skor recrawl tertinggi dulu (0 = tanpa batas)')
+    parser.add_argument('--known-authors', action='store_true',
+                        help='Tambahkan semua dosen di koleksi dosen ke frontier, bukan hanya hasil discovery')
+
+
+def resolve_stages(parser, args):
+    stages = [s.strip() for s in args.stages.split(',') if s.strip()]
+    if not stages or any(s not in STAGE_FIELDS for s in stages):
+        parser.error(f"--stages harus berisi salah satu dari: {', '.join(STAGE_FIELDS)}")
+    return stages
+
+
+def resolve_affiliations(args):
+    '''Affiliation ID -> name for the parsed CLI arguments.'''
+    affil_ids = [a.strip() for a in args.affiliations.split(',') if a.strip()]
+    if args.affiliations_from_db:
+        return load_affiliations(affil_ids or None)
+    if not affil_ids:
+        return {AFFIL_ID: AFFILIATION_NAME}
+    return dict.fromkeys(affil_ids, "")
+
+
+def run(parser, col_dosen):
+    '''Parse the CLI, then discovery -> frontier -> (sharded) crawl; shared by the entry scripts.'''
+    args = parser.parse_args()
+    stages = resolve_stages(parser, args)
+    replay.configure(args)
+    job = os.path.splitext(parser.prog)[0]
+    metrics.configure(job)
+    log.setup(job)
+    started = time.perf_counter()
+    with profiled(args.profile):
+        affiliations = resolve_affiliations(args)
+        skip = None
+        if publication_views(stages):
+            skip = resolve_skip_set(args, get_collection('journal', get_db()))
+            if skip is not None:
+                log.event(logger, logging.INFO, "Skip-set siap", entries=len(skip),
+                          bytes=skip.nbytes(), source=args.skipFile or 'journal')
+
+        # Discovery dan crawl profil berjalan bersamaan (satu proses): halaman daftar author
+        # berikutnya baru diambil saat frontier butuh author baru, dengan jeda yang sama
+        limiter = RateLimiter(*args.delay)
+        seen = SeenIds()
+        pages = iter_discovered(list(affiliations), args.page_start, args.page_end, limiter, seen)
+        if args.known_authors:
+            pages = itertools.chain(pages, iter_known_authors(col_dosen, seen))
+        frontier_stats = {}
+        frontier = iter_frontier(pages, col_dosen, stages, args.max_age_hours, args.budget, args.max_pages,
+                                 args.window, frontier_stats)
+        if args.workers > 1:
+            frontier = list(frontier)
+            log.event(logger, logging.INFO, "Frontier siap", stages=stages, budget=args.budget,
+                      **frontier_stats)
+
+        result = run_frontier(frontier, args.workers, affiliations,
+                              limiter=limiter,
+                              profile=args.profile,
+                              delay=tuple(args.delay),
+                              parse_workers=args.parse_workers,
+                              fetch_workers=args.fetch_workers,
+                              max_pages=args.max_pages,
+                              skip=skip,
+                              budget=args.budget)
+    log.summary(logger, "Crawl selesai", dosen=result[0], journals=result[1],
+                seen_bytes=seen.nbytes(), breakers=breaker_stats(),
+                elapsed_seconds=round(time.perf_counter() - started, 3), **frontier_stats)
+    metrics.flush()
+    return result
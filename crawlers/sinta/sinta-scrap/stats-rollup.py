@@ -0,0 +1,42 @@
+import os
+import sys
+import time
+import logging
+import argparse
+from os.path import dirname
+sys.path.append(dirname(dirname(os.path.abspath(os.path.dirname(__file__)))))
+from common.db import get_db, get_collection
+from common.rollups import ensure_indexes, rollup
+from common.profiling import add_profile_argument, profiled
+from common import log, metrics
+
+# Statistik per tahun / per dosen / per departemen di koleksi stats, dihitung ulang hanya untuk
+# journal dan dosen yang berubah sejak rollup terakhir. Dibaca endpoint /statistic/* di API.
+
+db = get_db()
+col_journals = get_collection('journal', db, bulk=True)
+col_dosen = get_collection('dosen', db, bulk=True)
+col_stats = get_collection('stats', db, bulk=True)
+logger = logging.getLogger('stats-rollup')
+
+def main():
+    # Contoh: python stats-rollup.py          (hanya record yang berubah)
+    #         python stats-rollup.py --full   (hitung ulang semua statistik)
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--full', action='store_true', help='Hitung ulang semua statistik, bukan hanya yang berubah')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Dokumen per batch query / bulk_write')
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
+    metrics.configure('stats-rollup')
+    log.setup('stats-rollup')
+    started = time.perf_counter()
+    with profiled(args.profile):
+        ensure_indexes(col_journals, col_dosen, col_stats)
+        counts = rollup(col_journals, col_dosen, col_stats, full=args.full, batch_size=args.batch_size)
+    log.summary(logger, "Rollup statistik selesai", full=args.full,
+                elapsed_seconds=round(time.perf_counter() - started, 3), **counts)
+    metrics.flush()
+
+if __name__ == "__main__":
+    main()
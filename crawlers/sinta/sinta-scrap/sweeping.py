@@ -1,7 +1,16 @@
-from pymongo import MongoClient
+import os
+import sys
+import config
+import logging
+from os.path import dirname
+sys.path.append(dirname(dirname(os.path.abspath(os.path.dirname(__file__)))))
+from common.db import get_client, get_db
+from common import log
 
-client = MongoClient('YOURHOST', username='YOURUSERNAME',  password='YOURPASSWORD')
-db = client.sinta
+client = get_client(config.host, username=config.username, password=config.password)
+db = get_db('sinta', client)
 col_google_scholars = db.google_scholars
 
-print(list(col_google_scholars.find().sort('_id', -1).limit(1)))
+log.setup('sweeping')
+log.event(logging.getLogger('sweeping'), logging.INFO, "Publikasi terakhir",
+          latest=list(col_google_scholars.find().sort('_id', -1).limit(1)))
@@ -1,39 +1,52 @@
 const { getDb } = require('../db');
 
-async function publicationYearApi(fastify, opts) {
-  // API endpoint to get publication count per year
-  fastify.get('/statistic/publications-per-year', async (request, reply) => {
-    try {
-      const db = getDb();
-      const collection = db.collection('journal');
+// Figures come from the `stats` collection maintained by
+// crawlers/sinta/sinta-scrap/stats-rollup.py: one indexed lookup on
+// {kind, key} instead of a $group over the whole journal collection.
+// Until the rollup has run once, the year endpoints fall back to the
+// aggregation they used before.
 
-      // Aggregate to count publications by publicationYear
-      const pipeline = [
-        {
-          $match: {
-            publicationYear: { $exists: true, $ne: null, $ne: '' }
-          }
-        },
-        {
-          $group: {
-            _id: '$publicationYear',
-            count: { $sum: 1 }
-          }
-        },
-        {
-          $sort: { _id: 1 }
-        }
-      ];
+async function findStats(db, kind, key) {
+  const query = key === undefined ? { kind } : { kind, key };
+  return db.collection('stats').find(query).sort({ key: 1 }).toArray();
+}
 
-      const results = await collection.aggregate(pipeline).toArray();
+async function aggregatePerYear(db, field) {
+  const match = { publicationYear: { $exists: true, $nin: [null, ''] } };
+  if (field === 'citations') match.citation = { $exists: true, $type: 'number' };
+  const pipeline = [
+    { $match: match },
+    {
+      $group: {
+        _id: '$publicationYear',
+        publications: { $sum: 1 },
+        citations: { $sum: '$citation' }
+      }
+    },
+    { $sort: { _id: 1 } }
+  ];
+  const results = await db.collection('journal').aggregate(pipeline).toArray();
+  return results.map(result => ({ key: result._id, publications: result.publications, citations: result.citations }));
+}
 
-      // Convert results to the desired format
-      const publicationsPerYear = {};
-      results.forEach(result => {
-        publicationsPerYear[result._id] = result.count;
-      });
+async function perYear(field) {
+  const db = getDb();
+  let rows = await findStats(db, 'year');
+  if (rows.length === 0) rows = await aggregatePerYear(db, field);
 
-      reply.code(200).send(publicationsPerYear);
+  // Convert results to the desired format
+  const perYearResult = {};
+  rows.forEach(row => {
+    perYearResult[row.key] = row[field];
+  });
+  return perYearResult;
+}
+
+async function publicationYearApi(fastify, opts) {
+  // API endpoint to get publication count per year
+  fastify.get('/statistic/publications-per-year', async (request, reply) => {
+    try {
+      reply.code(200).send(await perYear('publications'));
     } catch (error) {
       fastify.log.error('Error fetching publications per year:', error);
       reply.code(500).send({ error: 'Internal server error' });
@@ -45,42 +58,57 @@ async function citationYearApi(fastify, opts) {
   // API endpoint to get total citations per year
   fastify.get('/statistic/citations-per-year', async (request, reply) => {
     try {
-      const db = getDb();
-      const collection = db.collection('journal');
-
-      // Aggregate to sum citations by publicationYear
-      const pipeline = [
-        {
-          $match: {
-            publicationYear: { $exists: true, $ne: null, $ne: '' },
-            citation: { $exists: true, $type: 'number' }
-          }
-        },
-        {
-          $group: {
-            _id: '$publicationYear',
-            totalCitations: { $sum: '$citation' }
-          }
-        },
-        {
-          $sort: { _id: 1 }
-        }
-      ];
+      reply.code(200).send(await perYear('citations'));
+    } catch (error) {
+      fastify.log.error('Error fetching citations per year:', error);
+      reply.code(500).send({ error: 'Internal server error' });
+    }
+  });
+}
 
-      const results = await collection.aggregate(pipeline).toArray();
+function formatGroupStats(doc) {
+  return {
+    key: doc.key,
+    nama: doc.nama,
+    department: doc.department,
+    dosen: doc.dosen,
+    publications: doc.publications,
+    citations: doc.citations,
+    perYear: doc.per_year || {},
+    updatedAt: doc.updated_at
+  };
+}
 
-      // Convert results to the desired format
-      const citationsPerYear = {};
-      results.forEach(result => {
-        citationsPerYear[result._id] = result.totalCitations;
-      });
+async function departmentStatisticApi(fastify, opts) {
+  // Publications and citations per department (all, or one with ?department=)
+  fastify.get('/statistic/departments', async (request, reply) => {
+    try {
+      const db = getDb();
+      const rows = await findStats(db, 'department', request.query.department);
+      reply.code(200).send(rows.map(formatGroupStats));
+    } catch (error) {
+      fastify.log.error('Error fetching department statistics:', error);
+      reply.code(500).send({ error: 'Internal server error' });
+    }
+  });
+}
 
-      reply.code(200).send(citationsPerYear);
+async function dosenStatisticApi(fastify, opts) {
+  // Publications and citations per year of one lecturer (SINTA ID)
+  fastify.get('/statistic/dosen/:sintaId', async (request, reply) => {
+    try {
+      const db = getDb();
+      const doc = await db.collection('stats').findOne({ _id: `dosen:${request.params.sintaId}` });
+      if (!doc) {
+        reply.code(404).send({ error: 'Not found' });
+        return;
+      }
+      reply.code(200).send(formatGroupStats(doc));
     } catch (error) {
-      fastify.log.error('Error fetching citations per year:', error);
+      fastify.log.error('Error fetching dosen statistics:', error);
       reply.code(500).send({ error: 'Internal server error' });
     }
   });
 }
 
-module.exports = { publicationYearApi, citationYearApi };
+module.exports = { publicationYearApi, citationYearApi, departmentStatisticApi, dosenStatisticApi };
@@ -1,5 +1,5 @@
 // --- Scholar Selenium Automation ---
-function startScholarSelenium({ query, count, mongoUri, output }) {
+function startScholarSelenium({ query, count, mongoUri, output, skipFile }) {
     const id = `scholar-job-${Date.now()}-${Math.floor(Math.random()*10000)}`;
     jobs[id] = { id, status: 'running', startedAt: new Date().toISOString(), stdout: '', stderr: '' };
     persistJobToDb(jobs[id]).catch(() => {});
@@ -10,6 +10,7 @@ function startScholarSelenium({ query, count, mongoUri, output }) {
     if (count) args.push('--count', String(count));
     if (mongoUri) args.push('--mongoUri', mongoUri);
     if (output) args.push('--output', output);
+    if (skipFile) args.push('--skipFile', skipFile);
 
     console.log(`SCHOLAR JOB: spawning process: python ${args.join(' ')}`);
     const proc = spawn('python', args, { windowsHide: true });
@@ -309,4 +310,167 @@ function startSintaDosen({ pageStart, pageEnd }) {
     return jobs[id];
 }
 
-module.exports = { runScopus, startScopusApi, startScholarSelenium, startSintaScrap, startSintaDosen ,getJob, subscribeJob, unsubscribeJob };
+// --- SINTA Authors (profile + garuda, one fetch per author) Automation ---
+function startSintaAuthors({ pageStart, pageEnd, skipFile }) {
+    const id = `sinta-authors-job-${Date.now()}-${Math.floor(Math.random()*10000)}`;
+    jobs[id] = { id, status: 'running', startedAt: new Date().toISOString(), stdout: '', stderr: '' };
+    persistJobToDb(jobs[id]).catch(() => {});
+
+    const script = path.resolve(__dirname, '../../../crawlers/sinta/sinta-scrap/scrap-sinta-authors.py');
+    const args = [script, String(pageStart), String(pageEnd)];
+    if (skipFile) args.push('--skipFile', skipFile);
+
+    console.log(`SINTA AUTHORS JOB: spawning process: python ${args.join(' ')}`);
+    const proc = spawn('python', args, { windowsHide: true, env: { ...process.env, PYTHONIOENCODING: 'utf-8' } });
+    console.log(`SINTA AUTHORS JOB: spawned pid=${proc.pid} for job ${id}`);
+
+    proc.stdout.on('data', d => {
+        const txt = d.toString();
+        jobs[id].stdout += txt;
+        console.log(`SINTA AUTHORS JOB:${id}:stdout: ${txt.replace(/\n/g, '\\n')}`);
+        broadcastToJob(id, JSON.stringify({ stream: 'stdout', text: txt }));
+    });
+    proc.stderr.on('data', d => {
+        const txt = d.toString();
+        jobs[id].stderr += txt;
+        console.error(`SINTA AUTHORS JOB:${id}:stderr: ${txt.replace(/\n/g, '\\n')}`);
+        broadcastToJob(id, JSON.stringify({ stream: 'stderr', text: txt }), 'stderr');
+    });
+
+    proc.on('close', async code => {
+        jobs[id].status = code === 0 ? 'finished' : 'failed';
+        jobs[id].exitCode = code;
+        jobs[id].finishedAt = new Date().toISOString();
+        await persistJobToDb(jobs[id]);
+        console.log(`SINTA AUTHORS JOB:${id} finished status=${jobs[id].status} exit=${code}`);
+        broadcastToJob(id, JSON.stringify({ event: 'finished', exitCode: jobs[id].exitCode }), 'finished');
+        if (jobSubscribers[id]) {
+            for (const res of Array.from(jobSubscribers[id])) unsubscribeJob(id, res);
+            delete jobSubscribers[id];
+        }
+    });
+    proc.on('error', async err => {
+        jobs[id].status = 'failed';
+        jobs[id].stderr += err.message;
+        jobs[id].finishedAt = new Date().toISOString();
+        await persistJobToDb(jobs[id]);
+        broadcastToJob(id, JSON.stringify({ event: 'error', message: err.message }), 'error');
+        if (jobSubscribers[id]) {
+            for (const res of Array.from(jobSubscribers[id])) unsubscribeJob(id, res);
+            delete jobSubscribers[id];
+        }
+    });
+
+    
+    return jobs[id];
+}
+
+// --- Stats rollup (materialized statistics for the /statistic endpoints) ---
+function startStatsRollup({ full } = {}) {
+    const id = `stats-rollup-job-${Date.now()}-${Math.floor(Math.random()*10000)}`;
+    jobs[id] = { id, status: 'running', startedAt: new Date().toISOString(), stdout: '', stderr: '' };
+    persistJobToDb(jobs[id]).catch(() => {});
+
+    const script = path.resolve(__dirname, '../../../crawlers/sinta/sinta-scrap/stats-rollup.py');
+    const args = [script];
+    if (full) args.push('--full');
+
+    console.log(`STATS ROLLUP JOB: spawning process: python ${args.join(' ')}`);
+    const proc = spawn('python', args, { windowsHide: true, env: { ...process.env, PYTHONIOENCODING: 'utf-8' } });
+    console.log(`STATS ROLLUP JOB: spawned pid=${proc.pid} for job ${id}`);
+
+    proc.stdout.on('data', d => {
+        const txt = d.toString();
+        jobs[id].stdout += txt;
+        broadcastToJob(id, JSON.stringify({ stream: 'stdout', text: txt }));
+    });
+    proc.stderr.on('data', d => {
+        const txt = d.toString();
+        jobs[id].stderr += txt;
+        console.error(`STATS ROLLUP JOB:${id}:stderr: ${txt.replace(/\n/g, '\\n')}`);
+        broadcastToJob(id, JSON.stringify({ stream: 'stderr', text: txt }), 'stderr');
+    });
+
+    proc.on('close', async code => {
+        jobs[id].status = code === 0 ? 'finished' : 'failed';
+        jobs[id].exitCode = code;
+        jobs[id].finishedAt = new Date().toISOString();
+        await persistJobToDb(jobs[id]);
+        console.log(`STATS ROLLUP JOB:${id} finished status=${jobs[id].status} exit=${code}`);
+        broadcastToJob(id, JSON.stringify({ event: 'finished', exitCode: jobs[id].exitCode }), 'finished');
+        if (jobSubscribers[id]) {
+            for (const res of Array.from(jobSubscribers[id])) unsubscribeJob(id, res);
+            delete jobSubscribers[id];
+        }
+    });
+    proc.on('error', async err => {
+        jobs[id].status = 'failed';
+        jobs[id].stderr += err.message;
+        jobs[id].finishedAt = new Date().toISOString();
+        await persistJobToDb(jobs[id]);
+        broadcastToJob(id, JSON.stringify({ event: 'error', message: err.message }), 'error');
+        if (jobSubscribers[id]) {
+            for (const res of Array.from(jobSubscribers[id])) unsubscribeJob(id, res);
+            delete jobSubscribers[id];
+        }
+    });
+
+    return jobs[id];
+}
+
+function startCrawlFrontier({ pageStart, pageEnd, skipFile, scholarFromDb } = {}) {
+    const id = `crawl-frontier-job-${Date.now()}-${Math.floor(Math.random()*10000)}`;
+    jobs[id] = { id, status: 'running', startedAt: new Date().toISOString(), stdout: '', stderr: '' };
+    persistJobToDb(jobs[id]).catch(() => {});
+
+    // One process for SINTA authors and Scholar profiles: requests are
+    // spaced per host across all of its workers (crawl-frontier.py)
+    const script = path.resolve(__dirname, '../../../crawlers/sinta/sinta-scrap/crawl-frontier.py');
+    const args = [script, String(pageStart), String(pageEnd)];
+    if (skipFile) args.push('--skipFile', skipFile);
+    if (scholarFromDb) args.push('--scholar-from-db');
+
+    console.log(`CRAWL FRONTIER JOB: spawning process: python ${args.join(' ')}`);
+    const proc = spawn('python', args, { windowsHide: true, env: { ...process.env, PYTHONIOENCODING: 'utf-8' } });
+    console.log(`CRAWL FRONTIER JOB: spawned pid=${proc.pid} for job ${id}`);
+
+    proc.stdout.on('data', d => {
+        const txt = d.toString();
+        jobs[id].stdout += txt;
+        broadcastToJob(id, JSON.stringify({ stream: 'stdout', text: txt }));
+    });
+    proc.stderr.on('data', d => {
+        const txt = d.toString();
+        jobs[id].stderr += txt;
+        console.error(`CRAWL FRONTIER JOB:${id}:stderr: ${txt.replace(/\n/g, '\\n')}`);
+        broadcastToJob(id, JSON.stringify({ stream: 'stderr', text: txt }), 'stderr');
+    });
+
+    proc.on('close', async code => {
+        jobs[id].status = code === 0 ? 'finished' : 'failed';
+        jobs[id].exitCode = code;
+        jobs[id].finishedAt = new Date().toISOString();
+        await persistJobToDb(jobs[id]);
+        console.log(`CRAWL FRONTIER JOB:${id} finished status=${jobs[id].status} exit=${code}`);
+        broadcastToJob(id, JSON.stringify({ event: 'finished', exitCode: jobs[id].exitCode }), 'finished');
+        if (jobSubscribers[id]) {
+            for (const res of Array.from(jobSubscribers[id])) unsubscribeJob(id, res);
+            delete jobSubscribers[id];
+        }
+    });
+    proc.on('error', async err => {
+        jobs[id].status = 'failed';
+        jobs[id].stderr += err.message;
+        jobs[id].finishedAt = new Date().toISOString();
+        await persistJobToDb(jobs[id]);
+        broadcastToJob(id, JSON.stringify({ event: 'error', message: err.message }), 'error');
+        if (jobSubscribers[id]) {
+            for (const res of Array.from(jobSubscribers[id])) unsubscribeJob(id, res);
+            delete jobSubscribers[id];
+        }
+    });
+
+    return jobs[id];
+}
+
+module.exports = { runScopus, startScopusApi, startScholarSelenium, startSintaScrap, startSintaDosen, startSintaAuthors, startStatsRollup, startCrawlFrontier, getJob, subscribeJob, unsubscribeJob };
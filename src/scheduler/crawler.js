@@ -7,7 +7,7 @@
  */
 require('dotenv').config();
 const cron = require('node-cron');
-const { startScopusApi, startScholarSelenium, startSintaScrap, startSintaDosen } = require('../modules/crawler/crawler.service');
+const { startScopusApi, startScholarSelenium, startSintaAuthors, startStatsRollup, startCrawlFrontier } = require('../modules/crawler/crawler.service');
 const { exportToSpreadsheet } = require('../app/exportToSpreadsheet');
 const { getDb } = require('../db');
 const fs = require('fs');
@@ -52,8 +52,24 @@ const START_INDEX = 1000;
 // SINTA scraping page range
 const SINTA_PAGE_START = 39;
 const SINTA_PAGE_END = 40;
+// Stats rollup (stats-rollup.py): cheap when nothing changed, so it runs often
+// and picks up whatever the crawl jobs above have written since the last run
+const STATS_CRON = process.env.STATS_CRON || '*/30 * * * *';
+// CRAWL_FRONTIER=1: SINTA authors and the Scholar profiles in scholar_profiles
+// go through one crawl-frontier.py process (shared per-host politeness, stalest
+// first) instead of a separate SINTA job sleeping on its own
+const CRAWL_FRONTIER = process.env.CRAWL_FRONTIER === '1';
 // -------------------------------------------------------------------------
 
+function startSintaJob(skipFile) {
+  if (CRAWL_FRONTIER) {
+    console.log(`Scheduler: starting crawl frontier job for SINTA pages ${SINTA_PAGE_START}-${SINTA_PAGE_END} + Scholar profiles`);
+    return startCrawlFrontier({ pageStart: SINTA_PAGE_START, pageEnd: SINTA_PAGE_END, skipFile, scholarFromDb: true });
+  }
+  console.log(`Scheduler: starting Sinta authors job for pages ${SINTA_PAGE_START}-${SINTA_PAGE_END}`);
+  return startSintaAuthors({ pageStart: SINTA_PAGE_START, pageEnd: SINTA_PAGE_END, skipFile });
+}
+
 function startScheduler() {
   console.log(`Scheduler: registering cron '${CRON_EXPR}' tz='${CRON_TZ}' (affil=${AFFIL} years=${START_YEAR}-${END_YEAR})`);
   cron.schedule(CRON_EXPR, async () => {
@@ -119,30 +135,18 @@ function startScheduler() {
           query: AFFIL,
           count: countScholar,
           mongoUri: MONGO_URI,
-          output: `output_scholar_all.json`
+          output: `output_scholar_all.json`,
+          skipFile: skipFilePath
         });
       } catch (e) {
         console.error('Scheduler: failed to start scholar job for affiliation', e && e.message ? e.message : e);
       }
-      // Sinta job: run once for the configured page range
+      // Sinta job: profile (dosen) + garuda publications in one pass over
+      // the author list, so each author page is fetched once per run
       try {
-        console.log(`Scheduler: starting Sinta job for pages ${SINTA_PAGE_START}-${SINTA_PAGE_END}`);
-        startSintaScrap({
-          pageStart: SINTA_PAGE_START,
-          pageEnd: SINTA_PAGE_END
-        });
+        startSintaJob(skipFilePath);
       } catch (e) {
-        console.error('Scheduler: failed to start sinta job', e && e.message ? e.message : e);
-      }
-      // Sinta Dosen job: run once for the configured page range
-      try {
-        console.log(`Scheduler: starting Sinta Dosen job for pages ${SINTA_PAGE_START}-${SINTA_PAGE_END}`);
-        startSintaDosen({
-          pageStart: SINTA_PAGE_START,
-          pageEnd: SINTA_PAGE_END
-        });
-      } catch (e) {
-        console.error('Scheduler: failed to start sinta dosen job', e && e.message ? e.message : e);
+        console.error('Scheduler: failed to start sinta authors job', e && e.message ? e.message : e);
       }
 
       // Export to Google Sheets after all crawling jobs are started
@@ -173,6 +177,20 @@ function startScheduler() {
       console.error('Scheduler: unexpected error during cron job:', e && e.message ? e.message : e);
     }
   }, { scheduled: true, timezone: CRON_TZ });
+
+  console.log(`Scheduler: registering stats rollup cron '${STATS_CRON}' tz='${CRON_TZ}'`);
+  let statsJob = null;
+  cron.schedule(STATS_CRON, () => {
+    if (statsJob && statsJob.status === 'running') {
+      console.log('Scheduler: previous stats rollup still running, skipping');
+      return;
+    }
+    try {
+      statsJob = startStatsRollup();
+    } catch (e) {
+      console.error('Scheduler: failed to start stats rollup job', e && e.message ? e.message : e);
+    }
+  }, { scheduled: true, timezone: CRON_TZ });
 }
 
 async function runOnceNow() {
@@ -215,28 +233,16 @@ async function runOnceNow() {
     query: AFFIL,
     count: COUNT,
     mongoUri: MONGO_URI,
-    output: `output_scholar_all.json`
+    output: `output_scholar_all.json`,
+    skipFile: skipFilePath
   });
 
-  // Sinta job: run once for the configured page range
-  try {
-    console.log(`Scheduler: starting Sinta job for pages ${SINTA_PAGE_START}-${SINTA_PAGE_END}`);
-    startSintaScrap({
-      pageStart: SINTA_PAGE_START,
-      pageEnd: SINTA_PAGE_END
-    });
-  } catch (e) {
-    console.error('Scheduler: failed to start sinta job', e && e.message ? e.message : e);
-  }
-  // Sinta Dosen job: run once for the configured page range
+  // Sinta job: profile (dosen) + garuda publications in one pass over
+  // the author list, so each author page is fetched once per run
   try {
-    console.log(`Scheduler: starting Sinta Dosen job for pages ${SINTA_PAGE_START}-${SINTA_PAGE_END}`);
-    startSintaDosen({
-      pageStart: SINTA_PAGE_START,
-      pageEnd: SINTA_PAGE_END
-    });
+    startSintaJob(skipFilePath);
   } catch (e) {
-    console.error('Scheduler: failed to start sinta dosen job', e && e.message ? e.message : e);
+    console.error('Scheduler: failed to start sinta authors job', e && e.message ? e.message : e);
   }
 
   // Export to Google Sheets after manual run
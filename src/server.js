@@ -1,6 +1,6 @@
 const fastify = require("fastify")({ logger: true });
 const crawlerRoutes = require("./modules/crawler/crawler.routes");
-const { publicationYearApi, citationYearApi } = require("./app/statisticApi");
+const { publicationYearApi, citationYearApi, departmentStatisticApi, dosenStatisticApi } = require("./app/statisticApi");
 const { journalDetailApi } = require("./app/journalDetailApi");
 const { authorDetailApi } = require("./app/authorDetailApi");
 const { connect: connectDb, close: closeDb } = require('./db');
@@ -8,6 +8,8 @@ const { connect: connectDb, close: closeDb } = require('./db');
 fastify.register(crawlerRoutes, { prefix: "/" });
 fastify.register(publicationYearApi);
 fastify.register(citationYearApi);
+fastify.register(departmentStatisticApi);
+fastify.register(dosenStatisticApi);
 fastify.register(journalDetailApi);
 fastify.register(authorDetailApi);
 